@@ -1,6 +1,6 @@
 # src/routes/albumes.py (VERSIÓN CORREGIDA)
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
 from spotify.client import spotify_client
 
 def init_albumes_routes(app):
@@ -43,9 +43,10 @@ def init_albumes_routes(app):
                         'rating_promedio': 0
                     }
                     
-                    # Verificar si existe en nuestra BD (por título y artista)
-                    conn = db.get_connection()
+                    # Verificar si existe en nuestra BD (por título y artista), misma conexión para toda la petición
+                    conn = conexion_peticion()
                     if conn:
+                        cur = None
                         try:
                             cur = conn.cursor()
                             cur.execute("""
@@ -79,11 +80,11 @@ def init_albumes_routes(app):
                                 rating_result = cur.fetchone()
                                 album_info['rating_promedio'] = float(rating_result[0]) if rating_result[0] else 0
                                 
-                            cur.close()
                         except Exception as db_error:
                             print(f"Error en consulta BD: {db_error}")
                         finally:
-                            db.close_connection(conn)
+                            if cur:
+                                cur.close()
                     
                     albumes_spotify.append(album_info)
                     
@@ -118,7 +119,7 @@ def init_albumes_routes(app):
             if fecha_lanzamiento:
                 anio_lanzamiento = fecha_lanzamiento[:4] if len(fecha_lanzamiento) >= 4 else None
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -161,15 +162,12 @@ def init_albumes_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/albumes/<int:id_album>/detalles', methods=['GET'])
     def get_album_detalles(id_album):
-        conn = None
         cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -287,15 +285,11 @@ def init_albumes_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
 
     @app.route('/albumes-artista', methods=['GET'])
     def get_artist_albums():
         """Obtiene los álbumes de un artista específico desde Spotify"""
-        conn = None
-        cur = None
         try:
             artist_id = request.args.get('id', '').strip()
             if not artist_id:
@@ -350,9 +344,10 @@ def init_albumes_routes(app):
                             'album_type': album['album_type']  # album, single, compilation
                         }
                         
-                        # Verificar si existe en nuestra base de datos
-                        conn = db.get_connection()
+                        # Verificar si existe en nuestra base de datos (misma conexión para toda la petición)
+                        conn = conexion_peticion()
                         if conn:
+                            cur = None
                             try:
                                 cur = conn.cursor()
                                 cur.execute("""
@@ -377,13 +372,12 @@ def init_albumes_routes(app):
                                 else:
                                     album_info['exists_in_db'] = False
                                     album_info['review_count'] = 0
-                                    
-                                cur.close()
                                 
                             except Exception as db_error:
                                 print(f"Error en consulta BD: {db_error}")
                             finally:
-                                db.close_connection(conn)
+                                if cur:
+                                    cur.close()
                         
                         artist_albums.append(album_info)
                         
@@ -412,9 +406,4 @@ def init_albumes_routes(app):
             print(f"❌ ERROR en /albumes-artista: {e}")
             import traceback
             traceback.print_exc()
-            return jsonify({'error': 'Error interno del servidor'}), 500
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+            return jsonify({'error': 'Error interno del servidor'}), 500
\ No newline at end of file
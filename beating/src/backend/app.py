@@ -1,80 +1,159 @@
+import os
+
 from flask import Flask, jsonify, request  # 👈 Añadir 'request' aquí
 from config import APP_CONFIG
 
-# Importar módulos
-from database.connection import db
-from spotify.client import spotify_client
-from auth.routes import init_auth_routes
-from spotify.routes import init_spotify_routes
-from reviews.routes import init_reviews_routes
-from exploration.routes import init_exploration_routes
-from usuarios.routes import init_usuarios_routes
-from canciones.routes import init_canciones_routes
-from albumes.routes import init_albumes_routes
-from resenas.routes import init_resenas_routes
-from listas.routes import init_listas_routes
-from seguimientos.routes import init_seguimientos_routes
-from comunidad.routes import init_comunidad_routes
-from home.routes import init_home_routes
-
-app = Flask(__name__)
-
-# 🔧 CONFIGURACIÓN CORREGIDA DE CORS
-@app.after_request
-def after_request(response):
-    """Añadir headers CORS SOLO UNA VEZ"""
-    response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Credentials'] = 'true'
-    return response
-
-@app.before_request
-def handle_preflight():
-    """Manejar OPTIONS requests - CORREGIDO"""
-    if request.method == "OPTIONS":
-        response = jsonify({"status": "preflight"})
+
+def create_app():
+    """
+    Crea la app con todas sus rutas, sin arrancar nada (ver iniciar_servicios).
+
+    Los imports van aquí dentro: los procesos de renderizado (spawn) reimportan
+    este módulo y así no abren el pool de la base de datos, ni el cliente de
+    Spotify, ni cargan el modelo.
+    """
+    from database.connection import db
+    from database.request_scope import init_conexion_peticion
+    from spotify.client import spotify_client
+    from auth.routes import init_auth_routes
+    from spotify.routes import init_spotify_routes
+    from reviews.routes import init_reviews_routes
+    from exploration.routes import init_exploration_routes
+    from usuarios.routes import init_usuarios_routes
+    from canciones.routes import init_canciones_routes
+    from albumes.routes import init_albumes_routes
+    from resenas.routes import init_resenas_routes
+    from listas.routes import init_listas_routes
+    from seguimientos.routes import init_seguimientos_routes
+    from comunidad.routes import init_comunidad_routes
+    from home.routes import init_home_routes
+    from reviews.sentiment import sentiment_analyzer
+
+    app = Flask(__name__)
+
+    # 🔧 CONFIGURACIÓN CORREGIDA DE CORS
+    @app.after_request
+    def after_request(response):
+        """Añadir headers CORS SOLO UNA VEZ"""
         response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
         response.headers['Access-Control-Allow-Credentials'] = 'true'
         return response
 
-# Configurar app
-app.config['SECRET_KEY'] = APP_CONFIG['secret_key']
-
-# Inicializar rutas
-init_auth_routes(app)
-init_spotify_routes(app)
-init_reviews_routes(app)
-init_exploration_routes(app)
-init_usuarios_routes(app)
-init_canciones_routes(app)
-init_albumes_routes(app)
-init_resenas_routes(app)
-init_listas_routes(app)
-init_seguimientos_routes(app)
-init_comunidad_routes(app)
-init_home_routes(app)
-
-# 🏠 Rutas básicas
-@app.route('/')
-def home():
-    return jsonify({
-        "message": "🎵 Beating API está funcionando", 
-        "status": "OK",
-        "cors": "fixed"
-    })
-
-@app.route('/health')
-def health_check():
-    return jsonify({
-        "status": "healthy",
-        "server": "running"
-    })
+    @app.before_request
+    def handle_preflight():
+        """Manejar OPTIONS requests - CORREGIDO"""
+        if request.method == "OPTIONS":
+            response = jsonify({"status": "preflight"})
+            response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+            response.headers['Access-Control-Allow-Credentials'] = 'true'
+            return response
+
+    # Configurar app
+    app.config['SECRET_KEY'] = APP_CONFIG['secret_key']
+
+    # Una conexión por petición, devuelta al pool en el teardown
+    init_conexion_peticion(app)
+
+    # Inicializar rutas
+    init_auth_routes(app)
+    init_spotify_routes(app)
+    init_reviews_routes(app)
+    init_exploration_routes(app)
+    init_usuarios_routes(app)
+    init_canciones_routes(app)
+    init_albumes_routes(app)
+    init_resenas_routes(app)
+    init_listas_routes(app)
+    init_seguimientos_routes(app)
+    init_comunidad_routes(app)
+    init_home_routes(app)
+
+    # 🏠 Rutas básicas
+    @app.route('/')
+    def home():
+        return jsonify({
+            "message": "🎵 Beating API está funcionando",
+            "status": "OK",
+            "cors": "fixed"
+        })
+
+    @app.route('/health')
+    def health_check():
+        return jsonify({
+            "status": "healthy",
+            "server": "running"
+        })
+
+    @app.route('/ready')
+    def readiness_check():
+        """Readiness para el balanceador: modelo, pool de BD y Spotify por separado"""
+        componentes = {
+            "modelo": {
+                "listo": sentiment_analyzer.is_ready(),
+                "estado": sentiment_analyzer.estado
+            },
+            "base_datos": {
+                "listo": db.ping()
+            },
+            "spotify": {
+                "listo": spotify_client.sp_search is not None,
+                "usuario_autenticado": spotify_client.sp_user is not None
+            }
+        }
+        listo = all(c["listo"] for c in componentes.values())
+        return jsonify({
+            "status": "ready" if listo else "not_ready",
+            "componentes": componentes
+        }), 200 if listo else 503
+
+    @app.route('/api/db/estadisticas')
+    def estadisticas_db():
+        """Conexiones en uso / libres y tiempos de espera del pool (para dimensionar pool_max)"""
+        return jsonify(db.estadisticas()), 200
+
+    return app
+
+
+def iniciar_servicios():
+    """
+    Arranque del servidor: migraciones, modelo de sentimientos y worker de pendientes.
+    Una vez por proceso que atiende peticiones (python app.py o wsgi.py).
+    """
+    from database.schema import asegurar_esquema
+    from reviews.pending import pending_worker, async_scoring_enabled
+    from reviews.sentiment import sentiment_analyzer
+
+    # Migraciones idempotentes (columnas nuevas de sentimientos, etc.)
+    asegurar_esquema()
+
+    # Cargar el modelo de sentimientos para que el primer usuario no espere
+    # (con pool de procesos se carga aquí mismo, antes de crear hilos)
+    sentiment_analyzer.warm_up()
+
+    # Worker de sentimientos pendientes (modo de puntuación asíncrona)
+    if async_scoring_enabled():
+        pending_worker.start()
+
+
+# App WSGI sin arrancar servicios (gunicorn/flask run: ver wsgi.py). Los procesos de
+# renderizado (spawn) reimportan este módulo como __mp_main__ y ahí no se crea.
+if __name__ != '__mp_main__':
+    app = create_app()
 
 
 if __name__ == '__main__':
+    # Con debug, el reloader de Werkzeug ejecuta este bloque en el proceso que
+    # vigila los archivos y en el que atiende; los servicios solo en el segundo
+    if not APP_CONFIG['debug'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        iniciar_servicios()
+
+    from database.connection import db
+    from spotify.client import spotify_client
+
     print("🚀 Iniciando servidor Beating...")
     print("=" * 50)
     print(f"📊 Base de datos: {'✅ Conectada' if db.pool else '❌ Error'}")
@@ -84,11 +163,10 @@ if __name__ == '__main__':
     print(f"🔧 Debug: {'✅ Activado' if APP_CONFIG['debug'] else '❌ Desactivado'}")
     print(f"🌐 Servidor corriendo en: http://localhost:{APP_CONFIG['port']}")
     print("=" * 50)
-    
-# En app.py, cambia esta línea:
-app.run(
-    debug=APP_CONFIG['debug'], 
-    port=APP_CONFIG['port'],
-    host='localhost',  # 👈 CAMBIAR a 'localhost'
-    threaded=True
-)
\ No newline at end of file
+
+    app.run(
+        debug=APP_CONFIG['debug'],
+        port=APP_CONFIG['port'],
+        host='localhost',  # 👈 CAMBIAR a 'localhost'
+        threaded=True
+    )
@@ -1,7 +1,7 @@
 from flask import request, jsonify
 import jwt
 import datetime
-from database.connection import db
+from database.request_scope import conexion_peticion
 from config import APP_CONFIG
 
 def init_auth_routes(app):
@@ -16,7 +16,7 @@ def init_auth_routes(app):
             return jsonify({"error": "Faltan datos"}), 400
 
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -28,7 +28,6 @@ def init_auth_routes(app):
             )
             user = cur.fetchone()
             cur.close()
-            db.close_connection(conn)
 
             if user:
                 payload = {
@@ -56,7 +55,7 @@ def init_auth_routes(app):
             return jsonify({"error": "Faltan datos"}), 400
 
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
 
@@ -66,7 +65,6 @@ def init_auth_routes(app):
             cur.execute("SELECT id_usuario FROM usuarios WHERE correo = %s", (correo,))
             if cur.fetchone():
                 cur.close()
-                db.close_connection(conn)
                 return jsonify({"error": "Correo ya registrado"}), 409
 
             # ✅ Insertar nuevo usuario
@@ -79,7 +77,6 @@ def init_auth_routes(app):
 
             # ✅ Cerrar cursor antes de generar token
             cur.close()
-            db.close_connection(conn)
 
             # ✅ Crear token igual que en login
             payload = {
@@ -0,0 +1,108 @@
+"""
+Compara latencia, memoria y concordancia entre los backends de inferencia.
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_backends [--textos 256] [--batch 16]
+
+Cada backend se mide en un subproceso propio para que el pico de memoria
+(RSS máximo) no se contamine con el otro modelo.
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import cargar_resenas
+
+
+MODELO_DEFAULT = "nlptown/bert-base-multilingual-uncased-sentiment"
+
+
+def medir(backend, modelo_nombre, n_textos, batch):
+    # No se importa reviews.sentiment para no cargar otro modelo en este proceso
+    from reviews.backends import BACKENDS
+
+    textos = cargar_resenas(n_textos)
+
+    inicio = time.perf_counter()
+    modelo = BACKENDS[backend](modelo_nombre)
+    carga = time.perf_counter() - inicio
+
+    modelo.predict(textos[:2])  # calentamiento
+
+    latencias_uno = []
+    for texto in textos[:50]:
+        t0 = time.perf_counter()
+        modelo.predict([texto])
+        latencias_uno.append((time.perf_counter() - t0) * 1000)
+
+    resultados = []
+    t0 = time.perf_counter()
+    for i in range(0, len(textos), batch):
+        resultados.extend(modelo.predict(textos[i:i + batch]))
+    total = time.perf_counter() - t0
+
+    latencias_uno.sort()
+    return {
+        'backend': modelo.nombre,
+        'carga_s': round(carga, 2),
+        'latencia_p50_ms': round(statistics.median(latencias_uno), 2),
+        'latencia_p99_ms': round(latencias_uno[int(len(latencias_uno) * 0.99) - 1], 2),
+        'textos_por_s': round(len(textos) / total, 1),
+        'rss_max_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'resultados': [(r['label'], r['score']) for r in resultados],
+    }
+
+
+def comparar(a, b):
+    from reviews.backends import TOLERANCIA_ETIQUETAS, TOLERANCIA_SCORE
+
+    coincidencias = [ra[0] == rb[0] for ra, rb in zip(a['resultados'], b['resultados'])]
+    diferencias = [abs(ra[1] - rb[1]) for ra, rb, ok in zip(a['resultados'], b['resultados'], coincidencias) if ok]
+    concordancia = sum(coincidencias) / len(coincidencias)
+    max_diff = max(diferencias) if diferencias else 0.0
+
+    print(f"\n🎯 Concordancia de etiquetas: {concordancia:.3f} (mínimo {TOLERANCIA_ETIQUETAS})")
+    print(f"📏 Diferencia máxima de score: {max_diff:.4f} (máximo {TOLERANCIA_SCORE})")
+    dentro = concordancia >= TOLERANCIA_ETIQUETAS and max_diff <= TOLERANCIA_SCORE
+    print("✅ Dentro de la tolerancia" if dentro else "❌ Fuera de la tolerancia")
+    return dentro
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=256)
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--modelo', default=MODELO_DEFAULT)
+    parser.add_argument('--backend', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(medir(args.backend, args.modelo, args.textos, args.batch)))
+        return
+
+    mediciones = []
+    for backend in ('transformers', 'onnx'):
+        salida = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_backends', '--backend', backend,
+             '--modelo', args.modelo, '--textos', str(args.textos), '--batch', str(args.batch)],
+            capture_output=True, text=True
+        )
+        if salida.returncode != 0:
+            print(f"❌ Falló el backend {backend}:\n{salida.stderr}")
+            return
+        mediciones.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    print(f"{'backend':<14}{'carga s':>9}{'p50 ms':>9}{'p99 ms':>9}{'textos/s':>10}{'RSS MB':>9}")
+    for m in mediciones:
+        print(f"{m['backend']:<14}{m['carga_s']:>9}{m['latencia_p50_ms']:>9}"
+              f"{m['latencia_p99_ms']:>9}{m['textos_por_s']:>10}{m['rss_max_mb']:>9}")
+
+    comparar(*mediciones)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Evalúa la cascada léxico -> BERT sobre una muestra etiquetada para elegir el umbral.
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_cascada --muestra muestra.csv [--umbrales 0.33,0.5,0.67,0.8]
+
+El CSV debe tener las columnas `texto` y `etiqueta` (positivo/neutral/negativo).
+Sin --muestra se usan reseñas de la base de datos (o de ejemplo) sin etiquetas
+y solo se informa la concordancia con el modelo completo.
+
+Para cada umbral muestra la tasa de escalado al modelo, la concordancia con el
+modelo completo, la exactitud frente a las etiquetas y el CPU ahorrado estimado.
+"""
+import argparse
+import csv
+import time
+
+from benchmarks.corpus import cargar_resenas
+from reviews.lexicon import LexiconClassifier
+from reviews.sentiment import sentiment_analyzer
+
+
+def cargar_muestra(ruta, limite):
+    if not ruta:
+        return cargar_resenas(limite), None
+    with open(ruta, encoding='utf-8', newline='') as f:
+        filas = list(csv.DictReader(f))[:limite]
+    return [fila['texto'] for fila in filas], [fila['etiqueta'].strip().lower() for fila in filas]
+
+
+def exactitud(predichas, etiquetas):
+    return sum(p == e for p, e in zip(predichas, etiquetas)) / len(etiquetas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--muestra', help="CSV con columnas texto,etiqueta")
+    parser.add_argument('--limite', type=int, default=1000)
+    parser.add_argument('--umbrales', default='0.33,0.5,0.67,0.8,1.0')
+    parser.add_argument('--batch', type=int, default=16)
+    args = parser.parse_args()
+
+    textos, etiquetas = cargar_muestra(args.muestra, args.limite)
+    umbrales = [float(u) for u in args.umbrales.split(',')]
+
+    # Referencia: todo por el modelo, sin caché ni cascada
+    sentiment_analyzer.cascade = None
+    sentiment_analyzer.init_analyzer()
+    inicio = time.process_time()
+    modelo = []
+    for i in range(0, len(textos), args.batch):
+        modelo.extend(sentiment_analyzer.analyze_batch(textos[i:i + args.batch], usar_cache=False, estricto=True))
+    cpu_modelo = time.process_time() - inicio
+
+    clasificador = LexiconClassifier()
+    inicio = time.process_time()
+    lexico = [clasificador.classify(texto) for texto in textos]
+    cpu_lexico = time.process_time() - inicio
+
+    print(f"CPU modelo completo: {cpu_modelo:.2f} s | CPU léxico: {cpu_lexico:.3f} s | {len(textos)} textos")
+    if etiquetas:
+        print(f"Exactitud modelo completo: {exactitud([m[0] for m in modelo], etiquetas):.3f}")
+
+    print(f"\n{'umbral':>7}{'escalado':>10}{'concord.':>10}{'exactitud':>11}{'CPU ahorrado':>14}")
+    for umbral in umbrales:
+        cascada = [
+            (lex[0] if lex[2] >= umbral else mod[0])
+            for lex, mod in zip(lexico, modelo)
+        ]
+        escaladas = sum(1 for lex in lexico if lex[2] < umbral)
+        tasa = escaladas / len(textos)
+        concordancia = exactitud(cascada, [m[0] for m in modelo])
+        ahorro = 1 - (cpu_lexico + tasa * cpu_modelo) / cpu_modelo if cpu_modelo else 0.0
+        exact = f"{exactitud(cascada, etiquetas):.3f}" if etiquetas else '-'
+        print(f"{umbral:>7.2f}{tasa:>10.1%}{concordancia:>10.1%}{exact:>11}{ahorro:>14.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Micro-benchmark de la expansión de emojis: un str.replace por emoji
+(implementación anterior) frente a la alternancia compilada de reviews/emojis.py.
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_emojis [--textos 5000] [--repeticiones 5]
+"""
+import argparse
+import timeit
+
+from benchmarks.corpus import cargar_resenas
+from reviews.emojis import EMOJI_MAP, expandir_emojis
+
+
+def expandir_emojis_replace(texto):
+    """Implementación anterior: una pasada completa de str.replace por emoji"""
+    for emoji, descripcion in EMOJI_MAP.items():
+        texto = texto.replace(emoji, f' {descripcion} ')
+    return texto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    textos = cargar_resenas(args.textos)
+    # Mismo resultado salvo en los casos que antes se escapaban ('❤' sin selector, tonos de piel)
+    distintos = sum(1 for t in textos if expandir_emojis(t) != expandir_emojis_replace(t))
+
+    for nombre, funcion in (('str.replace x emoji', expandir_emojis_replace),
+                            ('regex una pasada', expandir_emojis)):
+        tiempo = min(timeit.repeat(lambda: [funcion(t) for t in textos], number=1, repeat=args.repeticiones))
+        print(f"{nombre:<22}{tiempo * 1000:>10.2f} ms  {len(textos) / tiempo:>12.0f} textos/s")
+
+    print(f"Textos con salida distinta: {distintos} de {len(textos)}")
+
+
+if __name__ == '__main__':
+    main()
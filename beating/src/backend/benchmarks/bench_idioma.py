@@ -0,0 +1,49 @@
+"""
+Throughput de la detección de idioma: regex de alternancia recompiladas en cada
+llamada (implementación anterior) frente a reviews/language.py (tokenizar una
+vez y buscar en frozensets).
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_idioma [--textos 5000] [--repeticiones 5]
+"""
+import argparse
+import re
+import timeit
+
+from benchmarks.corpus import cargar_resenas
+from reviews.language import PALABRAS_EN, PALABRAS_ES, detectar_idioma
+
+_ALTERNANCIA_EN = '|'.join(sorted(p for p in PALABRAS_EN if "'" not in p))
+_ALTERNANCIA_ES = '|'.join(sorted(PALABRAS_ES))
+
+
+def detectar_idioma_regex(text):
+    """Implementación anterior: dos lower() y dos alternancias enormes por llamada"""
+    english_chars = len(re.findall(r'[a-zA-Z]', text))
+    spanish_chars = len(re.findall(r'[áéíóúñÁÉÍÓÚÑ]', text))
+    english_words = len(re.findall(r'\b(' + _ALTERNANCIA_EN + r')\b', text.lower()))
+    spanish_words = len(re.findall(r'\b(' + _ALTERNANCIA_ES + r')\b', text.lower()))
+    if english_chars > 0 and (spanish_chars == 0 or english_words > spanish_words):
+        return 'en'
+    return 'es'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    textos = cargar_resenas(args.textos)
+
+    for nombre, funcion in (('regex por llamada', detectar_idioma_regex),
+                            ('tokens + frozenset', lambda t: detectar_idioma(t)[0])):
+        tiempo = min(timeit.repeat(lambda: [funcion(t) for t in textos], number=1, repeat=args.repeticiones))
+        print(f"{nombre:<22}{tiempo * 1000:>10.2f} ms  {len(textos) / tiempo:>12.0f} textos/s")
+
+    coinciden = sum(1 for t in textos if detectar_idioma_regex(t) == detectar_idioma(t)[0])
+    print(f"Coincidencia con la implementación anterior: {coinciden / len(textos):.1%}")
+
+
+if __name__ == '__main__':
+    main()
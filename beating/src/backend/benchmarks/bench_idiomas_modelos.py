@@ -0,0 +1,94 @@
+"""
+Compara, por idioma, el modelo multilingüe único con los modelos por idioma.
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_idiomas_modelos [--muestra muestra.csv]
+        [--es pysentimiento/robertuito-sentiment-analysis]
+        [--en distilbert-base-uncased-finetuned-sst-2-english] [--batch 16]
+
+El CSV debe tener las columnas `texto` y `etiqueta` (positivo/neutral/negativo).
+Sin --muestra se usan reseñas de la base de datos (o de ejemplo) y solo se
+informa la concordancia con el modelo multilingüe.
+
+Los textos se reparten con el mismo detector y umbral de confianza que usa
+SentimentAnalyzer; los de idioma dudoso no aparecen en la comparación porque
+en producción siguen yendo al multilingüe.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_backends import MODELO_DEFAULT
+from benchmarks.bench_cascada import cargar_muestra, exactitud
+from reviews.backends import cargar_backend
+from reviews.emojis import expandir_emojis
+from reviews.labels import etiquetar_probabilidades
+from reviews.language import detectar_idioma
+
+
+def medir(modelo, textos, batch):
+    """Latencia p50 de un texto suelto, textos/s en lotes y etiquetas"""
+    modelo.predict_proba(textos[:2])  # calentamiento
+
+    latencias = []
+    for texto in textos[:50]:
+        t0 = time.perf_counter()
+        modelo.predict_proba([texto])
+        latencias.append((time.perf_counter() - t0) * 1000)
+
+    etiquetas = []
+    t0 = time.perf_counter()
+    for i in range(0, len(textos), batch):
+        etiquetas.extend(etiquetar_probabilidades(list(fila))[0]
+                         for fila in modelo.predict_proba(textos[i:i + batch]))
+    total = time.perf_counter() - t0
+
+    return {
+        'latencia_p50_ms': statistics.median(latencias),
+        'textos_por_s': len(textos) / total,
+        'etiquetas': etiquetas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--muestra', help="CSV con columnas texto,etiqueta")
+    parser.add_argument('--limite', type=int, default=1000)
+    parser.add_argument('--modelo', default=MODELO_DEFAULT, help="Modelo multilingüe de referencia")
+    parser.add_argument('--es', default='pysentimiento/robertuito-sentiment-analysis')
+    parser.add_argument('--en', default='distilbert-base-uncased-finetuned-sst-2-english')
+    parser.add_argument('--confianza', type=float, default=0.5)
+    parser.add_argument('--backend', default='transformers')
+    parser.add_argument('--batch', type=int, default=16)
+    args = parser.parse_args()
+
+    textos, etiquetas = cargar_muestra(args.muestra, args.limite)
+    grupos = {'es': [], 'en': []}
+    for i, texto in enumerate(textos):
+        idioma, confianza = detectar_idioma(texto)
+        if confianza >= args.confianza:
+            grupos[idioma].append(i)
+    dudosos = len(textos) - sum(len(indices) for indices in grupos.values())
+    print(f"{len(textos)} textos: {len(grupos['es'])} es, {len(grupos['en'])} en, {dudosos} dudosos (multilingüe)")
+
+    multilingue = cargar_backend(args.backend, args.modelo)
+    por_idioma = {'es': args.es, 'en': args.en}
+
+    print(f"\n{'idioma':<7}{'modelo':<52}{'p50 ms':>9}{'textos/s':>10}{'concord.':>10}{'exactitud':>11}")
+    for idioma, indices in grupos.items():
+        if not indices:
+            continue
+        procesados = [expandir_emojis(textos[i]) for i in indices]
+        referencia = medir(multilingue, procesados, args.batch)
+        especifico = medir(cargar_backend(args.backend, por_idioma[idioma]), procesados, args.batch)
+        esperadas = [etiquetas[i] for i in indices] if etiquetas else None
+
+        for nombre, resultado in ((args.modelo, referencia), (por_idioma[idioma], especifico)):
+            concordancia = exactitud(resultado['etiquetas'], referencia['etiquetas'])
+            exact = f"{exactitud(resultado['etiquetas'], esperadas):.3f}" if esperadas else '-'
+            print(f"{idioma:<7}{nombre[:50]:<52}{resultado['latencia_p50_ms']:>9.2f}"
+                  f"{resultado['textos_por_s']:>10.1f}{concordancia:>10.1%}{exact:>11}")
+
+
+if __name__ == '__main__':
+    main()
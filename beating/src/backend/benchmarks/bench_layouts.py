@@ -0,0 +1,68 @@
+"""
+Nube de palabras con y sin la caché de layouts de reviews/charts.py: layout
+completo, mismas frecuencias (acierto), una reseña más (acierto solo si los
+pesos redondeados no cambian) y una palabra nueva en el top (layout completo).
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_layouts [--textos 2000] [--repeticiones 5]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_render import frecuencias_corpus
+from reviews.charts import CacheLayouts, generar_wordcloud_beating
+import reviews.charts as charts
+
+
+def medir(frecuencias, repeticiones, preparar=None):
+    muestras = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        generar_wordcloud_beating(frecuencias)
+        muestras.append(time.perf_counter() - inicio)
+    return statistics.median(muestras)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=2000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    base = frecuencias_corpus(args.textos)
+    palabras = list(base)
+    # Una reseña más: suben un par de términos que ya estaban en el top
+    una_mas = dict(base)
+    for palabra in palabras[len(palabras) // 2:len(palabras) // 2 + 2]:
+        una_mas[palabra] += 1
+    # Un término nuevo entra con fuerza en el top
+    palabra_nueva = {**base, 'nostalgiaazul': max(base.values())}
+
+    def cache_vacia():
+        charts.layouts = CacheLayouts()
+
+    def solo_base():
+        # Cada repetición parte de una caché con el layout base solamente
+        cache_vacia()
+        generar_wordcloud_beating(base)
+
+    casos = [
+        ('sin caché (layout completo)', base, cache_vacia),
+        ('mismas frecuencias', base, solo_base),
+        ('una reseña más', una_mas, solo_base),
+        ('palabra nueva en el top', palabra_nueva, solo_base),
+    ]
+
+    print(f"{len(base)} términos, mediana de {args.repeticiones} repeticiones\n")
+    for nombre, frecuencias, preparar in casos:
+        tiempo = medir(frecuencias, args.repeticiones, preparar)
+        stats = charts.layouts.estadisticas()
+        camino = 'acierto' if stats['aciertos'] else 'layout completo'
+        print(f"{nombre:<32}{tiempo * 1000:>10.1f} ms   ({camino})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark de la moderación: una regex compilada por grosería y por llamada
+(implementación anterior, censurar_texto + detectar_groserias) frente a la
+alternancia única de reviews/moderation.py.
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_moderacion [--textos 20000] [--repeticiones 3]
+"""
+import argparse
+import re
+import timeit
+
+from benchmarks.corpus import cargar_resenas
+from reviews.moderation import GROSERIAS, moderador
+
+# Algunas reseñas con groserías para que el camino de censura también se mida
+CON_GROSERIAS = [
+    "Qué mierda de canción, el coro es una puta maravilla",
+    "This shit is FUCKING good, damn",
+    "El pendejo del productor arruinó el álbum, joder",
+]
+
+
+def moderar_por_palabra(texto):
+    """Implementación anterior: dos recorridos por grosería, regex compilada en cada llamada"""
+    texto_censurado = texto
+    for groseria in GROSERIAS:
+        patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
+        texto_censurado = patron.sub('*' * len(groseria), texto_censurado)
+    encontradas = []
+    for groseria in GROSERIAS:
+        patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
+        if patron.search(texto):
+            encontradas.append(groseria)
+    return texto_censurado, len(encontradas), sorted(encontradas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=20000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    textos = cargar_resenas(args.textos)
+    textos = [CON_GROSERIAS[i % len(CON_GROSERIAS)] if i % 10 == 0 else t for i, t in enumerate(textos)]
+
+    distintos = sum(1 for t in textos if moderador.moderar(t) != moderar_por_palabra(t))
+
+    tiempos = {}
+    for nombre, funcion in (('regex por palabra', moderar_por_palabra),
+                            ('alternancia única', moderador.moderar)):
+        tiempo = min(timeit.repeat(lambda: [funcion(t) for t in textos], number=1, repeat=args.repeticiones))
+        tiempos[nombre] = tiempo
+        print(f"{nombre:<20}{tiempo * 1000:>10.1f} ms  {len(textos) / tiempo:>12.0f} textos/s")
+
+    print(f"Aceleración: {tiempos['regex por palabra'] / tiempos['alternancia única']:.1f}x")
+    print(f"Textos con salida distinta: {distintos} de {len(textos)}")
+
+
+if __name__ == '__main__':
+    main()
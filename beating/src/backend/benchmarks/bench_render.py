@@ -0,0 +1,173 @@
+"""
+Latencia por gráfica y pico de memoria del renderizado: matplotlib
+(implementación anterior: Figure + FigureCanvasAgg, imshow/savefig para la
+nube) frente a reviews/charts.py (WordCloud.to_image y plantillas SVG).
+
+Cada implementación corre en un proceso nuevo para que el tiempo de importación
+y el RSS máximo (ru_maxrss) no se mezclen.
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_render [--textos 2000] [--repeticiones 5]
+"""
+import argparse
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from collections import Counter
+from io import BytesIO
+
+from benchmarks.corpus import cargar_resenas
+
+SENTIMIENTOS = [
+    {'etiqueta': 'positivo', 'cantidad': 412},
+    {'etiqueta': 'neutral', 'cantidad': 150},
+    {'etiqueta': 'negativo', 'cantidad': 97},
+]
+
+TOP_CANCIONES = [
+    {'titulo': f"Canción {i}", 'artista': f"Artista {i % 4}", 'puntuacion': 0.95 - i * 0.09}
+    for i in range(10)
+]
+
+
+def frecuencias_corpus(limite):
+    """{término: frecuencia} aproximado a partir del corpus (sin spaCy ni base de datos)"""
+    from reviews.language import tokenizar
+    from wordcloud import STOPWORDS
+
+    conteo = Counter(
+        token for texto in cargar_resenas(limite) for token in tokenizar(texto)
+        if token.isalpha() and len(token) >= 4 and token not in STOPWORDS
+    )
+    return dict(conteo.most_common(200))
+
+
+def renderizadores_matplotlib():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from wordcloud import WordCloud
+    from reviews.charts import COLORES_SENTIMIENTO, FONDO, ROSA, _color_puntuacion, color_func_beating
+
+    def figura(figsize):
+        fig = Figure(figsize=figsize, facecolor=FONDO)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def a_png(fig, dpi=100, **opciones):
+        img = BytesIO()
+        fig.savefig(img, format='PNG', bbox_inches='tight', dpi=dpi, facecolor=FONDO, **opciones)
+        return img.getvalue()
+
+    def wordcloud(frecuencias):
+        nube = WordCloud(
+            width=800, height=500, background_color=FONDO, color_func=color_func_beating,
+            max_words=80, relative_scaling=0.8, prefer_horizontal=0.8, scale=1.5,
+            min_font_size=14, max_font_size=120, collocations=False, random_state=42, margin=1
+        ).generate_from_frequencies(frecuencias)
+        fig = figura((12, 8))
+        ax = fig.add_subplot()
+        ax.imshow(nube, interpolation='bilinear')
+        ax.axis('off')
+        fig.tight_layout(pad=0)
+        fig.text(0.5, 0.95, 'Tus Emociones Musicales', ha='center', va='top',
+                 fontsize=20, color='white', fontweight='bold',
+                 bbox=dict(boxstyle="round,pad=0.4", facecolor=ROSA, alpha=0.8))
+        return a_png(fig, dpi=120, pad_inches=0)
+
+    def sentimientos(datos):
+        fig = figura((10, 8))
+        ax = fig.add_subplot()
+        ax.set_facecolor(FONDO)
+        ax.pie([d['cantidad'] for d in datos], labels=[d['etiqueta'].capitalize() for d in datos],
+               colors=[COLORES_SENTIMIENTO[d['etiqueta']] for d in datos], autopct='%1.1f%%',
+               startangle=90, shadow=True, explode=[0.05] * len(datos), textprops={'fontsize': 12})
+        ax.set_title('Distribución de Sentimientos', fontsize=18, fontweight='bold', color='white', pad=20)
+        return a_png(fig)
+
+    def top_canciones(datos):
+        fig = figura((14, 10))
+        ax = fig.add_subplot()
+        puntuaciones = [d['puntuacion'] for d in datos]
+        barras = ax.barh([f"{d['titulo']}\n{d['artista']}" for d in datos], puntuaciones,
+                         color=[_color_puntuacion(p) for p in puntuaciones], height=0.7, alpha=0.9,
+                         edgecolor='white', linewidth=1)
+        ax.invert_yaxis()
+        ax.set_title('Top Canciones Mejor Calificadas', fontsize=20, fontweight='bold', color='white', pad=30)
+        ax.set_xlabel('Puntuación Promedio', fontsize=14, color='white', fontweight='bold')
+        ax.set_facecolor(FONDO)
+        ax.tick_params(colors='white', labelsize=12)
+        for barra in barras:
+            ax.text(barra.get_width() + 0.01, barra.get_y() + barra.get_height() / 2, f'{barra.get_width():.2f}',
+                    ha='left', va='center', color='white', fontweight='bold', fontsize=11,
+                    bbox=dict(boxstyle="round,pad=0.3", facecolor=FONDO, alpha=0.9, edgecolor=ROSA))
+        ax.grid(axis='x', alpha=0.2, color=ROSA, linestyle='--')
+        ax.set_xlim(0, max(puntuaciones) * 1.15)
+        fig.tight_layout()
+        return a_png(fig)
+
+    return {'sentiment_dist': sentimientos, 'top_songs': top_canciones, 'wordcloud': wordcloud}
+
+
+def renderizadores_ligeros():
+    from reviews.charts import (generar_grafico_sentimientos_beating, generar_grafico_top_canciones_beating,
+                                generar_wordcloud_beating)
+    return {
+        'sentiment_dist': generar_grafico_sentimientos_beating,
+        'top_songs': generar_grafico_top_canciones_beating,
+        'wordcloud': generar_wordcloud_beating,
+    }
+
+
+def medir(nombre, frecuencias, repeticiones, resultados):
+    """Se ejecuta en un proceso nuevo: importación, renderizado y RSS máximo"""
+    inicio = time.perf_counter()
+    renderizadores = renderizadores_matplotlib() if nombre == 'matplotlib' else renderizadores_ligeros()
+    importacion = time.perf_counter() - inicio
+
+    datos = {'sentiment_dist': SENTIMIENTOS, 'top_songs': TOP_CANCIONES, 'wordcloud': frecuencias}
+    tiempos = {}
+    tamanos = {}
+    for grafica, funcion in renderizadores.items():
+        muestras = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            salida = funcion(datos[grafica])
+            muestras.append(time.perf_counter() - inicio)
+        tiempos[grafica] = statistics.median(muestras)
+        tamanos[grafica] = len(salida)
+
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    resultados.put((nombre, importacion, tiempos, tamanos, rss))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=2000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    frecuencias = frecuencias_corpus(args.textos)
+    print(f"{len(frecuencias)} términos distintos, mediana de {args.repeticiones} repeticiones\n")
+
+    contexto = multiprocessing.get_context('spawn')
+    resultados = contexto.Queue()
+    print(f"{'':<12}{'import':>10}{'sentimientos':>15}{'top canciones':>15}{'nube':>12}{'RSS máx':>12}")
+    for nombre in ('matplotlib', 'ligero'):
+        proceso = contexto.Process(target=medir, args=(nombre, frecuencias, args.repeticiones, resultados))
+        proceso.start()
+        nombre, importacion, tiempos, tamanos, rss = resultados.get()
+        proceso.join()
+        print(f"{nombre:<12}{importacion * 1000:>8.0f}ms"
+              f"{tiempos['sentiment_dist'] * 1000:>13.1f}ms"
+              f"{tiempos['top_songs'] * 1000:>13.1f}ms"
+              f"{tiempos['wordcloud'] * 1000:>10.0f}ms"
+              f"{rss:>9.0f} MB")
+        print(f"{'':<12}{'bytes':>10}{tamanos['sentiment_dist']:>15}{tamanos['top_songs']:>15}"
+              f"{tamanos['wordcloud']:>12}")
+
+
+if __name__ == '__main__':
+    main()
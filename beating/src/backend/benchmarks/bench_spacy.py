@@ -0,0 +1,50 @@
+"""
+Documentos/s de la extracción de términos con spaCy: pipeline completo sobre
+todas las reseñas unidas en un solo texto (implementación anterior) frente a
+nlp.pipe por reseña sin parser ni NER (reviews/terms.py).
+
+Uso (desde src/backend):
+    python -m benchmarks.bench_spacy [--textos 2000] [--batches 16,64,256] [--procesos 1,2]
+"""
+import argparse
+import time
+from collections import Counter
+
+import spacy
+
+from benchmarks.corpus import cargar_resenas
+from reviews.terms import COMPONENTES_EXCLUIDOS, _terminos_doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=2000)
+    parser.add_argument('--batches', default='16,64,256')
+    parser.add_argument('--procesos', default='1,2')
+    args = parser.parse_args()
+
+    # Solo la parte en español: las reseñas en inglés no pasan por spaCy en ningún caso
+    textos = cargar_resenas(args.textos)
+
+    completo = spacy.load("es_core_news_sm")
+    completo.max_length = max(completo.max_length, sum(len(t) + 1 for t in textos))
+    inicio = time.perf_counter()
+    referencia = _terminos_doc(completo(" ".join(textos)))
+    tiempo = time.perf_counter() - inicio
+    print(f"{'texto unido, pipeline completo':<40}{len(textos) / tiempo:>10.1f} docs/s")
+
+    recortado = spacy.load("es_core_news_sm", exclude=COMPONENTES_EXCLUIDOS)
+    for procesos in (int(p) for p in args.procesos.split(',')):
+        for batch in (int(b) for b in args.batches.split(',')):
+            inicio = time.perf_counter()
+            total = Counter()
+            for doc in recortado.pipe(textos, batch_size=batch, n_process=procesos):
+                total.update(_terminos_doc(doc))
+            tiempo = time.perf_counter() - inicio
+            comunes = sum((total & referencia).values()) / max(1, sum(referencia.values()))
+            print(f"{f'nlp.pipe batch={batch} procesos={procesos}':<40}{len(textos) / tiempo:>10.1f} docs/s"
+                  f"  términos coincidentes {comunes:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Corpus de reseñas para los benchmarks (base de datos o ejemplos incluidos)"""
+
+RESENAS_EJEMPLO = [
+    "Me encantó esta canción, la melodía es increíble y la voz es preciosa 😍🔥",
+    "Un álbum muy aburrido, todas las canciones suenan igual 😴",
+    "This album is a masterpiece, every track is better than the last ❤️",
+    "No me gustó para nada, la letra es mala y el ritmo es repetitivo 👎",
+    "Está bien, nada especial pero se deja escuchar",
+    "The production is muddy and the vocals are off key, really disappointing",
+    "La mejor canción del año sin duda 💯🎶",
+    "I think it's okay, some good songs and some bad ones 🤔",
+    "Qué decepción, esperaba mucho más de este artista 💔",
+    "Brutal, la escucho todos los días en el gym 🤘🔥",
+    "Honestly one of the most boring records I have heard in years 😴👎",
+    "La canción tiene un coro muy pegadizo y una producción impecable ✨",
+    "Not bad, not great. The second half of the album is stronger.",
+    "Me hace llorar cada vez que la escucho 😭 pero de lo bonita que es ❤️",
+    "Horrible, no entiendo cómo tiene tantas reproducciones 🤮",
+    "Great vibes, perfect for a road trip with friends 🎧🙌",
+]
+
+
+def cargar_resenas(limite=2000):
+    """Carga textos de reseñas reales; si no hay base de datos usa los ejemplos"""
+    try:
+        from database.connection import db
+        conn = db.get_connection()
+    except Exception as e:
+        print(f"⚠️ Sin base de datos ({e}), usando reseñas de ejemplo")
+        conn = None
+
+    if conn:
+        cur = None
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT texto_resena FROM resenas WHERE texto_resena IS NOT NULL LIMIT %s", (limite,))
+            textos = [fila[0] for fila in cur.fetchall()]
+            if textos:
+                return textos
+        except Exception as e:
+            print(f"⚠️ Error leyendo reseñas ({e}), usando reseñas de ejemplo")
+        finally:
+            if cur:
+                cur.close()
+            db.close_connection(conn)
+
+    repeticiones = max(1, limite // len(RESENAS_EJEMPLO))
+    return (RESENAS_EJEMPLO * repeticiones)[:limite]
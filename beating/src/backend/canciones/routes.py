@@ -1,5 +1,5 @@
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
 from spotify.client import spotify_client 
 from collections import Counter 
 
@@ -7,10 +7,9 @@ def init_canciones_routes(app):
     
     @app.route('/api/canciones', methods=['GET'])
     def get_canciones():
-        conn = None
         cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -43,15 +42,12 @@ def init_canciones_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/canciones/<int:id_cancion>', methods=['GET'])
     def get_cancion(id_cancion):
-        conn = None
         cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -118,8 +114,6 @@ def init_canciones_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/canciones', methods=['POST'])
     def create_cancion():
@@ -135,7 +129,7 @@ def init_canciones_routes(app):
             if not titulo or not artista:
                 return jsonify({'error': 'Título y artista son obligatorios'}), 400
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -163,8 +157,6 @@ def init_canciones_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/canciones/buscar', methods=['GET'])
     def buscar_canciones():
@@ -220,9 +212,10 @@ def init_canciones_routes(app):
                         'palabras_clave': []
                     }
                     
-                    # Verificar si existe en nuestra base de datos
-                    conn = db.get_connection()
+                    # Verificar si existe en nuestra base de datos (misma conexión para toda la petición)
+                    conn = conexion_peticion()
                     if conn:
+                        cur = None
                         try:
                             cur = conn.cursor()
                             
@@ -275,13 +268,12 @@ def init_canciones_routes(app):
                                     'usuario': r[2],
                                     'puntuacion': float(r[3]) if r[3] else None
                                 } for r in reseñas_recientes]
-                                
-                            cur.close()
                             
                         except Exception as db_error:
                             print(f"❌ Error en consulta BD para {cancion_info['titulo']}: {db_error}")
                         finally:
-                            db.close_connection(conn)
+                            if cur:
+                                cur.close()
                     
                     canciones_spotify.append(cancion_info)
                     
@@ -312,7 +304,7 @@ def init_canciones_routes(app):
             if not titulo or not artista:
                 return jsonify({'error': 'Título y artista son obligatorios'}), 400
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -357,8 +349,6 @@ def init_canciones_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     # Función auxiliar para extraer palabras clave
     def extraer_palabras_clave(conn, id_cancion):
@@ -400,8 +390,6 @@ def init_canciones_routes(app):
     @app.route('/canciones-artista', methods=['GET'])
     def get_artist_tracks():
         """Obtiene las canciones populares de un artista desde Spotify"""
-        conn = None
-        cur = None
         try:
             artist_id = request.args.get('id', '').strip()
             if not artist_id:
@@ -448,9 +436,10 @@ def init_canciones_routes(app):
                         'spotify_url': track['external_urls']['spotify']
                     }
                     
-                    # Verificar si existe en nuestra base de datos
-                    conn = db.get_connection()
+                    # Verificar si existe en nuestra base de datos (misma conexión para toda la petición)
+                    conn = conexion_peticion()
                     if conn:
+                        cur = None
                         try:
                             cur = conn.cursor()
                             cur.execute("""
@@ -475,13 +464,12 @@ def init_canciones_routes(app):
                             else:
                                 track_info['exists_in_db'] = False
                                 track_info['review_count'] = 0
-                                
-                            cur.close()
                             
                         except Exception as db_error:
                             print(f"Error en consulta BD: {db_error}")
                         finally:
-                            db.close_connection(conn)
+                            if cur:
+                                cur.close()
                     
                     artist_tracks.append(track_info)
                     
@@ -507,9 +495,4 @@ def init_canciones_routes(app):
             print(f"❌ ERROR en /canciones-artista: {e}")
             import traceback
             traceback.print_exc()
-            return jsonify({'error': 'Error interno del servidor'}), 500
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+            return jsonify({'error': 'Error interno del servidor'}), 500
\ No newline at end of file
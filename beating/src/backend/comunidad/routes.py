@@ -1,11 +1,11 @@
 from flask import jsonify, request
-from database.connection import db
+from database.request_scope import conexion_peticion
 
 def init_comunidad_routes(app):
     
     @app.route('/comunidad', methods=['GET'])
     def get_community_users():
-        conn = db.get_connection()
+        conn = conexion_peticion()
         cur = None 
         
         if not conn:
@@ -87,6 +87,4 @@ def init_comunidad_routes(app):
             }), 500
         finally:
             if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+                cur.close()
\ No newline at end of file
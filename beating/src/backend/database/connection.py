@@ -1,40 +1,252 @@
+"""
+Pool de conexiones PostgreSQL para el servidor con hilos (threaded=True).
+
+- Seguro entre hilos: una Condition protege las conexiones libres y las prestadas.
+- Si no hay conexiones libres y ya se llegó a `pool_max`, se espera en cola como
+  mucho `pool_timeout` segundos; al agotarse devuelve None (los llamadores ya
+  tratan None como error de conexión) en lugar de abrir conexiones sin pool.
+- Al prestar una conexión se descarta si está cerrada o rota, y si llevaba más
+  de `pool_ping_inactiva` segundos sin usarse se comprueba con SELECT 1.
+- Las conexiones con más de `pool_max_vida` segundos se cierran al devolverlas;
+  las demás vuelven sin transacción abierta y con la sesión por defecto.
+- Al arrancar se abren `pool_min` conexiones.
+- `estadisticas()` da en uso / libres / esperas para dimensionar `pool_max`.
+"""
+import threading
+import time
+from collections import deque
+
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extensions
 from config import DATABASE_CONFIG
 
+
 class Database:
-    def __init__(self):
-        self.pool = None
+    def __init__(self, dsn=None, minconn=None, maxconn=None, timeout=None, max_vida=None, ping_inactiva=None):
+        self.dsn = dsn or DATABASE_CONFIG['dsn']
+        self.minconn = DATABASE_CONFIG.get('pool_min', 1) if minconn is None else minconn
+        self.maxconn = DATABASE_CONFIG.get('pool_max', 20) if maxconn is None else maxconn
+        self.timeout = DATABASE_CONFIG.get('pool_timeout', 10.0) if timeout is None else timeout
+        self.max_vida = DATABASE_CONFIG.get('pool_max_vida', 1800.0) if max_vida is None else max_vida
+        self.ping_inactiva = DATABASE_CONFIG.get('pool_ping_inactiva', 30.0) if ping_inactiva is None else ping_inactiva
+
+        self._condicion = threading.Condition()
+        self._libres = deque()     # (conexión, creada_en, devuelta_en)
+        self._prestadas = {}       # id(conexión) -> (conexión, creada_en, prestada_en)
+        self._abriendo = 0         # abriéndose: cuentan para pool_max hasta estar prestadas
+        self._validando = 0        # sacadas de _libres y comprobándose (_viva), ídem
+        self._esperando = 0
+        self._esperas = deque(maxlen=1000)
+        self._stats = {
+            'prestamos': 0, 'esperas': 0, 'timeouts': 0, 'creadas': 0,
+            'recicladas': 0, 'descartadas': 0, 'errores_conexion': 0,
+            'espera_total': 0.0, 'espera_max': 0.0,
+        }
         self.init_pool()
-    
+
+    @property
+    def pool(self):
+        """Compatibilidad: verdadero si el pool tiene (o pudo abrir) conexiones"""
+        with self._condicion:
+            return bool(self._libres or self._prestadas)
+
     def init_pool(self):
+        """Abre `pool_min` conexiones por adelantado"""
+        abiertas = 0
+        for _ in range(self.minconn):
+            conn = self._abrir()
+            if conn is None:
+                break
+            with self._condicion:
+                self._libres.append((conn, time.monotonic(), time.monotonic()))
+                self._condicion.notify()
+            abiertas += 1
+        if abiertas:
+            print(f"✅ Pool de conexiones PostgreSQL creado exitosamente ({abiertas}/{self.maxconn})")
+        else:
+            print("❌ Error creando pool de conexiones: no se pudo abrir ninguna conexión")
+
+    def _abrir(self):
         try:
-            self.pool = psycopg2.pool.SimpleConnectionPool(
-                DATABASE_CONFIG['pool_min'],
-                DATABASE_CONFIG['pool_max'],
-                DATABASE_CONFIG['dsn']
-            )
-            print("✅ Pool de conexiones PostgreSQL creado exitosamente")
+            conn = psycopg2.connect(self.dsn)
         except Exception as e:
-            print(f"❌ Error creando pool de conexiones: {e}")
-            self.pool = None
-    
-    def get_connection(self):
-        if self.pool:
-            return self.pool.getconn()
-        else:
-            try:
-                return psycopg2.connect(DATABASE_CONFIG['dsn'])
-            except Exception as e:
-                print(f"❌ Error de conexión directa: {e}")
-                return None
-    
+            print(f"❌ Error de conexión: {e}")
+            with self._condicion:
+                self._stats['errores_conexion'] += 1
+            return None
+        with self._condicion:
+            self._stats['creadas'] += 1
+        return conn
+
+    def _cerrar(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _viva(self, conn, devuelta_en):
+        """Comprobación al prestar: barata siempre, SELECT 1 si llevaba tiempo inactiva"""
+        if conn.closed or conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - devuelta_en < self.ping_inactiva:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def get_connection(self, timeout=None):
+        """
+        Presta una conexión; espera como mucho `timeout` segundos (por defecto
+        `pool_timeout`) si el pool está lleno. Devuelve None si no se consigue.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        inicio = time.monotonic()
+        limite = inicio + timeout
+        espero = False
+
+        while True:
+            with self._condicion:
+                while not self._libres and self._ocupadas() >= self.maxconn:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        self._stats['timeouts'] += 1
+                        print(f"⚠️ Pool de conexiones agotado: {self.maxconn} en uso tras esperar {timeout}s")
+                        return None
+                    espero = True
+                    self._esperando += 1
+                    try:
+                        self._condicion.wait(restante)
+                    finally:
+                        self._esperando -= 1
+
+                if self._libres:
+                    # LIFO: la más reciente es la que menos probabilidades tiene de estar caída
+                    conn, creada_en, devuelta_en = self._libres.pop()
+                    nueva = False
+                    self._validando += 1
+                else:
+                    conn = None
+                    nueva = True
+                    self._abriendo += 1
+
+            # Fuera del lock, pero la conexión sigue contando (_abriendo / _validando)
+            # hasta que pasa a _prestadas o se descarta: nunca hay más de pool_max
+            if nueva:
+                conn = self._abrir()
+                creada_en = time.monotonic()
+                if conn is None:
+                    with self._condicion:
+                        self._abriendo -= 1
+                        self._condicion.notify()
+                    return None
+            elif not self._viva(conn, devuelta_en):
+                self._cerrar(conn)
+                with self._condicion:
+                    self._validando -= 1
+                    self._stats['descartadas'] += 1
+                    self._condicion.notify()
+                continue
+
+            ahora = time.monotonic()
+            espera = ahora - inicio
+            with self._condicion:
+                if nueva:
+                    self._abriendo -= 1
+                else:
+                    self._validando -= 1
+                self._prestadas[id(conn)] = (conn, creada_en, ahora)
+                self._stats['prestamos'] += 1
+                if espero:
+                    self._stats['esperas'] += 1
+                    self._stats['espera_total'] += espera
+                    self._stats['espera_max'] = max(self._stats['espera_max'], espera)
+                self._esperas.append(espera)
+            return conn
+
+    def _ocupadas(self):
+        """Conexiones que cuentan para pool_max sin estar libres (llamar con el lock)"""
+        return len(self._prestadas) + self._abriendo + self._validando
+
+    def ping(self):
+        """Comprueba que el pool entregue una conexión válida"""
+        conn = self.get_connection(timeout=min(self.timeout, 2.0))
+        if conn is None:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            print(f"❌ Ping a la base de datos fallido: {e}")
+            return False
+        finally:
+            self.close_connection(conn)
+
     def close_connection(self, conn):
-        if conn:
-            if self.pool:
-                self.pool.putconn(conn)
+        """Devuelve la conexión al pool (o la cierra si está rota o es demasiado vieja)"""
+        if not conn:
+            return
+        with self._condicion:
+            prestada = self._prestadas.pop(id(conn), None)
+        if prestada is None:
+            with self._condicion:
+                devuelta = any(libre is conn for libre, _, _ in self._libres)
+            if not devuelta:
+                # No viene de este pool
+                self._cerrar(conn)
+            return
+
+        _, creada_en, _ = prestada
+        reutilizable = not conn.closed
+        if reutilizable:
+            try:
+                estado = conn.info.transaction_status
+                if estado == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    reutilizable = False
+                elif estado != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit or conn.readonly:
+                    # Sesión por defecto para el siguiente (ver database/request_scope.py)
+                    conn.set_session(readonly='default', autocommit=False)
+            except Exception:
+                reutilizable = False
+
+        ahora = time.monotonic()
+        reciclar = reutilizable and ahora - creada_en > self.max_vida
+        if not reutilizable or reciclar:
+            self._cerrar(conn)
+        with self._condicion:
+            if reutilizable and not reciclar:
+                self._libres.append((conn, creada_en, ahora))
+            elif reciclar:
+                self._stats['recicladas'] += 1
             else:
-                conn.close()
+                self._stats['descartadas'] += 1
+            self._condicion.notify()
+
+    def estadisticas(self):
+        with self._condicion:
+            esperas = sorted(self._esperas)
+            p95 = esperas[int(len(esperas) * 0.95)] if esperas else 0.0
+            return {
+                'en_uso': len(self._prestadas),
+                'libres': len(self._libres),
+                'abriendo': self._abriendo,
+                'validando': self._validando,
+                'esperando': self._esperando,
+                'pool_min': self.minconn,
+                'pool_max': self.maxconn,
+                'uso_mas_largo': max((time.monotonic() - p for _, _, p in self._prestadas.values()), default=0.0),
+                'espera_p95': p95,
+                'espera_media': self._stats['espera_total'] / self._stats['esperas'] if self._stats['esperas'] else 0.0,
+                **self._stats,
+            }
+
 
 # Instancia global de la base de datos
-db = Database()
\ No newline at end of file
+db = Database()
@@ -0,0 +1,75 @@
+"""
+Conexión de base de datos ligada a la petición de Flask.
+
+La primera llamada a `conexion_peticion()` dentro de una petición presta una
+conexión del pool y la guarda en `g`; las siguientes (desde la ruta o desde sus
+funciones auxiliares) reutilizan la misma. Se devuelve siempre al pool en el
+teardown de la petición, haya error o no.
+
+En las peticiones GET/HEAD la conexión va en modo solo lectura con autocommit:
+no deja transacciones abiertas mientras la ruta espera a Spotify, y un error en
+una consulta no invalida las siguientes.
+
+    conn = conexion_peticion()
+    with cursor_peticion() as cur:
+        cur.execute(...)
+
+Las rutas no llaman a db.get_connection(); solo lo hace el código que corre
+fuera de una petición (workers, CLIs, la reconstrucción en segundo plano de
+/analisis-resenas) y el que devuelve la conexión antes de un paso lento
+(renderizar una nube, crear la playlist en Spotify).
+"""
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+from database.connection import db
+
+METODOS_SOLO_LECTURA = ('GET', 'HEAD')
+
+
+def conexion_peticion(solo_lectura=None):
+    """
+    Conexión de la petición actual (None si no hay conexión disponible).
+    `solo_lectura` por defecto depende del método HTTP; solo se aplica al prestarla.
+    """
+    conn = g.get('_conexion_bd')
+    if conn is not None:
+        return conn
+
+    conn = db.get_connection()
+    if conn is None:
+        return None
+    if solo_lectura is None:
+        solo_lectura = has_request_context() and request.method in METODOS_SOLO_LECTURA
+    if solo_lectura:
+        try:
+            conn.set_session(readonly=True, autocommit=True)
+        except Exception as e:
+            print(f"⚠️ No se pudo poner la conexión en solo lectura: {e}")
+    g._conexion_bd = conn
+    return conn
+
+
+@contextmanager
+def cursor_peticion(solo_lectura=None):
+    """Cursor sobre la conexión de la petición; se cierra al salir del bloque"""
+    conn = conexion_peticion(solo_lectura)
+    if conn is None:
+        raise RuntimeError("Error de conexión a la base de datos")
+    cur = conn.cursor()
+    try:
+        yield cur
+    finally:
+        cur.close()
+
+
+def devolver_conexion_peticion(excepcion=None):
+    conn = g.pop('_conexion_bd', None)
+    if conn is not None:
+        # close_connection hace rollback si quedó una transacción abierta y restaura la sesión
+        db.close_connection(conn)
+
+
+def init_conexion_peticion(app):
+    app.teardown_appcontext(devolver_conexion_peticion)
@@ -0,0 +1,54 @@
+from database.connection import db
+
+# Cambios de esquema idempotentes que necesita el backend sobre las tablas base
+MIGRACIONES = [
+    "ALTER TABLE sentimientos ADD COLUMN IF NOT EXISTS modelo_version TEXT",
+    # Distribución completa de 1-5 estrellas: permite re-etiquetar sin volver a inferir
+    "ALTER TABLE sentimientos ADD COLUMN IF NOT EXISTS probabilidades REAL[]",
+    # Moderación calculada al escribir la reseña (el texto no cambia después)
+    "ALTER TABLE resenas ADD COLUMN IF NOT EXISTS texto_censurado TEXT",
+    "ALTER TABLE resenas ADD COLUMN IF NOT EXISTS groserias_cantidad INTEGER",
+    "ALTER TABLE resenas ADD COLUMN IF NOT EXISTS groserias_terminos TEXT[]",
+    # Términos para las nubes de palabras, extraídos una vez por reseña (reviews/terms.py)
+    "ALTER TABLE resenas ADD COLUMN IF NOT EXISTS terminos_extraidos BOOLEAN NOT NULL DEFAULT FALSE",
+    """
+    CREATE TABLE IF NOT EXISTS resena_terminos (
+        id_resena INTEGER NOT NULL REFERENCES resenas(id_resena) ON DELETE CASCADE,
+        termino TEXT NOT NULL,
+        frecuencia INTEGER NOT NULL,
+        PRIMARY KEY (id_resena, termino)
+    )
+    """,
+    # Versión de los datos de reseñas: se incrementa en cada escritura (reviews/analysis_cache.py)
+    """
+    CREATE TABLE IF NOT EXISTS datos_version (
+        nombre TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT INTO datos_version (nombre) VALUES ('resenas') ON CONFLICT (nombre) DO NOTHING",
+]
+
+
+def asegurar_esquema():
+    """Aplica las migraciones pendientes; se puede llamar en cada arranque"""
+    conn = db.get_connection()
+    if not conn:
+        print("⚠️ No se pudo verificar el esquema: sin conexión a la base de datos")
+        return False
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        for sentencia in MIGRACIONES:
+            cur.execute(sentencia)
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error aplicando migraciones de esquema: {e}")
+        return False
+    finally:
+        if cur:
+            cur.close()
+        db.close_connection(conn)
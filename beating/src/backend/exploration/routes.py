@@ -1,14 +1,15 @@
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
 from spotify.client import spotify_client
 
 def init_exploration_routes(app):
     
     @app.route('/api/top_songs', methods=['GET'])
     def top_songs():
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            # La misma conexión sirve a obtener_mejor_resena_real en todo el bucle
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -104,14 +105,13 @@ def init_exploration_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/top_albums', methods=['GET'])
     def top_albums():
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            # La misma conexión sirve a obtener_mejor_resena_real en todo el bucle
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -212,16 +212,12 @@ def init_exploration_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
 
 # Añadir las funciones auxiliares que faltan
 def obtener_mejor_resena_real(conn, item_id, tipo, criterio='positiva'):
     """Obtiene la mejor reseña real según el criterio especificado"""
     try:
-        cur = conn.cursor()
-        
         if tipo == 'cancion':
             if criterio == 'positiva':
                 query = """
@@ -261,9 +257,9 @@ def obtener_mejor_resena_real(conn, item_id, tipo, criterio='positiva'):
                     LIMIT 1
                 """
         
-        cur.execute(query, (item_id,))
-        result = cur.fetchone()
-        cur.close()
+        with conn.cursor() as cur:
+            cur.execute(query, (item_id,))
+            result = cur.fetchone()
         
         if result:
             return {
@@ -1,13 +1,41 @@
 # src/backend/home/routes.py
 from flask import jsonify
 from database.connection import db
+from database.request_scope import conexion_peticion
+from reviews.terms import frecuencias_terminos
+from reviews.images import imagenes, respuesta_imagen
+from reviews.routes import publicar_wordcloud
+from reviews.pending import ETIQUETA_PENDIENTE
+
+CLAVE_WORDCLOUD = 'home/wordcloud'
+
+
+def wordcloud_home():
+    """(ETag, número de términos) de la nube del Home; solo se vuelve a renderizar si cambian los términos"""
+    # Conexión propia devuelta antes de renderizar (la de la petición seguiría prestada hasta el teardown)
+    conn = db.get_connection()
+    if not conn:
+        raise RuntimeError("Error de conexión a la base de datos")
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        # Términos ya extraídos de las 200 reseñas más recientes (una consulta agregada)
+        frecuencias = frecuencias_terminos(cur, ultimas=200)
+    finally:
+        if cur:
+            cur.close()
+        db.close_connection(conn)
+
+    return publicar_wordcloud(CLAVE_WORDCLOUD, frecuencias), len(frecuencias)
+
 
 def init_home_routes(app):
     
     @app.route('/api/home/stats', methods=['GET'])
     def get_home_stats():
         """Obtiene estadísticas reales para el dashboard del Home"""
-        conn = db.get_connection()
+        conn = conexion_peticion()
         if not conn:
             return jsonify({"error": "Error de conexión a la base de datos"}), 500
             
@@ -25,8 +53,9 @@ def init_home_routes(app):
                     s.etiqueta,
                     COUNT(*) as cantidad
                 FROM sentimientos s
+                WHERE s.etiqueta <> %s
                 GROUP BY s.etiqueta
-            """)
+            """, (ETIQUETA_PENDIENTE,))
             
             sentimientos_data = {}
             for row in cur.fetchall():
@@ -69,56 +98,40 @@ def init_home_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/home/wordcloud', methods=['GET'])
     def get_home_wordcloud():
         """Endpoint específico para la nube de palabras del Home"""
-        conn = db.get_connection()
-        if not conn:
-            return jsonify({"error": "Error de conexión a la base de datos"}), 500
-            
-        cur = None
         try:
-            cur = conn.cursor()
-            
-            # Obtener texto de reseñas para wordcloud
-            cur.execute("""
-                SELECT r.texto_resena 
-                FROM resenas r
-                JOIN sentimientos s ON r.id_resena = s.id_resena
-                ORDER BY r.fecha_creacion DESC
-                LIMIT 200
-            """)
-            
-            textos_resenas = [row[0] for row in cur.fetchall()]
-            
-            if not textos_resenas:
+            etag, total_terminos = wordcloud_home()
+
+            if not etag:
                 return jsonify({
-                    "wordcloud": None,
+                    "wordcloud_url": None,
                     "message": "No hay suficientes reseñas para generar la nube de palabras"
                 }), 200
-            
-            # Importar la función de wordcloud desde reviews
-            from backend.reviews.routes import generar_wordcloud_beating
-            
-            # Generar wordcloud
-            wordcloud_base64 = generar_wordcloud_beating(textos_resenas)
-            
+
             return jsonify({
-                "wordcloud": wordcloud_base64,
-                "total_resenas_utilizadas": len(textos_resenas)
+                "wordcloud_url": imagenes.url('/api/home/wordcloud.png', etag),
+                "total_terminos_utilizados": total_terminos
             }), 200
-            
+
         except Exception as e:
             print(f"Error generando wordcloud para home: {str(e)}")
             return jsonify({
                 "error": "Error generando nube de palabras",
                 "details": str(e)
             }), 500
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+
+    @app.route('/api/home/wordcloud.<formato>', methods=['GET'])
+    def get_home_wordcloud_imagen(formato):
+        """La nube del Home como imagen (?tamano=miniatura|completo, ETag y 304)"""
+        try:
+            wordcloud_home()
+        except Exception as e:
+            print(f"Error generando wordcloud para home: {str(e)}")
+            return jsonify({
+                "error": "Error generando nube de palabras",
+                "details": str(e)
+            }), 500
+        return respuesta_imagen(CLAVE_WORDCLOUD, formato)
@@ -1,13 +1,13 @@
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
 
 def init_listas_routes(app):
     
     @app.route('/api/listas-reproduccion', methods=['GET'])
     def get_listas_reproduccion():
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -40,14 +40,12 @@ def init_listas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/listas-reproduccion/usuario/<int:id_usuario>', methods=['GET'])
     def get_listas_usuario(id_usuario):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -78,14 +76,12 @@ def init_listas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/listas-reproduccion/<int:id_lista>', methods=['GET'])
     def get_lista_detalle(id_lista):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -137,12 +133,11 @@ def init_listas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/listas-reproduccion', methods=['POST'])
     def create_lista_reproduccion():
         conn = None
+        cur = None
         try:
             data = request.get_json()
             id_usuario = data.get('id_usuario')
@@ -151,7 +146,7 @@ def init_listas_routes(app):
             if not id_usuario or not nombre_lista:
                 return jsonify({'error': 'ID de usuario y nombre de lista son obligatorios'}), 400
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -179,12 +174,11 @@ def init_listas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/listas-reproduccion/<int:id_lista>/canciones', methods=['POST'])
     def agregar_cancion_lista(id_lista):
         conn = None
+        cur = None
         try:
             data = request.get_json()
             id_cancion = data.get('id_cancion')
@@ -192,7 +186,7 @@ def init_listas_routes(app):
             if not id_cancion:
                 return jsonify({'error': 'ID de canción es obligatorio'}), 400
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -235,14 +229,13 @@ def init_listas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/listas-reproduccion/<int:id_lista>/canciones/<int:id_cancion>', methods=['DELETE'])
     def eliminar_cancion_lista(id_lista, id_cancion):
         conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -267,6 +260,4 @@ def init_listas_routes(app):
             return jsonify({'error': 'Error al eliminar canción de la lista'}), 500
         finally:
             if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+                cur.close()
\ No newline at end of file
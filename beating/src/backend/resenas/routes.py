@@ -1,65 +1,20 @@
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
+from reviews.pending import pending_worker, async_scoring_enabled, ETIQUETA_PENDIENTE
+from reviews.language import detectar_idioma
+from reviews.sentiment import sentiment_analyzer
+from reviews.moderation import moderador
+from reviews.analysis_cache import analisis_cache
+from reviews.terms import extraer_terminos, guardar_terminos
 import re
 
-# LISTA DE GROSERÍAS EN ESPAÑOL E INGLÉS (puedes expandir esta lista)
-GROSERIAS = {
-    # Español
-    'puta', 'puto', 'mierda', 'coño', 'carajo', 'joder', 'cabrón', 'cabrona', 
-    'pendejo', 'pendeja', 'verga', 'chingar', 'chinga', 'pinche', 'culero',
-    'culera', 'pito', 'concha', 'boludo', 'pelotudo', 'gilipollas', 'hostia',
-    'cojones', 'maricón', 'maricona', 'zorra', 'idiota', 'estúpido', 'imbécil',
-    'malparido', 'hijueputa', 'hijodeputa', 'hdp', 'caradura', 'desgraciado',
-    'maldito', 'maldita', 'bastardo', 'bastarda', 'sinvergüenza', 'careverga',
-    
-    # Inglés
-    'fuck', 'shit', 'ass', 'bitch', 'dick', 'pussy', 'cock', 'cunt', 'whore',
-    'slut', 'bastard', 'motherfucker', 'fucker', 'damn', 'hell', 'piss',
-    'crap', 'douche', 'fag', 'faggot', 'retard', 'nigger', 'nigga', 'spic',
-    'kike', 'chink', 'gook', 'wop', 'bimbo', 'skank', 'hoe', 'twat', 'wanker',
-    'wank', 'jerk', 'asshole', 'dickhead', 'prick', 'shithead', 'douchebag',
-    'scumbag', 'shitbag', 'fuckface', 'dipshit', 'shitass', 'fuckwit', 'cocksucker'
-}
-
-def censurar_texto(texto):
-    """
-    Censura groserías en el texto reemplazándolas con asteriscos
-    pero mantiene el análisis de sentimientos intacto
-    """
-    if not texto:
-        return texto
-    
-    # Crear una copia del texto para censurar
-    texto_censurado = texto
-    
-    # Reemplazar cada grosería encontrada
-    for groseria in GROSERIAS:
-        # Usar regex para coincidencias de palabras completas (case insensitive)
-        patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
-        texto_censurado = patron.sub('*' * len(groseria), texto_censurado)
-    
-    return texto_censurado
-
-def detectar_groserias(texto):
-    """Detecta si el texto contiene groserías y las cuenta"""
-    if not texto:
-        return 0, []
-    
-    groserias_encontradas = []
-    for groseria in GROSERIAS:
-        patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
-        if patron.search(texto):
-            groserias_encontradas.append(groseria)
-    
-    return len(groserias_encontradas), groserias_encontradas
-
 def init_resenas_routes(app):
     
     @app.route('/api/resenas', methods=['GET'])
     def get_resenas():
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -71,7 +26,8 @@ def init_resenas_routes(app):
                     u.nombre_usuario,
                     c.titulo as cancion_titulo,
                     a.titulo as album_titulo,
-                    s.etiqueta, s.puntuacion
+                    s.etiqueta, s.puntuacion,
+                    r.texto_censurado, r.groserias_cantidad
                 FROM resenas r
                 JOIN usuarios u ON r.id_usuario = u.id_usuario
                 LEFT JOIN canciones c ON r.id_cancion = c.id_cancion
@@ -85,8 +41,10 @@ def init_resenas_routes(app):
             resenas_censuradas = []
             for r in resenas:
                 texto_original = r[4]
-                texto_censurado = censurar_texto(texto_original)
-                cantidad_groserias, _ = detectar_groserias(texto_original)
+                texto_censurado, cantidad_groserias = r[11], r[12]
+                if texto_censurado is None:
+                    # Reseña anterior a la moderación al escribir (falta backfill)
+                    texto_censurado, cantidad_groserias, _ = moderador.moderar(texto_original)
                 
                 resenas_censuradas.append({
                     'id_resena': r[0],
@@ -113,12 +71,11 @@ def init_resenas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/resenas', methods=['POST'])
     def create_resena():
         conn = None
+        cur = None
         try:
             data = request.get_json()
             id_usuario = data.get('id_usuario')
@@ -135,16 +92,29 @@ def init_resenas_routes(app):
             
             # NUEVO: Detectar idioma, emojis y groserías
             emojis_presentes = re.findall(r'[^\w\s,.]', texto_resena)
-            tiene_ingles = bool(re.search(r'[a-zA-Z]', texto_resena)) and not bool(re.search(r'[áéíóúñ]', texto_resena))
-            idioma = 'inglés' if tiene_ingles else 'español'
+            codigo_idioma, confianza_idioma = detectar_idioma(texto_resena)
+            idioma = 'inglés' if codigo_idioma == 'en' else 'español'
             
-            cantidad_groserias, groserias_lista = detectar_groserias(texto_resena)
+            texto_censurado, cantidad_groserias, groserias_lista = moderador.moderar(texto_resena)
+
+            # Modelo y spaCy antes de pedir la conexión; en modo asíncrono los hace el worker
+            if async_scoring_enabled():
+                sentimiento, puntuacion, probabilidades = ETIQUETA_PENDIENTE, None, None
+                terminos = None
+            else:
+                try:
+                    sentimiento, puntuacion, probabilidades = sentiment_analyzer.analyze_text_detallado(texto_resena)  # Texto original para IA
+                    print(f"🎭 Sentimiento detectado: {sentimiento}, Puntuación: {puntuacion}")
+                except Exception as e:
+                    print(f"⚠️ Error en análisis de sentimientos, usando neutral: {e}")
+                    sentimiento, puntuacion, probabilidades = 'neutral', 0.5, None
+                terminos = extraer_terminos(texto_resena)
             
-            print(f"📝 Nueva reseña - Idioma: {idioma}, Emojis: {len(emojis_presentes)}, Groserías: {cantidad_groserias}")
+            print(f"📝 Nueva reseña - Idioma: {idioma} ({confianza_idioma}), Emojis: {len(emojis_presentes)}, Groserías: {cantidad_groserias}")
             if cantidad_groserias > 0:
                 print(f"🚫 Groserías detectadas: {groserias_lista}")
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -161,31 +131,31 @@ def init_resenas_routes(app):
             if cur.fetchone():
                 return jsonify({'error': 'Ya existe una reseña de este usuario para esta entidad'}), 409
             
-            # Insertar nueva reseña (guardamos el texto ORIGINAL para análisis de IA)
+            # Insertar nueva reseña (guardamos el texto ORIGINAL para análisis de IA
+            # y la versión censurada para las lecturas)
             cur.execute("""
-                INSERT INTO resenas (id_usuario, id_cancion, id_album, texto_resena) 
-                VALUES (%s, %s, %s, %s) 
+                INSERT INTO resenas (id_usuario, id_cancion, id_album, texto_resena,
+                                     texto_censurado, groserias_cantidad, groserias_terminos) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s) 
                 RETURNING id_resena
-            """, (id_usuario, id_cancion, id_album, texto_resena))
+            """, (id_usuario, id_cancion, id_album, texto_resena,
+                  texto_censurado, cantidad_groserias, groserias_lista))
             
             nueva_resena = cur.fetchone()
-            
-            # NUEVO: Usar el analizador de sentimientos multilingüe con texto ORIGINAL
-            try:
-                from reviews.sentiment import sentiment_analyzer
-                sentimiento, puntuacion = sentiment_analyzer.analyze_text(texto_resena)  # Texto original para IA
-                print(f"🎭 Sentimiento detectado: {sentimiento}, Puntuación: {puntuacion}")
-            except Exception as e:
-                print(f"⚠️ Error en análisis de sentimientos, usando neutral: {e}")
-                sentimiento, puntuacion = 'neutral', 0.5
+            guardar_terminos(cur, nueva_resena[0], terminos)
             
             # Insertar sentimiento (ahora con análisis real)
             cur.execute("""
-                INSERT INTO sentimientos (id_resena, etiqueta, puntuacion) 
-                VALUES (%s, %s, %s)
-            """, (nueva_resena[0], sentimiento, puntuacion))
+                INSERT INTO sentimientos (id_resena, etiqueta, puntuacion, probabilidades, modelo_version) 
+                VALUES (%s, %s, %s, %s, %s)
+            """, (nueva_resena[0], sentimiento, puntuacion, probabilidades,
+                  sentiment_analyzer.modelo_version if probabilidades else None))
             
             conn.commit()
+            analisis_cache.invalidar()
+
+            if sentimiento == ETIQUETA_PENDIENTE:
+                pending_worker.notify()
             
             return jsonify({
                 'id_resena': nueva_resena[0],
@@ -193,6 +163,7 @@ def init_resenas_routes(app):
                 'sentimiento': sentimiento,
                 'puntuacion': puntuacion,
                 'idioma': idioma,
+                'confianza_idioma': confianza_idioma,
                 'emojis_detectados': len(emojis_presentes),
                 'groserias_censuradas': cantidad_groserias  # Información para el usuario
             }), 201
@@ -205,14 +176,13 @@ def init_resenas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/resenas/<int:id_resena>', methods=['DELETE'])
     def delete_resena(id_resena):
         conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -225,6 +195,7 @@ def init_resenas_routes(app):
             
             cur.execute("DELETE FROM resenas WHERE id_resena = %s", (id_resena,))
             conn.commit()
+            analisis_cache.invalidar()
             
             return jsonify({'message': 'Reseña eliminada exitosamente'}), 200
 
@@ -236,14 +207,12 @@ def init_resenas_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/resenas/usuario/<int:id_usuario>', methods=['GET'])
     def get_resenas_usuario(id_usuario):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -254,7 +223,8 @@ def init_resenas_routes(app):
                     r.texto_resena, r.fecha_creacion,
                     c.titulo as cancion_titulo, c.artista as cancion_artista,
                     a.titulo as album_titulo, a.artista as album_artista,
-                    s.etiqueta, s.puntuacion
+                    s.etiqueta, s.puntuacion,
+                    r.texto_censurado, r.groserias_cantidad
                 FROM resenas r
                 LEFT JOIN canciones c ON r.id_cancion = c.id_cancion
                 LEFT JOIN albumes a ON r.id_album = a.id_album
@@ -269,8 +239,10 @@ def init_resenas_routes(app):
             resenas_censuradas = []
             for r in resenas:
                 texto_original = r[3]
-                texto_censurado = censurar_texto(texto_original)
-                cantidad_groserias, _ = detectar_groserias(texto_original)
+                texto_censurado, cantidad_groserias = r[11], r[12]
+                if texto_censurado is None:
+                    # Reseña anterior a la moderación al escribir (falta backfill)
+                    texto_censurado, cantidad_groserias, _ = moderador.moderar(texto_original)
                 
                 resenas_censuradas.append({
                     'id_resena': r[0],
@@ -295,6 +267,4 @@ def init_resenas_routes(app):
             return jsonify({'error': 'Error al obtener reseñas del usuario'}), 500
         finally:
             if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+                cur.close()
\ No newline at end of file
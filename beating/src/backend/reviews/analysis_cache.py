@@ -0,0 +1,193 @@
+"""
+Caché versionada para respuestas caras de construir (gráficas y nube de palabras
+de /analisis-resenas).
+
+- La versión de los datos sale de una consulta barata que se repite como mucho
+  cada `version_ttl` segundos: el contador `datos_version` (lo incrementa cada
+  escritura con `registrar_cambio()`, también desde otros procesos y los CLI)
+  y MAX(id_resena) por el índice de la clave primaria, que detecta inserciones
+  hechas fuera de la app. Son dos búsquedas por índice, sin recorrer tablas.
+- `invalidar()` incrementa además un contador local para que el proceso que
+  escribió no espere al `version_ttl`.
+- Si la versión cambió se sirve la respuesta anterior (stale-while-revalidate)
+  y se reconstruye en segundo plano.
+- Si no hay nada en caché, solo el primer llamador reconstruye; los demás
+  esperan su resultado en lugar de repetir el trabajo.
+"""
+import threading
+import time
+
+from database.connection import db
+
+try:
+    from config import ANALISIS_CONFIG
+except ImportError:
+    ANALISIS_CONFIG = {}
+
+VERSION_RESENAS = 'resenas'
+
+
+def version_resenas():
+    """Huella barata de resenas y sentimientos; None si no hay base de datos"""
+    conn = db.get_connection()
+    if not conn:
+        return None
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT
+                (SELECT version FROM datos_version WHERE nombre = %s),
+                (SELECT MAX(id_resena) FROM resenas)
+        """, (VERSION_RESENAS,))
+        version = cur.fetchone()
+        conn.commit()
+        return version
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ Error consultando la versión de las reseñas: {e}")
+        return None
+    finally:
+        if cur:
+            cur.close()
+        db.close_connection(conn)
+
+
+def registrar_cambio(cur=None):
+    """
+    Incrementa la versión de las reseñas. Con `cur` va dentro de la transacción
+    del llamador (los CLI, por lote); sin él, en una transacción propia (tras el
+    commit de una ruta).
+    """
+    sql = "UPDATE datos_version SET version = version + 1 WHERE nombre = %s"
+    if cur is not None:
+        cur.execute(sql, (VERSION_RESENAS,))
+        return
+
+    conn = db.get_connection()
+    if not conn:
+        return
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, (VERSION_RESENAS,))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ Error registrando el cambio de las reseñas: {e}")
+    finally:
+        db.close_connection(conn)
+
+
+class VersionedCache:
+    def __init__(self, nombre, version_fn, version_ttl=2.0, espera_max=120, cambio_fn=None):
+        self.nombre = nombre
+        self.version_fn = version_fn
+        self.cambio_fn = cambio_fn
+        self.version_ttl = version_ttl
+        self.espera_max = espera_max
+        self._lock = threading.Lock()
+        self._valor = None
+        self._version = None
+        self._generacion = 0
+        self._version_datos = None
+        self._version_datos_hasta = 0.0
+        self._construyendo = None
+        self._ultimo_error = None
+        self._stats = {'hits': 0, 'obsoletos': 0, 'misses': 0, 'reconstrucciones': 0, 'errores': 0}
+
+    def invalidar(self, *_):
+        """Marca la entrada como obsoleta (se llama tras escribir una reseña)"""
+        with self._lock:
+            self._generacion += 1
+            self._version_datos_hasta = 0.0
+        if self.cambio_fn is not None:
+            # Los demás procesos lo ven en su siguiente consulta de versión
+            self.cambio_fn()
+
+    def _version_actual(self):
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora < self._version_datos_hasta:
+                return self._version_datos, self._generacion
+        version_datos = self.version_fn()
+        with self._lock:
+            self._version_datos = version_datos
+            self._version_datos_hasta = ahora + self.version_ttl
+            return version_datos, self._generacion
+
+    def obtener(self, construir):
+        """Devuelve el valor en caché o lo construye con construir()"""
+        version = self._version_actual()
+        with self._lock:
+            if self._valor is not None and self._version == version:
+                self._stats['hits'] += 1
+                return self._valor
+
+            if self._valor is not None:
+                # Stale-while-revalidate: respuesta anterior ya, la nueva en segundo plano
+                self._stats['obsoletos'] += 1
+                if self._construyendo is None:
+                    self._construyendo = threading.Event()
+                    threading.Thread(
+                        target=self._reconstruir, args=(construir, version, self._construyendo),
+                        name=f"{self.nombre}-revalidar", daemon=True
+                    ).start()
+                return self._valor
+
+            self._stats['misses'] += 1
+            evento = self._construyendo
+            if evento is None:
+                evento = self._construyendo = threading.Event()
+                constructor = True
+            else:
+                constructor = False
+
+        if constructor:
+            return self._reconstruir(construir, version, evento, propagar=True)
+
+        # Otro hilo ya está construyendo: esperar su resultado
+        evento.wait(timeout=self.espera_max)
+        with self._lock:
+            if self._valor is not None:
+                return self._valor
+            error = self._ultimo_error
+        raise RuntimeError(f"No se pudo construir {self.nombre}: {error}")
+
+    def _reconstruir(self, construir, version, evento, propagar=False):
+        try:
+            valor = construir()
+            with self._lock:
+                # Si hubo escrituras durante la construcción, la versión ya no
+                # coincidirá y la siguiente petición lanzará otra revalidación
+                self._valor = valor
+                self._version = version
+                self._ultimo_error = None
+                self._stats['reconstrucciones'] += 1
+            return valor
+        except Exception as e:
+            with self._lock:
+                self._ultimo_error = e
+                self._stats['errores'] += 1
+            print(f"❌ Error reconstruyendo {self.nombre}: {e}")
+            if propagar:
+                raise
+        finally:
+            with self._lock:
+                self._construyendo = None
+            evento.set()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'version': self._version,
+                'construyendo': self._construyendo is not None,
+            }
+
+
+analisis_cache = VersionedCache(
+    'analisis-resenas',
+    version_resenas,
+    version_ttl=ANALISIS_CONFIG.get('version_ttl', 2.0),
+    cambio_fn=registrar_cambio
+)
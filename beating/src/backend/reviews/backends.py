@@ -0,0 +1,246 @@
+"""
+Backends de inferencia para SentimentAnalyzer.
+
+Todos exponen:
+  - `predict_proba(textos, max_chunks=1)`: matriz (n_textos, 5) de probabilidades de 1-5
+    estrellas (los modelos de polaridad se proyectan a 1, 3 y 5 estrellas)
+  - `predict(textos)`: lista de {'label': '<n> stars', 'score': float} como el pipeline de transformers
+
+- TransformersBackend: modelo de PyTorch en modo eager (comportamiento original).
+- OnnxBackend: exporta el modelo a ONNX, aplica cuantización dinámica int8
+  y lo ejecuta con onnxruntime en CPU.
+
+Reseñas largas: con max_chunks > 1 el texto se parte en ventanas de tokens
+que caben en el modelo (como máximo max_chunks, repartidas a lo largo de toda
+la reseña). Las ventanas de todas las reseñas del lote van en un único forward
+pass y las probabilidades de cada reseña se promedian ponderadas por la
+longitud de cada ventana. Con max_chunks=1 se trunca como antes.
+
+Tolerancia aceptada del backend ONNX int8 frente a transformers
+(verificada con `python -m benchmarks.bench_backends`):
+  - la etiqueta (estrellas) coincide en al menos el 97% de los textos
+  - la diferencia absoluta del score es como máximo 0.05 en los textos
+    cuya etiqueta coincide
+"""
+import os
+
+import numpy as np
+
+TOLERANCIA_ETIQUETAS = 0.97
+TOLERANCIA_SCORE = 0.05
+
+ONNX_DIR_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.onnx')
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+def _columnas_estrellas(id2label):
+    """
+    Para cada salida del modelo, la columna (0-4) de la escala de 1-5 estrellas.
+
+    Los modelos de estrellas se mapean directamente; los de polaridad
+    (NEG/NEU/POS, NEGATIVE/POSITIVE) van a 1, 3 y 5 estrellas para que la
+    distribución guardada y las etiquetas derivadas sean comparables.
+    """
+    columnas = []
+    for indice in range(len(id2label)):
+        etiqueta = str(id2label[indice]).lower()
+        if etiqueta[:1].isdigit():
+            columnas.append(int(etiqueta[0]) - 1)
+        elif etiqueta.startswith('neg'):
+            columnas.append(0)
+        elif etiqueta.startswith('neu'):
+            columnas.append(2)
+        elif etiqueta.startswith('pos'):
+            columnas.append(4)
+        else:
+            raise ValueError(f"Etiqueta de modelo no soportada: {id2label[indice]}")
+    return columnas
+
+
+def etiquetar_estrellas(probs):
+    """Convierte filas de probabilidades de 1-5 estrellas en {'label', 'score'}"""
+    indices = probs.argmax(axis=1)
+    return [
+        {'label': f"{int(i) + 1} star{'s' if i else ''}", 'score': float(p[i])}
+        for i, p in zip(indices, probs)
+    ]
+
+
+class _Backend:
+    nombre = None
+
+    def __init__(self, model_name, max_length=512):
+        from transformers import AutoTokenizer, AutoConfig
+
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.max_length = min(max_length, self.tokenizer.model_max_length)
+        self.id2label = AutoConfig.from_pretrained(model_name).id2label
+        self.estrellas = _columnas_estrellas(self.id2label)
+        # Tokens útiles por ventana, descontando [CLS] y [SEP]
+        self.tokens_por_ventana = self.max_length - self.tokenizer.num_special_tokens_to_add()
+
+    def _ventanas(self, ids, max_chunks):
+        """Parte una secuencia de ids en como mucho max_chunks ventanas"""
+        n = self.tokens_por_ventana
+        if len(ids) <= n or max_chunks <= 1:
+            return [ids[:n]]
+        inicios = list(range(0, len(ids), n))
+        if len(inicios) > max_chunks:
+            # Repartir las ventanas a lo largo de toda la reseña, no solo el principio
+            paso = (len(ids) - n) / (max_chunks - 1)
+            inicios = [round(i * paso) for i in range(max_chunks)]
+        return [ids[i:i + n] for i in inicios]
+
+    def predict_proba(self, textos, max_chunks=1):
+        codificados = self.tokenizer(list(textos), add_special_tokens=False, truncation=False)['input_ids']
+
+        ventanas = []
+        duenos = []
+        for indice, ids in enumerate(codificados):
+            for ventana in self._ventanas(ids, max_chunks):
+                ventanas.append(self.tokenizer.build_inputs_with_special_tokens(ventana))
+                duenos.append(indice)
+
+        largo = max(len(v) for v in ventanas)
+        input_ids = np.full((len(ventanas), largo), self.tokenizer.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(ventanas), largo), dtype=np.int64)
+        for i, ventana in enumerate(ventanas):
+            input_ids[i, :len(ventana)] = ventana
+            attention_mask[i, :len(ventana)] = 1
+
+        probs_ventanas = self._forward(input_ids, attention_mask)
+
+        # Combinar las ventanas de cada reseña ponderando por su longitud
+        pesos = attention_mask.sum(axis=1).astype(np.float64)
+        probs = np.zeros((len(codificados), probs_ventanas.shape[1]))
+        totales = np.zeros(len(codificados))
+        np.add.at(probs, duenos, probs_ventanas * pesos[:, None])
+        np.add.at(totales, duenos, pesos)
+        probs /= totales[:, None]
+
+        # Proyectar a 5 columnas (1-5 estrellas) sea cual sea el esquema del modelo
+        estrellas = np.zeros((len(codificados), 5))
+        np.add.at(estrellas.T, self.estrellas, probs.T)
+        return estrellas
+
+    def etiquetar(self, probs):
+        return etiquetar_estrellas(probs)
+
+    def predict(self, textos, max_chunks=1):
+        return self.etiquetar(self.predict_proba(textos, max_chunks=max_chunks))
+
+    def _forward(self, input_ids, attention_mask):
+        raise NotImplementedError
+
+
+class TransformersBackend(_Backend):
+    nombre = 'transformers'
+
+    def __init__(self, model_name, max_length=512, **_):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        super().__init__(model_name, max_length)
+        self.torch = torch
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        print(f"Device set to use {self.device}")
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device).eval()
+
+    def _forward(self, input_ids, attention_mask):
+        torch = self.torch
+        with torch.inference_mode():
+            logits = self.model(
+                input_ids=torch.from_numpy(input_ids).to(self.device),
+                attention_mask=torch.from_numpy(attention_mask).to(self.device)
+            ).logits
+        return _softmax(logits.float().cpu().numpy())
+
+
+class OnnxBackend(_Backend):
+    nombre = 'onnx-int8'
+
+    def __init__(self, model_name, onnx_dir=None, max_length=512, num_threads=None, **_):
+        import onnxruntime as ort
+
+        super().__init__(model_name, max_length)
+        ruta = self.exportar(model_name, onnx_dir or ONNX_DIR_DEFAULT)
+
+        opciones = ort.SessionOptions()
+        opciones.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            opciones.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(ruta, opciones, providers=['CPUExecutionProvider'])
+        self.input_names = [entrada.name for entrada in self.session.get_inputs()]
+        print(f"✅ Backend ONNX int8 cargado desde {ruta}")
+
+    @staticmethod
+    def exportar(model_name, onnx_dir):
+        """Exporta el modelo a ONNX y lo cuantiza a int8 (solo la primera vez)"""
+        carpeta = os.path.join(onnx_dir, model_name.replace('/', '__'))
+        ruta_fp32 = os.path.join(carpeta, 'model.onnx')
+        ruta_int8 = os.path.join(carpeta, 'model.int8.onnx')
+        if os.path.exists(ruta_int8):
+            return ruta_int8
+
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        os.makedirs(carpeta, exist_ok=True)
+        print(f"📦 Exportando {model_name} a ONNX...")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        modelo = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+        ejemplo = tokenizer(["una reseña de ejemplo"], return_tensors='pt')
+        nombres = list(ejemplo.keys())
+        ejes = {nombre: {0: 'batch', 1: 'secuencia'} for nombre in nombres}
+        ejes['logits'] = {0: 'batch'}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                modelo,
+                (dict(ejemplo),),
+                ruta_fp32,
+                input_names=nombres,
+                output_names=['logits'],
+                dynamic_axes=ejes,
+                opset_version=14
+            )
+
+        print("🗜️ Aplicando cuantización dinámica int8...")
+        quantize_dynamic(ruta_fp32, ruta_int8, weight_type=QuantType.QInt8)
+        return ruta_int8
+
+    def _forward(self, input_ids, attention_mask):
+        entradas = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'token_type_ids': np.zeros_like(input_ids),
+        }
+        feed = {nombre: entradas[nombre] for nombre in self.input_names}
+        return _softmax(self.session.run(['logits'], feed)[0])
+
+
+BACKENDS = {
+    'transformers': TransformersBackend,
+    'onnx': OnnxBackend,
+}
+
+
+def cargar_backend(nombre, model_name, **opciones):
+    """
+    Carga el backend pedido. Si ONNX no está disponible (falta onnxruntime
+    o falla la exportación), vuelve al modelo de transformers.
+    """
+    if nombre == 'onnx':
+        try:
+            return OnnxBackend(model_name, **opciones)
+        except Exception as e:
+            print(f"⚠️ Backend ONNX no disponible ({e}), usando transformers")
+    return TransformersBackend(model_name, **opciones)
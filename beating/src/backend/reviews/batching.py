@@ -0,0 +1,112 @@
+import threading
+import queue
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en lotes pequeños para procesarlas
+    con una sola llamada (por ejemplo, un único forward pass del modelo).
+
+    Cada llamador encola su elemento y espera su resultado; un hilo
+    trabajador junta elementos durante `max_wait_ms` o hasta `max_batch_size`
+    y ejecuta `procesar_lote(lista)` que debe devolver una lista del mismo tamaño.
+    """
+
+    def __init__(self, procesar_lote, max_batch_size=16, max_wait_ms=10, nombre="micro-batcher"):
+        self.procesar_lote = procesar_lote
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms) / 1000.0)
+        self.nombre = nombre
+
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._stats = {
+            'lotes': 0,
+            'elementos': 0,
+            'lote_maximo': 0,
+            'errores': 0,
+            'histograma': {},
+        }
+
+    def _asegurar_hilo(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name=self.nombre, daemon=True)
+                self._hilo.start()
+
+    def submit(self, item):
+        """Encola un elemento y devuelve un Future con su resultado"""
+        self._asegurar_hilo()
+        futuro = Future()
+        self._cola.put((item, futuro))
+        return futuro
+
+    def procesar(self, item, timeout=None):
+        """Encola un elemento y bloquea hasta obtener su resultado"""
+        return self.submit(item).result(timeout=timeout)
+
+    def _recolectar_lote(self):
+        lote = [self._cola.get()]
+        limite = time.monotonic() + self.max_wait
+        while len(lote) < self.max_batch_size:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._cola.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _bucle(self):
+        while True:
+            # Los futuros cancelados (el llamador dejó de esperar) no se procesan
+            lote = [(item, futuro) for item, futuro in self._recolectar_lote()
+                    if futuro.set_running_or_notify_cancel()]
+            if not lote:
+                continue
+            items = [item for item, _ in lote]
+            try:
+                resultados = self.procesar_lote(items)
+                if len(resultados) != len(items):
+                    raise RuntimeError(
+                        f"procesar_lote devolvió {len(resultados)} resultados para {len(items)} elementos"
+                    )
+                for (_, futuro), resultado in zip(lote, resultados):
+                    futuro.set_result(resultado)
+            except Exception as e:
+                print(f"❌ Error procesando lote en {self.nombre}: {e}")
+                with self._lock:
+                    self._stats['errores'] += 1
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+            self._registrar(len(lote))
+
+    def _registrar(self, tamano):
+        with self._lock:
+            self._stats['lotes'] += 1
+            self._stats['elementos'] += tamano
+            self._stats['lote_maximo'] = max(self._stats['lote_maximo'], tamano)
+            self._stats['histograma'][tamano] = self._stats['histograma'].get(tamano, 0) + 1
+
+    def estadisticas(self):
+        """Devuelve contadores de tamaño de lote"""
+        with self._lock:
+            lotes = self._stats['lotes']
+            return {
+                'lotes': lotes,
+                'elementos': self._stats['elementos'],
+                'lote_promedio': round(self._stats['elementos'] / lotes, 2) if lotes else 0.0,
+                'lote_maximo': self._stats['lote_maximo'],
+                'errores': self._stats['errores'],
+                'histograma': dict(sorted(self._stats['histograma'].items())),
+                'en_cola': self._cola.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+            }
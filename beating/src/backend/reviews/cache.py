@@ -0,0 +1,220 @@
+"""
+Caché de resultados de sentimiento (memoria + tabla `sentimiento_cache`).
+
+Cada proceso solo lee y escribe las entradas de su `modelo`, así que varias
+versiones pueden convivir en la tabla (despliegues escalonados, el CLI de
+re-puntuación con otra configuración...). Las entradas viejas se borran aparte:
+
+    python -m reviews.cache [--dias 30]
+"""
+import argparse
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from psycopg2.extras import execute_values
+
+from database.connection import db
+
+try:
+    from config import SENTIMENT_CONFIG
+except ImportError:
+    SENTIMENT_CONFIG = {}
+
+TTL_DIAS = SENTIMENT_CONFIG.get('cache_ttl_dias', 30)
+
+_ESPACIOS = re.compile(r'\s+')
+
+
+def normalizar_texto(texto):
+    """Normaliza un texto ya procesado (emojis expandidos) para usarlo como clave"""
+    return _ESPACIOS.sub(' ', texto).strip().lower()
+
+
+class SentimentCache:
+    """
+    Caché de resultados de sentimiento direccionada por contenido.
+
+    La clave es un hash SHA-256 del texto normalizado más el nombre del modelo.
+    Nivel 1: LRU acotado en memoria. Nivel 2: tabla `sentimiento_cache` en
+    PostgreSQL, compartida entre workers y persistente entre reinicios.
+    """
+
+    def __init__(self, modelo, max_items=5000, persistente=True):
+        self.modelo = modelo
+        self.max_items = max_items
+        self.persistente = persistente
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._tabla_lista = False
+        self._stats = {'hits_memoria': 0, 'hits_db': 0, 'misses': 0}
+
+    def clave(self, texto_procesado, ruta=None):
+        """`ruta` distingue los modelos por idioma dentro de una misma versión"""
+        normalizado = normalizar_texto(texto_procesado)
+        modelo = f"{self.modelo}\x00{ruta}" if ruta else self.modelo
+        return hashlib.sha256(f"{modelo}\x00{normalizado}".encode('utf-8')).hexdigest()
+
+    def _preparar_tabla(self, cur):
+        if self._tabla_lista:
+            return
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sentimiento_cache (
+                hash_texto CHAR(64) NOT NULL,
+                modelo TEXT NOT NULL,
+                etiqueta VARCHAR(20) NOT NULL,
+                puntuacion REAL NOT NULL,
+                probabilidades REAL[],
+                fecha_creacion TIMESTAMP DEFAULT NOW(),
+                PRIMARY KEY (hash_texto, modelo)
+            )
+        """)
+        cur.execute("ALTER TABLE sentimiento_cache ADD COLUMN IF NOT EXISTS probabilidades REAL[]")
+        # Las entradas de otros modelos no se tocan aquí: pueden ser de otro worker
+        # en marcha. Se expiran con expirar() / python -m reviews.cache
+        self._tabla_lista = True
+
+    def get_many(self, claves):
+        """Devuelve {clave: (sentimiento, puntuacion, probabilidades)} para las claves encontradas"""
+        encontrados = {}
+        faltantes = []
+        with self._lock:
+            for clave in claves:
+                if clave in self._lru:
+                    self._lru.move_to_end(clave)
+                    encontrados[clave] = self._lru[clave]
+                    self._stats['hits_memoria'] += 1
+                else:
+                    faltantes.append(clave)
+
+        if faltantes and self.persistente:
+            for clave, valor in self._consultar_db(faltantes).items():
+                encontrados[clave] = valor
+                self._guardar_memoria(clave, valor)
+                with self._lock:
+                    self._stats['hits_db'] += 1
+
+        with self._lock:
+            self._stats['misses'] += len(set(claves) - set(encontrados))
+        return encontrados
+
+    def set_many(self, valores):
+        """Guarda {clave: (sentimiento, puntuacion, probabilidades)} en memoria y en la tabla"""
+        for clave, valor in valores.items():
+            self._guardar_memoria(clave, valor)
+        if valores and self.persistente:
+            self._escribir_db(valores)
+
+    def _guardar_memoria(self, clave, valor):
+        with self._lock:
+            self._lru[clave] = valor
+            self._lru.move_to_end(clave)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    def _consultar_db(self, claves):
+        conn = db.get_connection()
+        if not conn:
+            return {}
+        cur = None
+        try:
+            cur = conn.cursor()
+            self._preparar_tabla(cur)
+            cur.execute("""
+                SELECT hash_texto, etiqueta, puntuacion, probabilidades
+                FROM sentimiento_cache
+                WHERE modelo = %s AND hash_texto = ANY(%s)
+            """, (self.modelo, list(claves)))
+            filas = cur.fetchall()
+            conn.commit()
+            return {fila[0]: (fila[1], round(float(fila[2]), 2), fila[3]) for fila in filas}
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️ Error consultando caché de sentimientos: {e}")
+            return {}
+        finally:
+            if cur:
+                cur.close()
+            db.close_connection(conn)
+
+    def _escribir_db(self, valores):
+        conn = db.get_connection()
+        if not conn:
+            return
+        cur = None
+        try:
+            cur = conn.cursor()
+            self._preparar_tabla(cur)
+            execute_values(cur, """
+                INSERT INTO sentimiento_cache (hash_texto, modelo, etiqueta, puntuacion, probabilidades)
+                VALUES %s
+                ON CONFLICT (hash_texto, modelo) DO NOTHING
+            """, [(clave, self.modelo, sentimiento, float(puntuacion), probabilidades)
+                  for clave, (sentimiento, puntuacion, probabilidades) in valores.items()])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️ Error guardando caché de sentimientos: {e}")
+        finally:
+            if cur:
+                cur.close()
+            db.close_connection(conn)
+
+    def expirar(self, dias=TTL_DIAS):
+        """Borra las entradas de cualquier modelo creadas hace más de `dias` días. Devuelve cuántas."""
+        conn = db.get_connection()
+        if not conn:
+            return None
+        cur = None
+        try:
+            cur = conn.cursor()
+            self._preparar_tabla(cur)
+            cur.execute("""
+                DELETE FROM sentimiento_cache
+                WHERE fecha_creacion < NOW() - make_interval(days => %s)
+            """, (int(dias),))
+            borradas = cur.rowcount
+            conn.commit()
+            return borradas
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️ Error expirando caché de sentimientos: {e}")
+            return None
+        finally:
+            if cur:
+                cur.close()
+            db.close_connection(conn)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            hits = self._stats['hits_memoria'] + self._stats['hits_db']
+            total = hits + self._stats['misses']
+            return {
+                **self._stats,
+                'tasa_aciertos': round(hits / total, 3) if total else 0.0,
+                'entradas_memoria': len(self._lru),
+                'max_items': self.max_items,
+                'modelo': self.modelo,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=TTL_DIAS,
+                        help="Antigüedad máxima de las entradas (de cualquier modelo)")
+    args = parser.parse_args()
+
+    # El nombre del modelo no importa para expirar: se borra por fecha
+    borradas = SentimentCache(modelo=None).expirar(args.dias)
+    if borradas is None:
+        raise SystemExit(1)
+    print(f"🧹 Caché de sentimientos: {borradas} entradas de más de {args.dias} días eliminadas")
+
+
+if __name__ == '__main__':
+    main()
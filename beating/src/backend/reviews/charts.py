@@ -0,0 +1,480 @@
+"""
+Gráficas de /analisis-resenas con el estilo de Beating, sin matplotlib.
+
+- La nube de palabras sale directamente de WordCloud.to_image() (Pillow) con
+  el título dibujado encima; no pasa por imshow/savefig. Los layouts ya
+  calculados se reutilizan (CacheLayouts) cuando los pesos redondeados coinciden.
+- La distribución de sentimientos y el top de canciones se generan como SVG a
+  partir de plantillas: son unos pocos kilobytes de texto, escalan sin pérdida
+  y tardan microsegundos.
+
+Las funciones devuelven los bytes (PNG o SVG, None si no hay datos); las rutas
+los publican en reviews/images.py y el JSON solo lleva sus URLs. Cada llamada
+trabaja con sus propios objetos, así que se pueden usar desde varios hilos.
+
+renderizar_graficas() manda la nube, que es lo caro, a un pool pequeño de
+procesos (spawn: no hereda los hilos de Flask ni de torch) mientras genera los
+SVG. Cada worker importa este módulo y vuelve a importar el módulo principal
+(app.py como __mp_main__); ninguno de los dos abre la base de datos ni carga
+el modelo: app.py solo lo hace dentro de create_app() / iniciar_servicios(),
+que se llaman bajo `if __name__ == '__main__'`.
+"""
+import math
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturoTimeout
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from xml.sax.saxutils import escape
+import multiprocessing
+
+from PIL import Image, ImageDraw, ImageFont
+from wordcloud import WordCloud
+from wordcloud.wordcloud import FONT_PATH
+
+try:
+    from config import ANALISIS_CONFIG
+except ImportError:
+    ANALISIS_CONFIG = {}
+
+FONDO = '#1e1626'
+ROSA = '#ec4899'
+GRIS = '#6b7280'
+FUENTE_SVG = "'Inter', 'Segoe UI', 'Helvetica Neue', Arial, sans-serif"
+
+COLORES_BEATING = [
+    (236, 72, 153),   # Rosa Beating (#ec4899)
+    (168, 85, 247),   # Purple-500 (#a855f7)
+    (139, 92, 246),   # Purple-600 (#8b5cf6)
+    (217, 70, 239),   # Pink-500 (#d946ef)
+    (245, 158, 11),   # Amber-500 (#f59e0b)
+    (16, 185, 129),   # Emerald-500 (#10b981)
+    (99, 102, 241),   # Indigo-500 (#6366f1)
+    (249, 115, 22),   # Orange-500 (#f97316)
+]
+
+COLORES_SENTIMIENTO = {
+    'positivo': '#10b981',
+    'neutral': '#f59e0b',
+    'negativo': '#ef4444'
+}
+
+PLANTILLA_SVG = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {ancho} {alto}" width="{ancho}" height="{alto}" font-family="{fuente}">
+<defs><filter id="sombra" x="-20%" y="-20%" width="140%" height="140%"><feDropShadow dx="-5" dy="5" stdDeviation="0" flood-color="#000" flood-opacity="0.35"/></filter></defs>
+<rect width="100%" height="100%" fill="{fondo}"/>
+<text x="{centro_titulo}" y="{y_titulo}" text-anchor="middle" font-size="{tamano_titulo}" font-weight="bold" fill="white">{titulo}</text>
+{contenido}
+</svg>
+"""
+
+PLANTILLA_CUNA = ('<path d="{d}" fill="{color}" stroke="{fondo}" stroke-width="3" filter="url(#sombra)"/>\n'
+                  '<text x="{x_etiqueta:.1f}" y="{y_etiqueta:.1f}" text-anchor="{ancla}" dominant-baseline="middle" '
+                  'font-size="19" font-weight="bold" fill="#e5e7eb">{etiqueta}</text>\n'
+                  '<text x="{x_porcentaje:.1f}" y="{y_porcentaje:.1f}" text-anchor="middle" dominant-baseline="middle" '
+                  'font-size="15" font-weight="bold" fill="white">{porcentaje:.1f}%</text>')
+
+PLANTILLA_BARRA = ('<text x="{x_texto}" y="{y_centro:.1f}" text-anchor="end" font-size="17" fill="white">'
+                   '<tspan x="{x_texto}" dy="-0.2em">{titulo}</tspan>'
+                   '<tspan x="{x_texto}" dy="1.2em" fill="#d1d5db">{artista}</tspan></text>\n'
+                   '<rect x="{x:.1f}" y="{y:.1f}" width="{ancho:.1f}" height="{alto:.1f}" fill="{color}" '
+                   'fill-opacity="0.9" stroke="white" stroke-width="1"/>\n'
+                   '<rect x="{x_valor:.1f}" y="{y_valor:.1f}" width="62" height="28" rx="7" fill="{fondo}" '
+                   'fill-opacity="0.9" stroke="{rosa}"/>\n'
+                   '<text x="{x_valor_texto:.1f}" y="{y_centro:.1f}" text-anchor="middle" dominant-baseline="middle" '
+                   'font-size="15" font-weight="bold" fill="white">{valor:.2f}</text>')
+
+
+def color_func_beating(word, font_size, position, orientation, random_state=None, **kwargs):
+    """
+    Función de colores con la paleta de Beating mejorada. El color sale de un
+    hash estable de la palabra (no de `random`): la misma nube da los mismos
+    bytes en cualquier proceso, y con ellos el mismo ETag.
+    """
+    huella = zlib.crc32(word.encode('utf-8'))
+    r, g, b = COLORES_BEATING[huella % len(COLORES_BEATING)]
+    # Variar ligeramente el color de cada palabra para más dinamismo
+    variation = (huella // len(COLORES_BEATING)) % 21 - 10
+    r = max(0, min(255, r + variation))
+    g = max(0, min(255, g + variation))
+    b = max(0, min(255, b + variation))
+    return f"rgb({r}, {g}, {b})"
+
+
+def _svg(ancho, alto, titulo, contenido, tamano_titulo=25, y_titulo=55):
+    return PLANTILLA_SVG.format(
+        ancho=ancho, alto=alto, fuente=FUENTE_SVG, fondo=FONDO,
+        centro_titulo=ancho // 2, y_titulo=y_titulo, tamano_titulo=tamano_titulo,
+        titulo=escape(titulo), contenido=contenido
+    ).encode('utf-8')
+
+
+def _a_png(imagen):
+    salida = BytesIO()
+    imagen.save(salida, format='PNG')
+    return salida.getvalue()
+
+
+def _agregar_titulo(imagen, titulo):
+    """Etiqueta rosa semitransparente centrada arriba, como el figtext de antes"""
+    tamano = max(12, imagen.width // 36)
+    fuente = ImageFont.truetype(FONT_PATH, tamano)
+    x0, y0, x1, y1 = fuente.getbbox(titulo)
+    relleno = tamano // 2
+    ancho_texto, alto_texto = x1 - x0, y1 - y0
+    izquierda = (imagen.width - ancho_texto) // 2
+    arriba = int(imagen.height * 0.05)
+
+    capa = Image.new('RGBA', imagen.size, (0, 0, 0, 0))
+    dibujo = ImageDraw.Draw(capa)
+    dibujo.rounded_rectangle(
+        (izquierda - relleno, arriba - relleno, izquierda + ancho_texto + relleno, arriba + alto_texto + relleno),
+        radius=relleno, fill=(236, 72, 153, 204)
+    )
+    dibujo.text((izquierda - x0, arriba - y0), titulo, font=fuente, fill='white')
+    return Image.alpha_composite(imagen.convert('RGBA'), capa).convert('RGB')
+
+
+MAX_PALABRAS_NUBE = 80
+
+
+class CacheLayouts:
+    """
+    Layouts de WordCloud ya calculados (palabra, tamaño de fuente, posición,
+    orientación) indexados por la huella de las `top_n` frecuencias relativas
+    redondeadas a `precision` decimales. La colocación en espiral es lo caro de
+    la nube; con un acierto solo se recolorea y se rasteriza.
+
+    Sin huella exacta es un fallo: el tamaño de fuente de cada palabra depende
+    de su peso y las posiciones dependen de los tamaños, así que reutilizar un
+    layout con otros pesos serviría tamaños viejos. La `precision` es la que
+    decide cuánto pueden moverse las frecuencias sin recolocar.
+
+    Cada proceso tiene la suya (el del servidor y los del pool de renderizado);
+    estadisticas_layouts() las junta.
+    """
+
+    def __init__(self, maximo=32, top_n=MAX_PALABRAS_NUBE, precision=2):
+        self.maximo = maximo
+        self.top_n = top_n
+        self.precision = precision
+        self._lock = threading.Lock()
+        self._layouts = OrderedDict()
+        self._stats = {'aciertos': 0, 'fallos': 0}
+
+    def _pesos(self, frecuencias):
+        top = sorted(frecuencias.items(), key=lambda item: (-item[1], item[0]))[:self.top_n]
+        maximo = top[0][1] if top and top[0][1] else 1
+        return tuple((palabra, round(frecuencia / maximo, self.precision)) for palabra, frecuencia in top)
+
+    def buscar(self, frecuencias):
+        """Layout reutilizable para estas frecuencias, o None"""
+        pesos = self._pesos(frecuencias)
+        with self._lock:
+            layout = self._layouts.get(pesos)
+            if layout is not None:
+                self._layouts.move_to_end(pesos)
+                self._stats['aciertos'] += 1
+                return layout
+            self._stats['fallos'] += 1
+        return None
+
+    def guardar(self, frecuencias, layout):
+        pesos = self._pesos(frecuencias)
+        with self._lock:
+            self._layouts[pesos] = layout
+            self._layouts.move_to_end(pesos)
+            while len(self._layouts) > self.maximo:
+                self._layouts.popitem(last=False)
+
+    def estadisticas(self):
+        with self._lock:
+            return {**self._stats, 'layouts': len(self._layouts)}
+
+
+layouts = CacheLayouts(
+    maximo=ANALISIS_CONFIG.get('layouts_cache', 32),
+    precision=ANALISIS_CONFIG.get('layout_precision', 2)
+)
+
+
+def generar_wordcloud_beating(frecuencias):
+    """
+    Genera una nube de palabras con menos palabras y mejor legibilidad a partir
+    de {término: frecuencia} (ver reviews/terms.py: frecuencias_terminos)
+    """
+    if not frecuencias:
+        print("No hay términos para generar la nube de palabras")
+        return None
+
+    print(f"Términos agregados: {len(frecuencias)} palabras únicas")
+
+    try:
+        # Configurar WordCloud con MENOS palabras para mejor legibilidad
+        wordcloud = WordCloud(
+            width=800,  # Tamaño más compacto
+            height=500,  # Tamaño más compacto
+            background_color=FONDO,
+            color_func=color_func_beating,
+            max_words=MAX_PALABRAS_NUBE,  # MENOS PALABRAS - máximo 80
+            relative_scaling=0.8,  # Más énfasis en las palabras más frecuentes
+            prefer_horizontal=0.8,  # Más palabras horizontales para mejor lectura
+            scale=1.5,
+            min_font_size=14,  # Tamaño mínimo más grande
+            max_font_size=120,  # Tamaño máximo más pequeño
+            collocations=False,
+            random_state=42,
+            margin=1,  # Menos margen
+        )
+
+        layout = layouts.buscar(frecuencias)
+        if layout is None:
+            wordcloud.generate_from_frequencies(frecuencias)
+            layouts.guardar(frecuencias, wordcloud.layout_)
+        else:
+            # Misma colocación: solo colores nuevos y rasterizado
+            wordcloud.layout_ = layout
+            wordcloud.recolor(color_func=color_func_beating)
+
+        # La imagen sale directamente de WordCloud (Pillow), con el título encima
+        png = _a_png(_agregar_titulo(wordcloud.to_image(), 'Tus Emociones Musicales'))
+        print(f"Nube de palabras generada exitosamente con {len(wordcloud.layout_)} palabras")
+        return png
+
+    except Exception as e:
+        print(f"Error generando wordcloud: {str(e)}")
+        # Fallback a wordcloud simple con aún menos palabras
+        try:
+            wordcloud_fallback = WordCloud(
+                width=600,
+                height=400,
+                background_color=FONDO,
+                color_func=color_func_beating,
+                max_words=60,  # Aún menos palabras en fallback
+                random_state=42
+            ).generate_from_frequencies(frecuencias)
+            return _a_png(wordcloud_fallback.to_image())
+        except Exception as fallback_error:
+            print(f"Error incluso en fallback: {str(fallback_error)}")
+            return None
+
+
+def _punto(cx, cy, radio, angulo):
+    """Coordenadas SVG (y hacia abajo) de un ángulo en grados, antihorario desde el eje x"""
+    return cx + radio * math.cos(math.radians(angulo)), cy - radio * math.sin(math.radians(angulo))
+
+
+def generar_grafico_sentimientos_beating(datos):
+    """Genera un gráfico de sentimientos con estilo Beating (SVG)"""
+    if not datos:
+        return None
+
+    # Filtrar datos con cantidad > 0
+    datos_validos = [d for d in datos if d['cantidad'] > 0]
+    if not datos_validos:
+        return None
+
+    total = sum(d['cantidad'] for d in datos_validos)
+    cx, cy, radio = 500, 440, 270
+    cunas = []
+    inicio = 90  # Primera cuña desde arriba, en sentido antihorario
+    for d in datos_validos:
+        barrido = 360 * d['cantidad'] / total
+        medio = inicio + barrido / 2
+        # Cuñas ligeramente separadas del centro
+        ox, oy = _punto(0, 0, radio * 0.05, medio)
+        x, y = cx + ox, cy + oy
+
+        if len(datos_validos) == 1:
+            arriba, abajo = _punto(x, y, radio, 90), _punto(x, y, radio, 270)
+            d_path = (f"M {arriba[0]:.1f} {arriba[1]:.1f} "
+                      f"A {radio} {radio} 0 1 0 {abajo[0]:.1f} {abajo[1]:.1f} "
+                      f"A {radio} {radio} 0 1 0 {arriba[0]:.1f} {arriba[1]:.1f} Z")
+        else:
+            x0, y0 = _punto(x, y, radio, inicio)
+            x1, y1 = _punto(x, y, radio, inicio + barrido)
+            d_path = (f"M {x:.1f} {y:.1f} L {x0:.1f} {y0:.1f} "
+                      f"A {radio} {radio} 0 {1 if barrido > 180 else 0} 0 {x1:.1f} {y1:.1f} Z")
+
+        x_etiqueta, y_etiqueta = _punto(x, y, radio * 1.12, medio)
+        x_porcentaje, y_porcentaje = _punto(x, y, radio * 0.6, medio)
+        coseno = math.cos(math.radians(medio))
+        cunas.append(PLANTILLA_CUNA.format(
+            d=d_path,
+            color=COLORES_SENTIMIENTO.get(d['etiqueta'], GRIS),
+            fondo=FONDO,
+            x_etiqueta=x_etiqueta, y_etiqueta=y_etiqueta,
+            ancla='start' if coseno > 0.1 else 'end' if coseno < -0.1 else 'middle',
+            etiqueta=escape(d['etiqueta'].capitalize()),
+            x_porcentaje=x_porcentaje, y_porcentaje=y_porcentaje,
+            porcentaje=100 * d['cantidad'] / total
+        ))
+        inicio += barrido
+
+    return _svg(1000, 800, 'Distribución de Sentimientos', '\n'.join(cunas))
+
+
+def _color_puntuacion(score):
+    # Usar colores del tema Beating según la puntuación
+    if score > 0.7:
+        return '#10b981'
+    if score > 0.4:
+        return '#f59e0b'
+    if score > 0:
+        return '#f97316'
+    if score == 0:
+        return GRIS
+    return '#ef4444'
+
+
+def _recortar(texto, largo=28):
+    texto = str(texto or '')
+    return texto if len(texto) <= largo else texto[:largo - 1] + '…'
+
+
+def _paso_marcas(rango, marcas=6):
+    """Paso 'redondo' (1, 2, 2.5 o 5 por potencia de 10) para las marcas del eje"""
+    bruto = rango / marcas
+    potencia = 10 ** math.floor(math.log10(bruto))
+    for factor in (1, 2, 2.5, 5, 10):
+        if factor * potencia >= bruto:
+            return factor * potencia
+    return 10 * potencia
+
+
+def generar_grafico_top_canciones_beating(datos):
+    """Genera un gráfico de top canciones con estilo Beating (SVG)"""
+    if not datos:
+        return None
+
+    puntuaciones = [d['puntuacion'] for d in datos]
+    ancho, alto = 1400, 1000
+    izquierda, derecha, arriba, abajo = 320, 1340, 110, 900
+    minimo = min(0.0, min(puntuaciones))
+    maximo = max(max(puntuaciones) * 1.15, 0.01)
+    escala = (derecha - izquierda) / (maximo - minimo)
+    x_cero = izquierda + (0 - minimo) * escala
+    banda = (abajo - arriba) / len(datos)
+
+    partes = []
+    # Grid sutil y marcas del eje X
+    paso = _paso_marcas(maximo - minimo)
+    marca = math.ceil(minimo / paso) * paso
+    while marca <= maximo + 1e-9:
+        x = izquierda + (marca - minimo) * escala
+        partes.append(f'<line x1="{x:.1f}" y1="{arriba}" x2="{x:.1f}" y2="{abajo}" stroke="{ROSA}" '
+                      f'stroke-opacity="0.2" stroke-dasharray="8 6"/>')
+        partes.append(f'<text x="{x:.1f}" y="{abajo + 28}" text-anchor="middle" font-size="17" fill="white">'
+                      f'{marca:g}</text>')
+        marca += paso
+
+    for i, d in enumerate(datos):
+        score = d['puntuacion']
+        y_centro = arriba + banda * (i + 0.5)
+        x_barra = x_cero + min(0, score) * escala
+        x_valor = x_cero + max(0, score) * escala + 8
+        partes.append(PLANTILLA_BARRA.format(
+            x_texto=izquierda - 14, y_centro=y_centro,
+            titulo=escape(_recortar(d['titulo'])), artista=escape(_recortar(d['artista'])),
+            x=x_barra, y=y_centro - banda * 0.35, ancho=abs(score) * escala, alto=banda * 0.7,
+            color=_color_puntuacion(score),
+            x_valor=x_valor, y_valor=y_centro - 14, x_valor_texto=x_valor + 31,
+            fondo=FONDO, rosa=ROSA, valor=score
+        ))
+
+    # Ejes: solo abajo e izquierda, en rosa
+    partes.append(f'<line x1="{izquierda}" y1="{abajo}" x2="{derecha}" y2="{abajo}" stroke="{ROSA}" stroke-width="1.5"/>')
+    partes.append(f'<line x1="{izquierda}" y1="{arriba}" x2="{izquierda}" y2="{abajo}" stroke="{ROSA}" stroke-width="1.5"/>')
+    partes.append(f'<text x="{(izquierda + derecha) / 2:.0f}" y="{abajo + 70}" text-anchor="middle" font-size="19" '
+                  f'font-weight="bold" fill="white">Puntuación Promedio</text>')
+
+    return _svg(ancho, alto, 'Top Canciones Mejor Calificadas', '\n'.join(partes), tamano_titulo=28, y_titulo=60)
+
+
+_pool = None
+_lock_pool = threading.Lock()
+# Última foto de la caché de layouts de cada proceso del pool, por pid
+_layouts_workers = {}
+
+
+def _nube_en_worker(frecuencias):
+    """La nube en un proceso del pool, junto con el estado de su caché de layouts"""
+    return generar_wordcloud_beating(frecuencias), os.getpid(), layouts.estadisticas()
+
+
+def estadisticas_layouts():
+    """Caché de layouts de este proceso más la de los procesos de renderizado"""
+    with _lock_pool:
+        fotos = [layouts.estadisticas(), *_layouts_workers.values()]
+    total = {clave: sum(foto[clave] for foto in fotos) for clave in fotos[0]}
+    total['procesos'] = len(fotos)
+    return total
+
+
+def _obtener_pool():
+    global _pool
+    procesos = ANALISIS_CONFIG.get('render_procesos', 1)
+    if not procesos:
+        return None
+    with _lock_pool:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=procesos,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _reiniciar_pool(terminar=False):
+    """Descarta el pool; con terminar=True también mata sus procesos (un worker colgado no sale solo)"""
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            procesos = list((getattr(_pool, '_processes', None) or {}).values()) if terminar else []
+            _pool.shutdown(wait=False, cancel_futures=True)
+            for proceso in procesos:
+                proceso.terminate()
+        _pool = None
+        _layouts_workers.clear()
+
+
+def renderizar_graficas(sentimientos_data, mejores_canciones, frecuencias):
+    """
+    Renderiza las gráficas que tengan datos.
+    Devuelve {'sentiment_dist', 'top_songs', 'wordcloud'} -> bytes SVG/PNG (solo las generadas).
+    """
+    futuro = None
+    if frecuencias is not None:
+        pool = _obtener_pool()
+        if pool is not None:
+            try:
+                futuro = pool.submit(_nube_en_worker, frecuencias)
+            except BrokenProcessPool as e:
+                print(f"⚠️ Pool de renderizado caído ({e}), renderizando en este proceso")
+                _reiniciar_pool()
+
+    # Los SVG son baratos: se generan aquí mientras el pool dibuja la nube
+    graficas = {}
+    if any(s['cantidad'] > 0 for s in sentimientos_data):
+        graficas['sentiment_dist'] = generar_grafico_sentimientos_beating(sentimientos_data)
+    if mejores_canciones:
+        graficas['top_songs'] = generar_grafico_top_canciones_beating(mejores_canciones)
+
+    if frecuencias is not None:
+        if futuro is not None:
+            try:
+                graficas['wordcloud'], pid, stats = futuro.result(timeout=ANALISIS_CONFIG.get('render_timeout', 60))
+                with _lock_pool:
+                    _layouts_workers[pid] = stats
+                return graficas
+            except BrokenProcessPool as e:
+                print(f"⚠️ Pool de renderizado caído ({e}), renderizando en este proceso")
+                _reiniciar_pool()
+            except FuturoTimeout:
+                # Un worker lento o colgado: se descarta el pool con sus procesos
+                futuro.cancel()
+                print("⚠️ El pool de renderizado no respondió a tiempo, renderizando en este proceso")
+                _reiniciar_pool(terminar=True)
+        graficas['wordcloud'] = generar_wordcloud_beating(frecuencias)
+    return graficas
@@ -0,0 +1,107 @@
+import re
+
+# Emojis comunes -> texto descriptivo para que el modelo los entienda
+EMOJI_MAP = {
+    '😊': 'feliz contento positivo sonriente',
+    '😂': 'divertido risa gracioso positivo',
+    '❤️': 'amor corazón positivo',
+    '😍': 'encantado amor positivo enamorado',
+    '🤩': 'impresionado asombroso positivo',
+    '😎': 'genial cool positivo',
+    '😔': 'triste desanimado negativo',
+    '😢': 'triste llorar negativo',
+    '😭': 'llorar tristeza negativo',
+    '😠': 'enojado furioso negativo',
+    '😡': 'furioso enojado negativo',
+    '👍': 'bueno aprobar positivo',
+    '👎': 'malo desaprobar negativo',
+    '🎵': 'música canción melodia',
+    '🎧': 'escuchar música audio',
+    '🎤': 'cantar voz vocal',
+    '🔥': 'excelente fuego caliente positivo',
+    '💯': 'perfecto cien excelente positivo',
+    '⭐': 'estrella favorito positivo',
+    '🌟': 'brillante estrella positivo',
+    '🙌': 'celebrar aprobar positivo',
+    '👏': 'aplaudir felicitar positivo',
+    '💔': 'corazón roto triste negativo',
+    '😴': 'aburrido dormir negativo',
+    '🤢': 'asqueado desagradable negativo',
+    '🎉': 'celebrar fiesta positivo',
+    '🤔': 'pensar cuestionar',
+    '✨': 'magia brillante positivo',
+    '💖': 'amor corazón positivo',
+    '💕': 'amor cariño positivo',
+    '🎶': 'música notas positivo',
+    '🏆': 'ganador excelente positivo',
+    '💫': 'magia asombroso positivo',
+    '🤘': 'rock genial positivo',
+    '🙏': 'rezar esperar',
+    '🥰': 'amor feliz positivo',
+    '😘': 'beso amor positivo',
+    '🥺': 'suplicar tierno',
+    '🤗': 'abrazo amor positivo',
+    '🤭': 'tímido gracioso',
+    '🤫': 'secreto callar',
+    '🤥': 'mentira falso negativo',
+    '😇': 'angel bueno positivo',
+    '🥳': 'fiesta celebrar positivo',
+    '😏': 'sarcástico confiado',
+    '😌': 'aliviado tranquilo positivo',
+    '😪': 'soñoliento cansado',
+    '🤤': 'deseo antojo',
+    '😷': 'enfermo médico',
+    '🤒': 'enfermo fiebre negativo',
+    '🤕': 'herido dolor negativo',
+    '🤮': 'vomitar asqueado negativo',
+    '🤯': 'sorprendido asombroso',
+    '🥶': 'frío congelado',
+    '🥵': 'calor sudor',
+    '😳': 'avergonzado tímido',
+    '🥴': 'mareado confundido',
+    '😵': 'mareado aturdido',
+    '😱': 'asustado terror negativo',
+    '🤬': 'maldecir enojado negativo',
+    '👻': 'fantasma divertido',
+    '💀': 'muerte oscuro negativo',
+    '👽': 'alien extraño',
+    '🤖': 'robot tecnología',
+}
+
+# Selector de variación (U+FE0F), modificadores de tono de piel y ZWJ (U+200D):
+# '❤️' y '❤' se tratan igual, '👍🏽' cuenta como '👍' y en secuencias ZWJ
+# ('❤️‍🔥') cada componente conocido se traduce por separado
+_SUFIJO = '\ufe0f?[\U0001F3FB-\U0001F3FF]?\u200d?'
+
+_REEMPLAZOS = {}
+for _emoji, _descripcion in EMOJI_MAP.items():
+    _REEMPLAZOS[_emoji.replace('\ufe0f', '')] = f' {_descripcion} '
+
+# Una sola alternancia compilada; las secuencias más largas primero
+_EMOJI_RE = re.compile(
+    '(' + '|'.join(re.escape(e) for e in sorted(_REEMPLAZOS, key=len, reverse=True)) + ')' + _SUFIJO
+)
+
+
+def expandir_emojis(texto):
+    """Convierte emojis comunes a texto descriptivo en una sola pasada"""
+    return _EMOJI_RE.sub(lambda m: _REEMPLAZOS[m.group(1)], texto)
+
+
+# Pistas de polaridad ya codificadas en las descripciones ('positivo' / 'negativo')
+_POLARIDAD = {
+    _emoji: (1 if 'positivo' in _descripcion.split() else -1 if 'negativo' in _descripcion.split() else 0)
+    for _emoji, _descripcion in ((e.replace('\ufe0f', ''), d) for e, d in EMOJI_MAP.items())
+}
+
+
+def polaridad_emojis(texto):
+    """Cuenta (positivos, negativos) entre los emojis conocidos del texto"""
+    positivos = negativos = 0
+    for m in _EMOJI_RE.finditer(texto):
+        valor = _POLARIDAD[m.group(1)]
+        if valor > 0:
+            positivos += 1
+        elif valor < 0:
+            negativos += 1
+    return positivos, negativos
@@ -0,0 +1,223 @@
+"""
+Caché de imágenes renderizadas (gráficas y nubes de palabras) servidas como
+binario en lugar de base64 dentro del JSON.
+
+- Cada imagen se publica con una clave ('analisis/wordcloud', 'home/wordcloud'...)
+  y su ETag es un hash de su contenido.
+- Las variantes (miniatura/completo, PNG/WebP) se derivan del PNG original la
+  primera vez que se piden y quedan en memoria hasta que se publica otro. Las
+  gráficas en SVG se sirven siempre tal cual: escalan sin pérdida.
+- Como mucho `max_imagenes` claves (nubes por canción/álbum/usuario incluidas);
+  se descartan las publicadas hace más tiempo.
+- `respuesta_imagen` responde con ETag y Cache-Control y devuelve 304 si el
+  navegador ya tiene esa versión. Las URLs que van en el JSON llevan `?v=<etag>`,
+  así que esas se pueden cachear como inmutables.
+"""
+import hashlib
+import threading
+from io import BytesIO
+
+from flask import Response, request
+
+try:
+    from config import ANALISIS_CONFIG
+except ImportError:
+    ANALISIS_CONFIG = {}
+
+# Ancho máximo en píxeles de cada tamaño (None = el renderizado original)
+TAMANOS = {
+    'completo': None,
+    'miniatura': ANALISIS_CONFIG.get('ancho_miniatura', 480),
+}
+
+TIPOS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+}
+RASTER = ('png', 'webp')
+
+CALIDAD_WEBP = ANALISIS_CONFIG.get('calidad_webp', 85)
+MAX_AGE = ANALISIS_CONFIG.get('imagen_max_age', 60)
+MAX_IMAGENES = ANALISIS_CONFIG.get('max_imagenes', 128)
+
+try:
+    from PIL import Image, features
+    WEBP_DISPONIBLE = features.check('webp')
+except ImportError:
+    Image = None
+    WEBP_DISPONIBLE = False
+
+
+def etag_de(datos):
+    return hashlib.sha256(datos).hexdigest()[:20]
+
+
+def formato_de(datos):
+    """'png', 'webp' o 'svg' según la cabecera de los bytes"""
+    if datos.startswith(b'\x89PNG'):
+        return 'png'
+    if datos[:4] == b'RIFF' and datos[8:12] == b'WEBP':
+        return 'webp'
+    return 'svg'
+
+
+def huella_datos(datos):
+    """Huella de los datos de origen de una imagen (p. ej. {término: frecuencia} ordenado)"""
+    return hashlib.sha256(repr(datos).encode('utf-8')).hexdigest()[:20]
+
+
+def _convertir(original, tamano, formato):
+    """Reescala y/o recodifica la imagen raster original"""
+    ancho = TAMANOS[tamano]
+    if Image is None:
+        return original
+
+    imagen = Image.open(BytesIO(original))
+    if ancho and imagen.width > ancho:
+        alto = round(imagen.height * ancho / imagen.width)
+        imagen = imagen.resize((ancho, alto), Image.LANCZOS)
+
+    salida = BytesIO()
+    if formato == 'webp':
+        imagen.save(salida, format='WEBP', quality=CALIDAD_WEBP, method=4)
+    else:
+        imagen.save(salida, format='PNG', optimize=True)
+    return salida.getvalue()
+
+
+class ImagenesCache:
+    def __init__(self, max_imagenes=MAX_IMAGENES):
+        self.max_imagenes = max_imagenes
+        self._lock = threading.Lock()
+        self._imagenes = {}
+        self._stats = {'publicadas': 0, 'servidas': 0, 'no_modificadas': 0, 'conversiones': 0}
+
+    def publicar(self, clave, datos, huella=None):
+        """
+        Guarda la imagen (PNG o SVG) de `clave` y devuelve su ETag (None si no hay imagen).
+        `huella` identifica los datos de origen para poder saltarse el
+        renderizado con `vigente()`.
+        """
+        if not datos:
+            with self._lock:
+                self._imagenes.pop(clave, None)
+            return None
+
+        etag = etag_de(datos)
+        formato = formato_de(datos)
+        with self._lock:
+            actual = self._imagenes.get(clave)
+            if actual is not None and actual['etag'] == etag:
+                actual['huella'] = huella
+                return etag
+            self._imagenes.pop(clave, None)
+            self._imagenes[clave] = {
+                'etag': etag,
+                'huella': huella,
+                'formato': formato,
+                'original': datos,
+                'variantes': {('completo', formato): (datos, etag)},
+            }
+            while len(self._imagenes) > self.max_imagenes:
+                del self._imagenes[next(iter(self._imagenes))]
+            self._stats['publicadas'] += 1
+        return etag
+
+    def etag(self, clave):
+        with self._lock:
+            actual = self._imagenes.get(clave)
+            return actual['etag'] if actual is not None else None
+
+    def formato(self, clave):
+        with self._lock:
+            actual = self._imagenes.get(clave)
+            return actual['formato'] if actual is not None else None
+
+    def vigente(self, clave, huella):
+        """ETag de la imagen si se renderizó con la misma huella, si no None"""
+        with self._lock:
+            actual = self._imagenes.get(clave)
+            if actual is not None and huella is not None and actual['huella'] == huella:
+                return actual['etag']
+        return None
+
+    def obtener(self, clave, tamano='completo', formato='png'):
+        """
+        (bytes, etag, formato) de la variante pedida, o None si no hay imagen
+        publicada. El formato devuelto puede diferir del pedido (SVG, o WebP
+        sin soporte en Pillow).
+        """
+        with self._lock:
+            actual = self._imagenes.get(clave)
+            if actual is None:
+                return None
+            original = actual['original']
+            if actual['formato'] not in RASTER or formato not in RASTER:
+                tamano, formato = 'completo', actual['formato']
+            elif formato == 'webp' and not WEBP_DISPONIBLE:
+                formato = 'png'
+            variante = actual['variantes'].get((tamano, formato))
+        if variante is not None:
+            return (*variante, formato)
+
+        # Conversión fuera del lock; si dos hilos coinciden, el resultado es el mismo
+        datos = _convertir(original, tamano, formato)
+        variante = (datos, etag_de(datos))
+        with self._lock:
+            actual = self._imagenes.get(clave)
+            if actual is not None and actual['original'] is original:
+                actual['variantes'][(tamano, formato)] = variante
+            self._stats['conversiones'] += 1
+        return (*variante, formato)
+
+    def url(self, ruta, etag, tamano=None):
+        """URL para el JSON; el `v` cambia con el contenido"""
+        if etag is None:
+            return None
+        parametros = f"v={etag}"
+        if tamano:
+            parametros += f"&tamano={tamano}"
+        return f"{ruta}{'&' if '?' in ruta else '?'}{parametros}"
+
+    def contar(self, evento):
+        with self._lock:
+            self._stats[evento] += 1
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'imagenes': len(self._imagenes),
+                'variantes': sum(len(i['variantes']) for i in self._imagenes.values()),
+                'webp': WEBP_DISPONIBLE,
+            }
+
+
+imagenes = ImagenesCache()
+
+
+def respuesta_imagen(clave, formato='png'):
+    """
+    Respuesta binaria de la imagen `clave` para la petición actual
+    (`?tamano=miniatura|completo`), con ETag, Cache-Control y 304.
+    """
+    tamano = request.args.get('tamano', 'completo')
+    if tamano not in TAMANOS or formato not in TIPOS:
+        return Response("Variante de imagen no válida", status=400, mimetype='text/plain')
+
+    resultado = imagenes.obtener(clave, tamano, formato)
+    if resultado is None:
+        return Response(status=404)
+    datos, etag, formato = resultado
+
+    respuesta = Response(datos, mimetype=TIPOS[formato])
+    respuesta.set_etag(etag)
+    if request.args.get('v') == imagenes.etag(clave):
+        # URL versionada por contenido: no cambia nunca
+        respuesta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        respuesta.headers['Cache-Control'] = f'public, max-age={MAX_AGE}, must-revalidate'
+    respuesta = respuesta.make_conditional(request)
+    imagenes.contar('no_modificadas' if respuesta.status_code == 304 else 'servidas')
+    return respuesta
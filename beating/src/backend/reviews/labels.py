@@ -0,0 +1,138 @@
+"""
+Derivación de etiqueta y puntuación a partir de la distribución de 1-5 estrellas.
+
+La tabla sentimientos guarda `probabilidades` (REAL[5], índice 1 = 1 estrella).
+`etiqueta` y `puntuacion` se derivan de ella, así que cambiar los umbrales
+no requiere volver a pasar el modelo:
+
+1. Cambiar `positivo_desde` / `negativo_hasta` en SENTIMENT_CONFIG y reiniciar
+   el servidor (las reseñas nuevas ya usan los umbrales nuevos).
+2. Ejecutar
+
+       python -m reviews.labels
+
+   que recalcula todo el historial con los mismos umbrales en un único UPDATE.
+
+La caché de sentimientos guarda la distribución y la etiqueta se vuelve a
+derivar al leerla (`reetiquetar`), así que no hace falta vaciarla.
+
+Las filas sin `probabilidades` (resueltas por el léxico de la cascada, o
+puntuadas como 'neutral' por un error) no se pueden re-etiquetar y conservan su
+etiqueta. Tienen `modelo_version` NULL, así que
+`python -m reviews.rescore --solo-desactualizadas` las pasa por el modelo.
+"""
+import argparse
+
+from database.connection import db
+from database.schema import asegurar_esquema
+from reviews.analysis_cache import registrar_cambio
+
+try:
+    from config import SENTIMENT_CONFIG
+except ImportError:
+    SENTIMENT_CONFIG = {}
+
+POSITIVO_DESDE = SENTIMENT_CONFIG.get('positivo_desde', 4)
+NEGATIVO_HASTA = SENTIMENT_CONFIG.get('negativo_hasta', 2)
+
+
+def etiquetar(estrellas, score, positivo_desde=POSITIVO_DESDE, negativo_hasta=NEGATIVO_HASTA):
+    """(estrellas 1-5 más probable, su probabilidad) -> (sentimiento, puntuación)"""
+    if estrellas >= positivo_desde:
+        return 'positivo', round(0.5 + (score * 0.5), 2)
+    if estrellas <= negativo_hasta:
+        return 'negativo', round(score * 0.5, 2)
+    return 'neutral', 0.5
+
+
+def etiquetar_probabilidades(probabilidades, **umbrales):
+    """Deriva (sentimiento, puntuación) de un vector de 5 probabilidades"""
+    indice = max(range(len(probabilidades)), key=probabilidades.__getitem__)
+    return etiquetar(indice + 1, float(probabilidades[indice]), **umbrales)
+
+
+def reetiquetar(resultado):
+    """(sentimiento, puntuación, probabilidades) con la etiqueta de los umbrales actuales"""
+    probabilidades = resultado[2]
+    if probabilidades is None:
+        return resultado
+    return (*etiquetar_probabilidades(probabilidades), probabilidades)
+
+
+# Equivalente en SQL de etiquetar_probabilidades() para todo el historial
+SQL_RECALCULAR = """
+    UPDATE sentimientos s
+    SET etiqueta = d.etiqueta,
+        puntuacion = d.puntuacion
+    FROM (
+        SELECT id_resena,
+               CASE WHEN estrellas >= %(positivo_desde)s THEN 'positivo'
+                    WHEN estrellas <= %(negativo_hasta)s THEN 'negativo'
+                    ELSE 'neutral' END AS etiqueta,
+               ROUND((CASE WHEN estrellas >= %(positivo_desde)s THEN 0.5 + p * 0.5
+                           WHEN estrellas <= %(negativo_hasta)s THEN p * 0.5
+                           ELSE 0.5 END)::numeric, 2) AS puntuacion
+        FROM (
+            SELECT DISTINCT ON (s2.id_resena) s2.id_resena, u.estrellas, u.p
+            FROM sentimientos s2,
+                 unnest(s2.probabilidades) WITH ORDINALITY AS u(p, estrellas)
+            WHERE s2.probabilidades IS NOT NULL
+            -- En un empate gana el menor número de estrellas, como max() en Python
+            ORDER BY s2.id_resena, u.p DESC, u.estrellas ASC
+        ) maximos
+    ) d
+    WHERE s.id_resena = d.id_resena
+"""
+
+
+def recalcular_etiquetas(positivo_desde=POSITIVO_DESDE, negativo_hasta=NEGATIVO_HASTA):
+    """
+    Re-etiqueta todas las filas con probabilidades guardadas.
+    Devuelve (actualizadas, sin_probabilidades) o None si hubo un error.
+    """
+    conn = db.get_connection()
+    if not conn:
+        print("❌ Error de conexión a la base de datos")
+        return None
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SQL_RECALCULAR, {'positivo_desde': positivo_desde, 'negativo_hasta': negativo_hasta})
+        actualizadas = cur.rowcount
+        registrar_cambio(cur)
+        cur.execute("""
+            SELECT COUNT(*) FROM sentimientos
+            WHERE probabilidades IS NULL AND etiqueta <> 'pendiente'
+        """)
+        sin_probabilidades = cur.fetchone()[0]
+        conn.commit()
+        return actualizadas, sin_probabilidades
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error re-etiquetando sentimientos: {e}")
+        return None
+    finally:
+        if cur:
+            cur.close()
+        db.close_connection(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # Sin opciones de umbral: tienen que ser los mismos que usa el servidor (SENTIMENT_CONFIG)
+    parser.parse_args()
+
+    asegurar_esquema()
+    resultado = recalcular_etiquetas()
+    if resultado is None:
+        raise SystemExit(1)
+    actualizadas, sin_probabilidades = resultado
+    print(f"✅ {actualizadas} sentimientos re-etiquetados "
+          f"(positivo desde {POSITIVO_DESDE} estrellas, negativo hasta {NEGATIVO_HASTA})")
+    if sin_probabilidades:
+        print(f"⚠️ {sin_probabilidades} sentimientos sin probabilidades conservan su etiqueta; "
+              f"para re-puntuarlos: python -m reviews.rescore --solo-desactualizadas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import re
+
+# Palabras frecuentes de cada idioma (conjuntos inmutables, búsqueda O(1) por token)
+PALABRAS_EN = frozenset({
+    'about', 'after', 'album', 'all', 'also', 'and', 'any', 'are', 'back', 'bad', 'be',
+    'because', 'best', 'but', 'come', 'could', 'day', "don't", 'even', 'first', 'for',
+    'from', 'give', 'good', 'great', 'have', 'his', 'how', 'i', "i'm", 'into', 'is',
+    'it', "it's", 'its', 'just', 'know', 'like', 'look', 'love', 'make', 'most',
+    'my', 'new', 'not', 'now', 'one', 'only', 'other', 'our', 'over', 'people',
+    'really', 'see', 'so', 'some', 'song', 'songs', 'take', 'than', 'that', 'the',
+    'their', 'them', 'then', 'there', 'these', 'they', 'think', 'this', 'time', 'track',
+    'two', 'us', 'use', 'very', 'want', 'was', 'way', 'well', 'what', 'when', 'which',
+    'with', 'work', 'would', 'year', 'you', 'your'
+})
+
+PALABRAS_ES = frozenset({
+    'acabar', 'agua', 'ahora', 'al', 'algo', 'alguno', 'aparecer', 'aquel', 'así',
+    'aunque', 'año', 'aún', 'buena', 'bueno', 'cabeza', 'cada', 'cambiar', 'canciones',
+    'canción', 'cara', 'casa', 'ciudad', 'claro', 'color', 'comenzar', 'como', 'con',
+    'conseguir', 'considerar', 'continuar', 'correr', 'cosa', 'cual', 'cuando', 'dar',
+    'de', 'decir', 'dejar', 'del', 'desde', 'después', 'dinero', 'donde', 'dos', 'el',
+    'ella', 'empezar', 'en', 'encontrar', 'entender', 'entonces', 'entre', 'era', 'es',
+    'esa', 'ese', 'eso', 'esperar', 'esta', 'estar', 'este', 'esto', 'estudio', 'está',
+    'explicar', 'forma', 'fue', 'grande', 'gusta', 'gustar', 'gustó', 'haber', 'hablar',
+    'hacer', 'hasta', 'hecho', 'hijo', 'historia', 'hombre', 'importante', 'intentar',
+    'ir', 'jugar', 'la', 'lado', 'las', 'le', 'les', 'letra', 'llamar', 'llegar',
+    'llevar', 'lo', 'lograr', 'los', 'luz', 'mala', 'malo', 'mano', 'mantener', 'me',
+    'mejor', 'menos', 'mes', 'mi', 'mientras', 'mil', 'mismo', 'mostrar', 'mucho',
+    'mujer', 'mundo', 'muy', 'más', 'nacional', 'necesitar', 'ni', 'no', 'noche', 'nos',
+    'nuestro', 'nunca', 'o', 'ocurrir', 'ojo', 'otro', 'otros', 'para', 'parecer',
+    'parte', 'pasado', 'pedir', 'pensar', 'peor', 'permitir', 'pero', 'pertenecer',
+    'poder', 'poner', 'por', 'porque', 'presentar', 'primero', 'problema', 'punto',
+    'que', 'quedar', 'querer', 'quien', 'qué', 'recibir', 'recordar', 'saber', 'se',
+    'seguir', 'sentir', 'ser', 'servir', 'si', 'siempre', 'significar', 'sin', 'sobre',
+    'son', 'su', 'tal', 'también', 'tan', 'tener', 'terminar', 'tiempo', 'tierra',
+    'tipo', 'todo', 'trabajar', 'trabajo', 'tratar', 'un', 'una', 'unas', 'unos',
+    'venir', 'ver', 'vez', 'vida', 'vivir', 'voz', 'y', 'ya', 'yo', 'álbum', 'él'
+})
+
+_TOKEN_RE = re.compile(r"[a-záéíóúüñ']+")
+_CARACTERES_ES = frozenset('áéíóúüñÁÉÍÓÚÜÑ¿¡')
+_LETRA_RE = re.compile(r'[a-zA-Z]')
+
+
+def tokenizar(texto):
+    """Tokens en minúsculas (una sola pasada de lower() y de regex)"""
+    return _TOKEN_RE.findall(texto.lower())
+
+
+def detectar_idioma(texto, tokens=None):
+    """
+    Detecta si un texto está en español o inglés.
+
+    Devuelve (idioma, confianza) con idioma 'es' o 'en' y confianza en [0, 1].
+    Sin palabras conocidas se mantiene el criterio original: inglés si hay
+    letras (y ningún acento, ñ ni ¿¡), español si no; siempre con confianza 0.
+    """
+    if tokens is None:
+        tokens = tokenizar(texto)
+
+    votos_en = 0
+    votos_es = 0
+    for token in tokens:
+        if token in PALABRAS_EN:
+            votos_en += 1
+        if token in PALABRAS_ES:
+            votos_es += 1
+
+    # Los acentos, la ñ y los signos de apertura son evidencia fuerte de español
+    if not _CARACTERES_ES.isdisjoint(texto):
+        votos_es += 2
+
+    total = votos_en + votos_es
+    if total == 0:
+        return ('en' if _LETRA_RE.search(texto) else 'es'), 0.0
+
+    idioma = 'en' if votos_en > votos_es else 'es'
+    return idioma, round(abs(votos_en - votos_es) / total, 2)
@@ -0,0 +1,135 @@
+import threading
+
+from reviews.emojis import polaridad_emojis
+from reviews.language import tokenizar, detectar_idioma
+
+try:
+    from textblob import TextBlob
+    TEXTBLOB_AVAILABLE = True
+except ImportError:
+    TEXTBLOB_AVAILABLE = False
+
+PALABRAS_POSITIVAS = frozenset({
+    # Español
+    'bueno', 'buena', 'buenísima', 'buenísimo', 'excelente', 'genial', 'increíble',
+    'hermosa', 'hermoso', 'preciosa', 'precioso', 'encanta', 'encantó', 'mejor',
+    'perfecta', 'perfecto', 'brutal', 'maravillosa', 'maravilloso', 'espectacular',
+    'favorita', 'favorito', 'recomiendo', 'bonita', 'bonito',
+    'fantástica', 'fantástico', 'impecable', 'emocionante', 'adictiva', 'pegadiza',
+    # Inglés
+    'good', 'great', 'amazing', 'love', 'loved', 'best', 'beautiful', 'awesome',
+    'perfect', 'masterpiece', 'excellent', 'favorite', 'fantastic', 'brilliant',
+    'wonderful', 'catchy',
+})
+
+PALABRAS_NEGATIVAS = frozenset({
+    # Español
+    'malo', 'mala', 'horrible', 'aburrido', 'aburrida', 'peor', 'decepción',
+    'decepcionante', 'terrible', 'odio', 'pésimo', 'pésima', 'basura', 'fatal',
+    'repetitivo', 'repetitiva', 'insoportable', 'mediocre', 'desafinado', 'flojo', 'floja',
+    # Inglés
+    'bad', 'boring', 'worst', 'terrible', 'awful', 'hate', 'disappointing',
+    'trash', 'mediocre', 'annoying', 'bland', 'weak', 'overrated',
+})
+
+# Expresiones de dos palabras que solo tienen polaridad juntas ("la maestra dijo..." no la tiene)
+FRASES_POSITIVAS = frozenset({('obra', 'maestra')})
+
+NEGACIONES = frozenset({'no', 'nunca', 'ni', 'jamás', 'not', 'never', "don't", "didn't", "isn't", "wasn't"})
+
+
+class LexiconClassifier:
+    """
+    Clasificador barato basado en léxico y emojis para la cascada de sentimientos.
+
+    Cuenta palabras y emojis con polaridad (reutilizando las pistas
+    'positivo'/'negativo' del mapa de emojis), invierte la palabra que sigue a
+    una negación y, si textblob está instalado, suma su polaridad en textos en
+    inglés. Devuelve (sentimiento, puntuacion, confianza) con confianza en [0, 1].
+    """
+
+    def classify(self, texto):
+        tokens = tokenizar(texto)
+        positivos, negativos = polaridad_emojis(texto)
+
+        negar = False
+        saltar = False
+        for token, siguiente in zip(tokens, tokens[1:] + [None]):
+            if saltar:
+                saltar = False
+                continue
+            if token in NEGACIONES:
+                negar = True
+                continue
+            if (token, siguiente) in FRASES_POSITIVAS:
+                saltar = True
+                if negar:
+                    negativos += 1
+                else:
+                    positivos += 1
+            elif token in PALABRAS_POSITIVAS:
+                if negar:
+                    negativos += 1
+                else:
+                    positivos += 1
+            elif token in PALABRAS_NEGATIVAS:
+                if negar:
+                    positivos += 1
+                else:
+                    negativos += 1
+            negar = False
+
+        pistas = positivos + negativos
+        polaridad = (positivos - negativos) / pistas if pistas else 0.0
+
+        if TEXTBLOB_AVAILABLE and detectar_idioma(texto, tokens)[0] == 'en':
+            polaridad_blob = TextBlob(texto).sentiment.polarity
+            if polaridad_blob:
+                polaridad = (polaridad * pistas + polaridad_blob) / (pistas + 1)
+                pistas += 1
+
+        # Pocas pistas o pistas contradictorias -> baja confianza
+        confianza = round(abs(polaridad) * min(1.0, pistas / 3), 2)
+
+        # Mismo criterio de puntuación que reviews.labels.etiquetar
+        if polaridad > 0:
+            return 'positivo', round(0.5 + confianza * 0.5, 2), confianza
+        if polaridad < 0:
+            return 'negativo', round(confianza * 0.5, 2), confianza
+        return 'neutral', 0.5, confianza
+
+
+class CascadeFilter:
+    """
+    Primera etapa de la cascada: resuelve con el léxico los textos cuya
+    confianza llega al umbral y deja en None los que deben ir al modelo.
+    """
+
+    def __init__(self, umbral=0.67, clasificador=None):
+        self.umbral = umbral
+        self.clasificador = clasificador or LexiconClassifier()
+        self._lock = threading.Lock()
+        self._stats = {'evaluadas': 0, 'resueltas_lexico': 0, 'escaladas': 0}
+
+    def filtrar(self, textos):
+        resultados = []
+        for texto in textos:
+            sentimiento, puntuacion, confianza = self.clasificador.classify(texto)
+            # Sin distribución de estrellas: el léxico no produce probabilidades
+            resultados.append((sentimiento, puntuacion, None) if confianza >= self.umbral else None)
+
+        resueltas = sum(1 for r in resultados if r is not None)
+        with self._lock:
+            self._stats['evaluadas'] += len(textos)
+            self._stats['resueltas_lexico'] += resueltas
+            self._stats['escaladas'] += len(textos) - resueltas
+        return resultados
+
+    def estadisticas(self):
+        with self._lock:
+            evaluadas = self._stats['evaluadas']
+            return {
+                **self._stats,
+                'umbral': self.umbral,
+                'tasa_escalado': round(self._stats['escaladas'] / evaluadas, 3) if evaluadas else 0.0,
+            }
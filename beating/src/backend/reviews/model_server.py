@@ -0,0 +1,377 @@
+"""
+Servidor local de inferencia de sentimientos (sidecar) sobre un socket Unix.
+
+Con varios workers WSGI cada proceso cargaría su propia copia de BERT y torch.
+Con este servidor hay una sola copia del modelo por máquina:
+
+    python -m reviews.model_server [--socket RUTA] [--timeout 10]
+
+y en la configuración de la app `SENTIMENT_CONFIG['servidor_modelo']` con la
+ruta del socket. SentimentAnalyzer usa entonces RemoteBackend, un cliente
+ligero con timeout y, opcionalmente, respaldo en un modelo local.
+
+Las peticiones de todas las conexiones se agrupan con MicroBatcher, así que
+los textos de distintos workers comparten forward pass. Un lote que no termina
+en `timeout` segundos se responde con error y libera el hilo de la conexión.
+
+El socket por defecto está en un directorio privado del usuario
+(XDG_RUNTIME_DIR, o beating-<uid> dentro del directorio temporal) con permisos
+0700, y el propio socket se crea con 0600: solo el mismo usuario se conecta.
+
+Protocolo binario (enteros big-endian), cada mensaje va precedido de su
+longitud como uint32:
+  - Petición:  version u8 | op u8 | max_chunks u8 | n_textos u32
+               | len_modelo u16 | modelo utf-8 | n_textos x (len u32 | texto utf-8)
+  - Respuesta: version u8 | estado u8 | n u32 | cuerpo
+               estado 0 con n > 0: n x 5 float32 (distribución de 1-5 estrellas)
+               estado 0 con n = 0 (ping) o estado 1 (error): mensaje utf-8
+"""
+import argparse
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturoTimeout
+
+import numpy as np
+
+from reviews.backends import etiquetar_estrellas
+from reviews.batching import MicroBatcher
+
+VERSION = 1
+OP_PREDECIR = 1
+OP_PING = 2
+ESTADO_OK = 0
+ESTADO_ERROR = 1
+
+
+def _directorio_privado():
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    if base:
+        return os.path.join(base, 'beating')
+    return os.path.join(tempfile.gettempdir(), f'beating-{os.getuid()}')
+
+
+SOCKET_DEFAULT = os.path.join(_directorio_privado(), 'sentiment.sock')
+
+# Fallos del servidor con los que el cliente pasa al modelo local (ValueError:
+# versión de protocolo distinta; struct.error: respuesta truncada)
+ERRORES_SERVIDOR = (OSError, ConnectionError, RuntimeError, ValueError, struct.error)
+
+_LONGITUD = struct.Struct('!I')
+_CABECERA_PETICION = struct.Struct('!BBBIH')
+_CABECERA_RESPUESTA = struct.Struct('!BBI')
+_FILA = np.dtype('>f4')
+
+
+def _recibir_exacto(conexion, n):
+    partes = []
+    while n:
+        parte = conexion.recv(min(n, 1 << 20))
+        if not parte:
+            raise ConnectionError("Conexión cerrada por el otro extremo")
+        partes.append(parte)
+        n -= len(parte)
+    return b''.join(partes)
+
+
+def _recibir_mensaje(conexion):
+    (longitud,) = _LONGITUD.unpack(_recibir_exacto(conexion, _LONGITUD.size))
+    return _recibir_exacto(conexion, longitud)
+
+
+def _enviar_mensaje(conexion, cuerpo):
+    conexion.sendall(_LONGITUD.pack(len(cuerpo)) + cuerpo)
+
+
+def codificar_peticion(op, modelo, textos=(), max_chunks=1):
+    modelo = modelo.encode('utf-8')
+    partes = [_CABECERA_PETICION.pack(VERSION, op, max_chunks, len(textos), len(modelo)), modelo]
+    for texto in textos:
+        datos = texto.encode('utf-8')
+        partes.append(_LONGITUD.pack(len(datos)))
+        partes.append(datos)
+    return b''.join(partes)
+
+
+def decodificar_peticion(cuerpo):
+    version, op, max_chunks, n, len_modelo = _CABECERA_PETICION.unpack_from(cuerpo)
+    if version != VERSION:
+        raise ValueError(f"Versión de protocolo no soportada: {version}")
+    posicion = _CABECERA_PETICION.size
+    modelo = cuerpo[posicion:posicion + len_modelo].decode('utf-8')
+    posicion += len_modelo
+    textos = []
+    for _ in range(n):
+        (longitud,) = _LONGITUD.unpack_from(cuerpo, posicion)
+        posicion += _LONGITUD.size
+        textos.append(cuerpo[posicion:posicion + longitud].decode('utf-8'))
+        posicion += longitud
+    return op, modelo, textos, max_chunks
+
+
+def codificar_respuesta(probs=None, mensaje='', estado=ESTADO_OK):
+    if probs is not None:
+        probs = np.asarray(probs, dtype=_FILA)
+        return _CABECERA_RESPUESTA.pack(VERSION, estado, len(probs)) + probs.tobytes()
+    return _CABECERA_RESPUESTA.pack(VERSION, estado, 0) + mensaje.encode('utf-8')
+
+
+def decodificar_respuesta(cuerpo):
+    """Devuelve la matriz (n, 5) de probabilidades o el mensaje de un ping"""
+    version, estado, n = _CABECERA_RESPUESTA.unpack_from(cuerpo)
+    resto = cuerpo[_CABECERA_RESPUESTA.size:]
+    if version != VERSION:
+        raise ValueError(f"Versión de protocolo no soportada: {version}")
+    if estado != ESTADO_OK:
+        raise RuntimeError(f"Servidor de modelo: {resto.decode('utf-8')}")
+    if n == 0:
+        return resto.decode('utf-8')
+    return np.frombuffer(resto, dtype=_FILA).reshape(n, 5).astype(np.float64)
+
+
+class RemoteBackend:
+    """
+    Cliente del servidor de modelo con la misma interfaz que los backends locales.
+
+    - Reutiliza conexiones (una por hilo concurrente como máximo).
+    - Cada llamada tiene `timeout` segundos; si falla y hay `respaldo`
+      (función que carga un backend local), se usa ese backend y se vuelve a
+      intentar con el servidor pasados `espera_reintento` segundos.
+    """
+
+    def __init__(self, model_name, socket_path=SOCKET_DEFAULT, timeout=10, respaldo=None,
+                 espera_reintento=30, espera_inicial=None):
+        self.model_name = model_name
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.espera_reintento = espera_reintento
+        self._respaldo = respaldo
+        self._backend_respaldo = None
+        self._caido_hasta = 0.0
+        self._libres = []
+        self._lock = threading.Lock()
+        self._lock_respaldo = threading.Lock()
+        self._stats = {'peticiones': 0, 'errores': 0, 'respaldo': 0}
+
+        # El sidecar puede estar arrancando a la vez que la app: se reintenta un rato
+        limite = time.monotonic() + (timeout if espera_inicial is None else espera_inicial)
+        while True:
+            try:
+                # Mismo nombre que el backend del servidor: los resultados no cambian
+                # por pasar por el socket, así que modelo_version tampoco
+                self.nombre = self._llamar(codificar_peticion(OP_PING, model_name))
+                break
+            except ERRORES_SERVIDOR:
+                if time.monotonic() < limite:
+                    time.sleep(0.5)
+                    continue
+                if self._respaldo is None:
+                    raise
+                print(f"⚠️ Servidor de modelo no disponible en {socket_path}, usando modelo local")
+                self.nombre = self._cargar_respaldo().nombre
+                self._caido_hasta = time.monotonic() + self.espera_reintento
+                break
+        print(f"🔌 Cliente del servidor de modelo listo ({socket_path}, {self.nombre})")
+
+    def _conectar(self):
+        with self._lock:
+            if self._libres:
+                return self._libres.pop()
+        conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexion.settimeout(self.timeout)
+        try:
+            conexion.connect(self.socket_path)
+        except OSError:
+            conexion.close()
+            raise
+        return conexion
+
+    def _llamar(self, peticion):
+        conexion = self._conectar()
+        try:
+            _enviar_mensaje(conexion, peticion)
+            respuesta = decodificar_respuesta(_recibir_mensaje(conexion))
+        except Exception:
+            # Una conexión a medio leer no se puede reutilizar
+            conexion.close()
+            raise
+        with self._lock:
+            self._libres.append(conexion)
+        return respuesta
+
+    def predict_proba(self, textos, max_chunks=1):
+        textos = list(textos)
+        if not textos:
+            return np.zeros((0, 5))
+        if self._backend_respaldo is not None and time.monotonic() < self._caido_hasta:
+            return self._predecir_respaldo(textos, max_chunks)
+        with self._lock:
+            self._stats['peticiones'] += 1
+        try:
+            return self._llamar(codificar_peticion(OP_PREDECIR, self.model_name, textos, max_chunks))
+        except ERRORES_SERVIDOR as e:
+            with self._lock:
+                self._stats['errores'] += 1
+            if self._respaldo is None:
+                raise
+            print(f"⚠️ Fallo del servidor de modelo ({e}), usando modelo local")
+            self._caido_hasta = time.monotonic() + self.espera_reintento
+            return self._predecir_respaldo(textos, max_chunks)
+
+    def _cargar_respaldo(self):
+        with self._lock_respaldo:
+            if self._backend_respaldo is None:
+                self._backend_respaldo = self._respaldo()
+            return self._backend_respaldo
+
+    def _predecir_respaldo(self, textos, max_chunks):
+        with self._lock:
+            self._stats['respaldo'] += 1
+        return self._cargar_respaldo().predict_proba(textos, max_chunks=max_chunks)
+
+    def predict(self, textos, max_chunks=1):
+        return etiquetar_estrellas(self.predict_proba(textos, max_chunks=max_chunks))
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'socket': self.socket_path,
+                'conexiones_libres': len(self._libres),
+                'respaldo_cargado': self._backend_respaldo is not None,
+            }
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor con un hilo por conexión; la inferencia pasa por un MicroBatcher por modelo"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, cargar, modelos_permitidos, max_batch_size=32, max_wait_ms=5, timeout=10):
+        _preparar_directorio(os.path.dirname(socket_path))
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.cargar = cargar
+        self.modelos_permitidos = frozenset(modelos_permitidos)
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.timeout = timeout
+        self.backends = {}
+        self.batchers = {}
+        self._lock = threading.Lock()
+        # El socket nace con 0600 (umask durante el bind): no hay ventana con otros permisos
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _ManejadorModelo)
+        finally:
+            os.umask(umask)
+
+    def backend(self, modelo):
+        if modelo not in self.modelos_permitidos:
+            raise ValueError(f"Modelo no configurado en el servidor: {modelo}")
+        with self._lock:
+            if modelo not in self.backends:
+                self.backends[modelo] = self.cargar(modelo)
+            return self.backends[modelo]
+
+    def batcher(self, modelo, max_chunks):
+        backend = self.backend(modelo)
+        with self._lock:
+            clave = (modelo, max_chunks)
+            if clave not in self.batchers:
+                self.batchers[clave] = MicroBatcher(
+                    lambda textos: list(backend.predict_proba(textos, max_chunks=max_chunks)),
+                    max_batch_size=self.max_batch_size,
+                    max_wait_ms=self.max_wait_ms,
+                    nombre=f"model-server-{modelo}-{max_chunks}"
+                )
+            return self.batchers[clave]
+
+
+class _ManejadorModelo(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                peticion = _recibir_mensaje(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                op, modelo, textos, max_chunks = decodificar_peticion(peticion)
+                if op == OP_PING:
+                    respuesta = codificar_respuesta(mensaje=self.server.backend(modelo).nombre)
+                elif op == OP_PREDECIR:
+                    batcher = self.server.batcher(modelo, max_chunks)
+                    futuros = [batcher.submit(texto) for texto in textos]
+                    respuesta = codificar_respuesta(self._resultados(futuros))
+                else:
+                    raise ValueError(f"Operación desconocida: {op}")
+            except Exception as e:
+                print(f"❌ Error en servidor de modelo: {e}")
+                respuesta = codificar_respuesta(mensaje=str(e), estado=ESTADO_ERROR)
+            try:
+                _enviar_mensaje(self.request, respuesta)
+            except OSError:
+                return
+
+    def _resultados(self, futuros):
+        """Resultados de un lote con un plazo común; un lote atascado no retiene el hilo"""
+        limite = time.monotonic() + self.server.timeout
+        try:
+            return [futuro.result(timeout=max(0.0, limite - time.monotonic())) for futuro in futuros]
+        except FuturoTimeout:
+            for futuro in futuros:
+                futuro.cancel()
+            raise RuntimeError(f"La inferencia superó {self.server.timeout}s")
+
+
+def _preparar_directorio(directorio):
+    """Crea el directorio del socket (0700); si es el privado por defecto, comprueba dueño y permisos"""
+    if not directorio:
+        return
+    os.makedirs(directorio, mode=0o700, exist_ok=True)
+    if directorio == _directorio_privado():
+        estado = os.stat(directorio)
+        if estado.st_uid != os.getuid():
+            raise PermissionError(f"{directorio} pertenece a otro usuario")
+        if estado.st_mode & 0o077:
+            os.chmod(directorio, 0o700)
+
+
+def main():
+    from reviews.sentiment import MODEL_NAME, MODELOS_POR_IDIOMA, SENTIMENT_CONFIG, cargar_backend_local
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default=SENTIMENT_CONFIG.get('servidor_modelo') or SOCKET_DEFAULT)
+    parser.add_argument('--batch', type=int, default=SENTIMENT_CONFIG.get('servidor_batch_max_size', 32))
+    parser.add_argument('--espera-ms', type=float, default=SENTIMENT_CONFIG.get('servidor_batch_max_wait_ms', 5))
+    parser.add_argument('--timeout', type=float, default=SENTIMENT_CONFIG.get('servidor_timeout', 10),
+                        help="Segundos máximos por petición de inferencia")
+    args = parser.parse_args()
+
+    servidor = ModelServer(
+        args.socket,
+        # Solo el modelo principal va detrás del pool de procesos: se carga antes de la primera inferencia
+        lambda modelo: cargar_backend_local(
+            modelo, SENTIMENT_CONFIG.get('procesos') if modelo == MODEL_NAME else None
+        ),
+        [MODEL_NAME, *MODELOS_POR_IDIOMA.values()],
+        max_batch_size=args.batch,
+        max_wait_ms=args.espera_ms,
+        timeout=args.timeout
+    )
+    # El modelo principal se carga antes de aceptar conexiones
+    servidor.backend(MODEL_NAME)
+    print(f"🧠 Servidor de modelo escuchando en {args.socket}")
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+        os.unlink(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Moderación de groserías compartida por resenas/ y reviews/.
+
+Toda la lista se compila en una sola expresión regular (alternancia de
+palabras completas, las más largas primero) y un único recorrido del texto
+devuelve a la vez el texto censurado, cuántas groserías distintas contiene y
+cuáles son.
+
+La lista puede ampliarse con un archivo (una palabra por línea, `#` para
+comentarios) en `MODERACION_CONFIG['archivo_groserias']`; si el archivo
+cambia se recarga en caliente sin reiniciar la app.
+
+El resultado se guarda en `resenas` al crear cada reseña (texto_censurado,
+groserias_cantidad, groserias_terminos). Para las reseñas anteriores, o tras
+cambiar la lista de palabras:
+
+    python -m reviews.moderation [--todas] [--batch 1000]
+"""
+import argparse
+import os
+import re
+import threading
+import time
+
+try:
+    from config import MODERACION_CONFIG
+except ImportError:
+    MODERACION_CONFIG = {}
+
+# LISTA DE GROSERÍAS EN ESPAÑOL E INGLÉS
+GROSERIAS = frozenset({
+    # Español
+    'puta', 'puto', 'mierda', 'coño', 'carajo', 'joder', 'cabrón', 'cabrona',
+    'pendejo', 'pendeja', 'verga', 'chingar', 'chinga', 'pinche', 'culero',
+    'culera', 'pito', 'concha', 'boludo', 'pelotudo', 'gilipollas', 'hostia',
+    'cojones', 'maricón', 'maricona', 'zorra', 'idiota', 'estúpido', 'imbécil',
+    'malparido', 'hijueputa', 'hijodeputa', 'hdp', 'caradura', 'desgraciado',
+    'maldito', 'maldita', 'bastardo', 'bastarda', 'sinvergüenza', 'careverga',
+
+    # Inglés
+    'fuck', 'shit', 'ass', 'bitch', 'dick', 'pussy', 'cock', 'cunt', 'whore',
+    'slut', 'bastard', 'motherfucker', 'fucker', 'damn', 'hell', 'piss',
+    'crap', 'douche', 'fag', 'faggot', 'retard', 'nigger', 'nigga', 'spic',
+    'kike', 'chink', 'gook', 'wop', 'bimbo', 'skank', 'hoe', 'twat', 'wanker',
+    'wank', 'jerk', 'asshole', 'dickhead', 'prick', 'shithead', 'douchebag',
+    'scumbag', 'shitbag', 'fuckface', 'dipshit', 'shitass', 'fuckwit', 'cocksucker'
+})
+
+
+def compilar_patron(palabras):
+    """Una sola regex de palabras completas; las más largas primero"""
+    alternativas = '|'.join(re.escape(p) for p in sorted(palabras, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternativas + r')\b', re.IGNORECASE)
+
+
+def leer_archivo_groserias(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        lineas = (linea.split('#', 1)[0].strip().lower() for linea in f)
+        return frozenset(linea for linea in lineas if linea)
+
+
+class Moderador:
+    """
+    Censura y detección de groserías en un solo recorrido.
+
+    El patrón y la lista se sustituyen juntos de forma atómica al recargar,
+    así que los hilos que están moderando nunca ven un estado a medias.
+    """
+
+    def __init__(self, palabras=GROSERIAS, archivo=None, intervalo_recarga=5.0):
+        self.base = frozenset(palabras)
+        self.archivo = archivo
+        self.intervalo_recarga = intervalo_recarga
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._proxima_revision = 0.0
+        self._estado = (self.base, compilar_patron(self.base))
+        if archivo:
+            self.recargar()
+
+    @property
+    def palabras(self):
+        return self._estado[0]
+
+    def recargar(self, palabras=None):
+        """Recompila con `palabras` o, si no se indican, con la base más el archivo"""
+        with self._lock:
+            if palabras is None:
+                palabras = set(self.base)
+                if self.archivo and os.path.exists(self.archivo):
+                    self._mtime = os.path.getmtime(self.archivo)
+                    palabras |= leer_archivo_groserias(self.archivo)
+            palabras = frozenset(palabras)
+            self._estado = (palabras, compilar_patron(palabras))
+        print(f"🛡️ Lista de groserías cargada: {len(palabras)} palabras")
+
+    def _revisar_archivo(self):
+        # Como mucho una llamada a stat() cada intervalo_recarga segundos
+        ahora = time.monotonic()
+        if not self.archivo or ahora < self._proxima_revision:
+            return
+        self._proxima_revision = ahora + self.intervalo_recarga
+        try:
+            mtime = os.path.getmtime(self.archivo)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.recargar()
+
+    def moderar(self, texto):
+        """Devuelve (texto_censurado, cantidad de groserías distintas, lista de groserías)"""
+        if not texto:
+            return texto, 0, []
+        self._revisar_archivo()
+        _, patron = self._estado
+
+        encontradas = set()
+
+        def _censurar(coincidencia):
+            palabra = coincidencia.group(0)
+            encontradas.add(palabra.lower())
+            return '*' * len(palabra)
+
+        texto_censurado = patron.sub(_censurar, texto)
+        return texto_censurado, len(encontradas), sorted(encontradas)
+
+
+moderador = Moderador(
+    archivo=MODERACION_CONFIG.get('archivo_groserias'),
+    intervalo_recarga=MODERACION_CONFIG.get('intervalo_recarga', 5.0)
+)
+
+
+def censurar_texto(texto):
+    """
+    Censura groserías en el texto reemplazándolas con asteriscos
+    pero mantiene el análisis de sentimientos intacto
+    """
+    return moderador.moderar(texto)[0]
+
+
+def detectar_groserias(texto):
+    """Detecta si el texto contiene groserías y las cuenta"""
+    _, cantidad, groserias = moderador.moderar(texto)
+    return cantidad, groserias
+
+
+def backfill(todas=False, batch=1000):
+    """
+    Guarda la moderación de las reseñas que no la tienen (o de todas).
+    Avanza por id_resena y confirma cada lote, así que se puede interrumpir
+    y volver a lanzar. Devuelve cuántas reseñas actualizó, o None si falló.
+    """
+    from psycopg2.extras import execute_values
+    from database.connection import db
+    from database.schema import asegurar_esquema
+    from reviews.analysis_cache import registrar_cambio
+
+    asegurar_esquema()
+    conn = db.get_connection()
+    if not conn:
+        print("❌ Error de conexión a la base de datos")
+        return None
+
+    cur = None
+    actualizadas = 0
+    ultimo_id = 0
+    try:
+        cur = conn.cursor()
+        while True:
+            cur.execute("""
+                SELECT id_resena, texto_resena
+                FROM resenas
+                WHERE id_resena > %s AND (%s OR texto_censurado IS NULL)
+                ORDER BY id_resena
+                LIMIT %s
+            """, (ultimo_id, todas, batch))
+            filas = cur.fetchall()
+            if not filas:
+                break
+
+            valores = []
+            for id_resena, texto in filas:
+                texto_censurado, cantidad, terminos = moderador.moderar(texto or '')
+                valores.append((id_resena, texto_censurado, cantidad, terminos))
+            execute_values(cur, """
+                UPDATE resenas r
+                SET texto_censurado = v.texto_censurado,
+                    groserias_cantidad = v.cantidad,
+                    groserias_terminos = v.terminos::TEXT[]
+                FROM (VALUES %s) AS v (id_resena, texto_censurado, cantidad, terminos)
+                WHERE r.id_resena = v.id_resena
+            """, valores)
+            registrar_cambio(cur)
+            conn.commit()
+
+            actualizadas += len(filas)
+            ultimo_id = filas[-1][0]
+            print(f"✅ {actualizadas} reseñas moderadas (último id {ultimo_id})")
+        return actualizadas
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error en el backfill de moderación (se puede relanzar): {e}")
+        return None
+    finally:
+        if cur:
+            cur.close()
+        db.close_connection(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--todas', action='store_true',
+                        help="Recalcular también las que ya tienen moderación (p. ej. tras cambiar la lista)")
+    parser.add_argument('--batch', type=int, default=1000, help="Reseñas por lote")
+    args = parser.parse_args()
+
+    actualizadas = backfill(todas=args.todas, batch=args.batch)
+    if actualizadas is None:
+        raise SystemExit(1)
+    print(f"🏁 Backfill de moderación terminado: {actualizadas} reseñas")
+
+
+if __name__ == '__main__':
+    main()
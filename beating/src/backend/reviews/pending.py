@@ -0,0 +1,139 @@
+import threading
+import time
+
+from database.connection import db
+from reviews.sentiment import sentiment_analyzer, SENTIMENT_CONFIG
+from reviews.terms import extraer_terminos_lote, guardar_terminos
+
+ETIQUETA_PENDIENTE = 'pendiente'
+
+
+def async_scoring_enabled():
+    """Indica si las reseñas se guardan primero como 'pendiente'"""
+    return bool(SENTIMENT_CONFIG.get('async_scoring', False))
+
+
+class PendingSentimentWorker:
+    """
+    Hilo en segundo plano que puntúa las reseñas guardadas con sentimiento
+    'pendiente' y rellena la tabla sentimientos. También extrae sus términos
+    para las nubes (spaCy), que en este modo no se calculan al escribir.
+
+    Si el modelo falla (sin cargar, memoria, backend caído) el lote sigue
+    pendiente y el worker espera cada vez más (hasta `max_espera` segundos)
+    antes de reintentar, en lugar de guardar 'neutral' para siempre.
+    """
+
+    def __init__(self, batch_size=32, poll_interval=5.0, max_espera=300.0):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_espera = max_espera
+        self._fallos = 0
+        self._evento = threading.Event()
+        self._hilo = None
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def start(self):
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._hilo = threading.Thread(target=self._bucle, name="pending-sentiment", daemon=True)
+            self._hilo.start()
+            print("🕒 Worker de sentimientos pendientes iniciado")
+
+    def notify(self):
+        """Despierta al worker tras insertar una reseña pendiente"""
+        self._evento.set()
+
+    def on_scored(self, callback):
+        """Registra una función callback(ids_resena) a llamar tras puntuar"""
+        self._callbacks.append(callback)
+        return callback
+
+    def _bucle(self):
+        while True:
+            if self._fallos:
+                # Tras un fallo no se adelanta el reintento aunque lleguen reseñas nuevas
+                time.sleep(self.espera_reintento())
+            else:
+                self._evento.wait(timeout=self.poll_interval)
+            self._evento.clear()
+            try:
+                # Vaciar todos los pendientes antes de volver a dormir
+                while self.process_pending() == self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"❌ Error en worker de sentimientos pendientes: {e}")
+
+    def espera_reintento(self):
+        """Segundos hasta el siguiente intento tras `_fallos` fallos seguidos"""
+        return min(self.poll_interval * 2 ** min(self._fallos, 16), self.max_espera)
+
+    def process_pending(self):
+        """Puntúa un lote de reseñas pendientes. Devuelve cuántas procesó."""
+        conn = db.get_connection()
+        if not conn:
+            return 0
+
+        cur = None
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT s.id_resena, r.texto_resena, r.terminos_extraidos
+                FROM sentimientos s
+                JOIN resenas r ON r.id_resena = s.id_resena
+                WHERE s.etiqueta = %s
+                ORDER BY s.id_resena
+                LIMIT %s
+                FOR UPDATE OF s SKIP LOCKED
+            """, (ETIQUETA_PENDIENTE, self.batch_size))
+            filas = cur.fetchall()
+            if not filas:
+                conn.rollback()
+                return 0
+
+            ids = [fila[0] for fila in filas]
+            # Estricto: si el modelo falla las reseñas siguen pendientes (rollback)
+            resultados = sentiment_analyzer.analyze_batch([fila[1] for fila in filas], estricto=True)
+
+            cur.executemany("""
+                UPDATE sentimientos
+                SET etiqueta = %s, puntuacion = %s, probabilidades = %s, modelo_version = %s
+                WHERE id_resena = %s
+            """, [(sentimiento, float(puntuacion), probabilidades,
+                   # Las resueltas por el léxico (sin probabilidades) no las puntuó el modelo
+                   sentiment_analyzer.modelo_version if probabilidades else None, id_resena)
+                  for id_resena, (sentimiento, puntuacion, probabilidades) in zip(ids, resultados)])
+
+            # Términos de las reseñas guardadas sin ellos (en modo asíncrono no se extraen al escribir)
+            sin_terminos = [(id_resena, texto) for id_resena, texto, extraidos in filas if not extraidos]
+            terminos = extraer_terminos_lote([texto for _, texto in sin_terminos])
+            for (id_resena, _), terminos_resena in zip(sin_terminos, terminos):
+                guardar_terminos(cur, id_resena, terminos_resena)
+            conn.commit()
+            self._fallos = 0
+            print(f"✅ {len(ids)} reseñas pendientes puntuadas")
+        except Exception as e:
+            conn.rollback()
+            self._fallos += 1
+            print(f"❌ Error puntuando reseñas pendientes (reintento en {self.espera_reintento():.0f}s): {e}")
+            return 0
+        finally:
+            if cur:
+                cur.close()
+            db.close_connection(conn)
+
+        for callback in self._callbacks:
+            try:
+                callback(ids)
+            except Exception as e:
+                print(f"⚠️ Error en callback de sentimientos puntuados: {e}")
+        return len(ids)
+
+
+pending_worker = PendingSentimentWorker(
+    batch_size=SENTIMENT_CONFIG.get('async_batch_size', 32),
+    poll_interval=SENTIMENT_CONFIG.get('async_poll_interval', 5.0),
+    max_espera=SENTIMENT_CONFIG.get('async_max_espera', 300.0)
+)
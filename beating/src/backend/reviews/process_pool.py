@@ -0,0 +1,131 @@
+import gc
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+
+# Backend cargado en el proceso padre antes del fork; los workers lo heredan
+# por copy-on-write (los pesos no se duplican mientras nadie los modifique).
+# Los workers creados con spawn no lo heredan y lo cargan con `fabrica`.
+_BACKEND_HEREDADO = None
+
+
+def _inicializar_worker(hilos, fabrica):
+    global _BACKEND_HEREDADO
+    try:
+        import torch
+        torch.set_num_threads(hilos)
+    except Exception as e:
+        print(f"⚠️ No se pudieron fijar los hilos de torch en el worker {os.getpid()}: {e}")
+    if _BACKEND_HEREDADO is None:
+        _BACKEND_HEREDADO = fabrica()
+
+
+def _listo():
+    return os.getpid()
+
+
+def _predecir_proba(textos, max_chunks):
+    return _BACKEND_HEREDADO.predict_proba(textos, max_chunks=max_chunks)
+
+
+class ProcessPoolBackend:
+    """
+    Ejecuta un backend ya cargado en un pool de procesos.
+
+    - El pool se crea una sola vez al arrancar (SentimentAnalyzer.warm_up), con
+      fork, cuando el modelo ya está cargado y el proceso aún no tiene otros
+      hilos: los hijos comparten los pesos del padre.
+    - Nunca se vuelve a hacer fork de un proceso con hilos y torch en marcha
+      (los hijos podrían quedar bloqueados): si ya hay otros hilos al crearlo, o
+      al recrearlo tras un timeout, se usa spawn y cada worker carga el modelo
+      con `fabrica` (una función sin argumentos que se pueda serializar).
+    - Cada worker fija sus hilos intra-op de torch para no sobre-suscribir la CPU.
+    - Cada lote se reparte entre los workers; si un worker no responde dentro
+      de `timeout` segundos el pool se recrea.
+    """
+
+    def __init__(self, backend, fabrica, procesos=None, hilos_por_proceso=1, timeout=30):
+        global _BACKEND_HEREDADO
+        _BACKEND_HEREDADO = backend
+
+        self.backend = backend
+        self.fabrica = fabrica
+        self.nombre = backend.nombre
+        self.procesos = procesos or os.cpu_count() or 1
+        self.hilos_por_proceso = hilos_por_proceso
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._disponible = threading.Event()
+        self._reinicios = 0
+        self.metodo = None
+        self._pool = self._crear_pool(permitir_fork=True)
+        self._disponible.set()
+        print(f"🧵 Pool de {self.procesos} procesos de inferencia "
+              f"({hilos_por_proceso} hilo(s) cada uno, {self.metodo})")
+
+    def _crear_pool(self, permitir_fork=False):
+        if permitir_fork and threading.active_count() == 1:
+            # Congelar los objetos actuales evita que el GC los toque en los hijos
+            # y rompa el copy-on-write de sus páginas de memoria
+            gc.freeze()
+            self.metodo = 'fork'
+        else:
+            self.metodo = 'spawn'
+        contexto = multiprocessing.get_context(self.metodo)
+        pool = contexto.Pool(
+            self.procesos,
+            initializer=_inicializar_worker,
+            initargs=(self.hilos_por_proceso, self.fabrica)
+        )
+        if self.metodo == 'spawn':
+            # Las tareas solo llegan a workers que ya cargaron el modelo: esperar al primero
+            pool.apply(_listo)
+        return pool
+
+    def _reiniciar(self, pool_caido):
+        with self._lock:
+            if self._pool is not pool_caido:
+                # Otro hilo ya lo recreó
+                return
+            self._disponible.clear()
+            try:
+                pool_caido.terminate()
+                self._pool = self._crear_pool()
+                self._reinicios += 1
+            finally:
+                self._disponible.set()
+        print("🔄 Pool de inferencia recreado (spawn) tras un timeout")
+
+    def predict_proba(self, textos, max_chunks=1):
+        textos = list(textos)
+        partes = min(self.procesos, len(textos))
+        tamano = -(-len(textos) // partes)
+        # Mientras se recrea el pool no se le mandan tareas
+        self._disponible.wait()
+        pool = self._pool
+        tareas = [
+            pool.apply_async(_predecir_proba, (textos[i:i + tamano], max_chunks))
+            for i in range(0, len(textos), tamano)
+        ]
+        try:
+            return np.concatenate([tarea.get(timeout=self.timeout) for tarea in tareas])
+        except multiprocessing.TimeoutError:
+            self._reiniciar(pool)
+            raise RuntimeError(f"La inferencia superó el timeout de {self.timeout}s")
+
+    def predict(self, textos, max_chunks=1):
+        return self.backend.etiquetar(self.predict_proba(textos, max_chunks=max_chunks))
+
+    def estadisticas(self):
+        return {
+            'procesos': self.procesos,
+            'hilos_por_proceso': self.hilos_por_proceso,
+            'metodo': self.metodo,
+            'reinicios': self._reinicios,
+        }
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
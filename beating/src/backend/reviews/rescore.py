@@ -0,0 +1,188 @@
+"""
+Re-puntúa en bloque la tabla sentimientos con el modelo configurado.
+
+Uso (desde src/backend):
+    python -m reviews.rescore [--batch 32] [--ventana 2048]
+                              [--checkpoint rescore_checkpoint.json]
+                              [--solo-desactualizadas] [--reiniciar]
+
+- Lee `resenas` con un cursor con nombre (server-side), sin cargar todo en memoria.
+- Dentro de cada ventana ordena los textos por longitud y los puntúa en lotes,
+  así el padding dinámico de cada lote es mínimo.
+- Escribe con execute_values en una tabla temporal y aplica un único UPDATE
+  (más un INSERT para reseñas sin fila en sentimientos) por ventana.
+- Todas las reseñas pasan por el modelo (sin la cascada de léxico): cada fila
+  que se marca con `modelo_version` tiene su distribución de estrellas.
+- Guarda `modelo_version` y la distribución de estrellas por fila, y un
+  checkpoint con el último id confirmado; si se interrumpe, al volver a
+  ejecutarlo continúa desde ahí.
+"""
+import argparse
+import json
+import os
+import time
+
+from psycopg2.extras import execute_values
+
+from database.connection import db
+from database.schema import asegurar_esquema
+from reviews.analysis_cache import registrar_cambio
+from reviews.sentiment import sentiment_analyzer
+
+CHECKPOINT_DEFAULT = 'rescore_checkpoint.json'
+
+
+def leer_checkpoint(ruta, modelo_version):
+    if not os.path.exists(ruta):
+        return 0
+    with open(ruta, encoding='utf-8') as f:
+        datos = json.load(f)
+    if datos.get('modelo_version') != modelo_version:
+        print(f"⚠️ El checkpoint es de otro modelo ({datos.get('modelo_version')}), empezando desde el inicio")
+        return 0
+    return int(datos.get('ultimo_id', 0))
+
+
+def guardar_checkpoint(ruta, modelo_version, ultimo_id, procesadas):
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({
+            'modelo_version': modelo_version,
+            'ultimo_id': ultimo_id,
+            'procesadas': procesadas,
+        }, f)
+    os.replace(temporal, ruta)
+
+
+def puntuar_ventana(filas, batch):
+    """Puntúa una ventana de (id_resena, texto) ordenada por longitud"""
+    filas = sorted(filas, key=lambda fila: len(fila[1]))
+    resultados = []
+    for i in range(0, len(filas), batch):
+        lote = filas[i:i + batch]
+        puntuaciones = sentiment_analyzer.analyze_batch(
+            [texto for _, texto in lote], usar_cache=False, estricto=True, cascada=False
+        )
+        resultados.extend(
+            (id_resena, sentimiento, float(puntuacion), probabilidades)
+            for (id_resena, _), (sentimiento, puntuacion, probabilidades) in zip(lote, puntuaciones)
+        )
+    return resultados
+
+
+def escribir_resultados(conn, resultados, modelo_version):
+    """COPY lógico a tabla temporal + un único UPDATE"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS sentimientos_staging (
+                id_resena INTEGER PRIMARY KEY,
+                etiqueta VARCHAR(20),
+                puntuacion REAL,
+                probabilidades REAL[]
+            ) ON COMMIT DELETE ROWS
+        """)
+        execute_values(cur, """
+            INSERT INTO sentimientos_staging (id_resena, etiqueta, puntuacion, probabilidades) VALUES %s
+        """, resultados, page_size=1000)
+        cur.execute("""
+            UPDATE sentimientos s
+            SET etiqueta = st.etiqueta,
+                puntuacion = st.puntuacion,
+                probabilidades = st.probabilidades,
+                modelo_version = %s
+            FROM sentimientos_staging st
+            WHERE s.id_resena = st.id_resena
+        """, (modelo_version,))
+        cur.execute("""
+            INSERT INTO sentimientos (id_resena, etiqueta, puntuacion, probabilidades, modelo_version)
+            SELECT st.id_resena, st.etiqueta, st.puntuacion, st.probabilidades, %s
+            FROM sentimientos_staging st
+            WHERE NOT EXISTS (SELECT 1 FROM sentimientos s WHERE s.id_resena = st.id_resena)
+        """, (modelo_version,))
+        registrar_cambio(cur)
+    conn.commit()
+
+
+def rescore(batch=32, ventana=2048, checkpoint=CHECKPOINT_DEFAULT, solo_desactualizadas=False, reiniciar=False):
+    asegurar_esquema()
+    sentiment_analyzer.init_analyzer()
+    if sentiment_analyzer.analyzer is None:
+        print("❌ El analizador de sentimientos no está disponible")
+        return 1
+    modelo_version = sentiment_analyzer.modelo_version
+
+    conn_lectura = db.get_connection()
+    conn_escritura = db.get_connection()
+    if not conn_lectura or not conn_escritura:
+        print("❌ Error de conexión a la base de datos")
+        return 1
+
+    try:
+        ultimo_id = 0 if reiniciar else leer_checkpoint(checkpoint, modelo_version)
+        print(f"🔁 Re-puntuando con {modelo_version} desde id_resena > {ultimo_id}")
+
+        filtro = ""
+        parametros = [ultimo_id]
+        if solo_desactualizadas:
+            filtro = "AND s.modelo_version IS DISTINCT FROM %s"
+            parametros.append(modelo_version)
+
+        cur = conn_lectura.cursor(name='rescore_resenas')
+        cur.itersize = ventana
+        cur.execute(f"""
+            SELECT r.id_resena, r.texto_resena
+            FROM resenas r
+            LEFT JOIN sentimientos s ON s.id_resena = r.id_resena
+            WHERE r.id_resena > %s AND r.texto_resena IS NOT NULL {filtro}
+            ORDER BY r.id_resena
+        """, parametros)
+
+        procesadas = 0
+        inicio = time.perf_counter()
+        while True:
+            filas = cur.fetchmany(ventana)
+            if not filas:
+                break
+            escribir_resultados(conn_escritura, puntuar_ventana(filas, batch), modelo_version)
+
+            procesadas += len(filas)
+            ultimo_id = filas[-1][0]
+            guardar_checkpoint(checkpoint, modelo_version, ultimo_id, procesadas)
+            velocidad = procesadas / (time.perf_counter() - inicio)
+            print(f"✅ {procesadas} reseñas re-puntuadas (último id {ultimo_id}, {velocidad:.1f} reseñas/s)")
+
+        cur.close()
+        conn_lectura.commit()
+        print(f"🏁 Re-puntuación terminada: {procesadas} reseñas")
+        return 0
+
+    except Exception as e:
+        conn_lectura.rollback()
+        conn_escritura.rollback()
+        print(f"❌ Error re-puntuando (se puede reanudar desde el checkpoint): {e}")
+        return 1
+    finally:
+        db.close_connection(conn_lectura)
+        db.close_connection(conn_escritura)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch', type=int, default=32, help="Textos por forward pass")
+    parser.add_argument('--ventana', type=int, default=2048, help="Filas leídas del cursor por vuelta")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_DEFAULT)
+    parser.add_argument('--solo-desactualizadas', action='store_true',
+                        help="Solo reseñas con otro modelo_version (o sin puntuar)")
+    parser.add_argument('--reiniciar', action='store_true', help="Ignorar el checkpoint existente")
+    args = parser.parse_args()
+    raise SystemExit(rescore(
+        batch=args.batch,
+        ventana=args.ventana,
+        checkpoint=args.checkpoint,
+        solo_desactualizadas=args.solo_desactualizadas,
+        reiniciar=args.reiniciar
+    ))
+
+
+if __name__ == '__main__':
+    main()
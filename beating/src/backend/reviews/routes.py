@@ -1,333 +1,154 @@
 from flask import request, jsonify
 from functools import wraps
 import jwt
-import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
-import spacy
-from wordcloud import WordCloud, STOPWORDS
-import numpy as np
-import re
 
 from database.connection import db
+from database.request_scope import conexion_peticion
 from reviews.sentiment import sentiment_analyzer
+from reviews.moderation import moderador
+from reviews.analysis_cache import analisis_cache, ANALISIS_CONFIG
+from reviews.terms import extraer_terminos, guardar_terminos, frecuencias_terminos
+from reviews.charts import generar_wordcloud_beating, renderizar_graficas, estadisticas_layouts
+from reviews.images import imagenes, respuesta_imagen, huella_datos
+from reviews.pending import pending_worker, async_scoring_enabled, ETIQUETA_PENDIENTE
 from spotify.client import spotify_client
 from config import APP_CONFIG
 
-try:
-    nlp = spacy.load("es_core_news_sm")
-except OSError:
-    print("El modelo de SpaCy 'es_core_news_sm' no se encontró. Asegúrate de haber ejecutado 'python -m spacy download es_core_news_sm'")
-    nlp = None 
-
-def color_func_beating(word, font_size, position, orientation, random_state=None, **kwargs):
-    """Función de colores con la paleta de Beating mejorada"""
-    colores_beating = [
-        (236, 72, 153),   # Rosa Beating (#ec4899)
-        (168, 85, 247),   # Purple-500 (#a855f7)
-        (139, 92, 246),   # Purple-600 (#8b5cf6)
-        (217, 70, 239),   # Pink-500 (#d946ef)
-        (245, 158, 11),   # Amber-500 (#f59e0b)
-        (16, 185, 129),   # Emerald-500 (#10b981)
-        (99, 102, 241),   # Indigo-500 (#6366f1)
-        (249, 115, 22),   # Orange-500 (#f97316)
-    ]
-    import random
-    r, g, b = random.choice(colores_beating)
-    # Variar ligeramente el color basado en la posición para más dinamismo
-    variation = random.randint(-10, 10)
-    r = max(0, min(255, r + variation))
-    g = max(0, min(255, g + variation))
-    b = max(0, min(255, b + variation))
-    return f"rgb({r}, {g}, {b})"
-
-def generar_wordcloud_beating(textos):
-    """Genera una nube de palabras con menos palabras y mejor legibilidad"""
-    if nlp is None: 
-        return base64.b64encode(b"").decode('utf-8') 
-    
-    if isinstance(textos, list):
-        texto_completo = " ".join(textos)
-    else:
-        texto_completo = textos
-
-    # Procesar texto con spaCy - enfoque en las palabras más significativas
-    doc = nlp(texto_completo) 
-    allowed_pos = {'NOUN', 'ADJ'}  # Solo adjetivos y sustantivos para palabras más relevantes
-    
-    filtered_words = [
-        token.lemma_.lower()
-        for token in doc 
-        if (token.pos_ in allowed_pos and 
-            not token.is_stop and 
-            token.is_alpha and
-            len(token.lemma_) > 3)  # Filtrar palabras más largas para mejor significado
-    ]
-    
-    texto_filtrado = " ".join(filtered_words)
-    
-    if not texto_filtrado.strip():
-        print("No hay texto filtrado para generar la nube de palabras")
-        return base64.b64encode(b"").decode('utf-8')
-    
-    print(f"Texto procesado: {len(filtered_words)} palabras únicas")
-    
-    # Stopwords mejoradas y expandidas
-    spanish_stopwords = set(STOPWORDS)
-    
-    domain_stopwords = {
-        'cancion', 'álbum', 'artista', 'track', 'song', 'pegadecer', 
-        'contenido', 'algo', 'crecer', 'letra', 'musical', 'lirica', 
-        'lirico', 'cotidiano', 'obra', 'divertir', 'complementar', 
-        'canción', 'situaciones', 'banda', 'canciones', 'album', 'jazz',
-        'pop', 'año', 'barreras', 'vogue', 'combinación', 'modelo', 'cotorra',
-        'labioso', 'auditivo', 'musica', 'música', 'escuchar', 'sonido',
-        'ritmo', 'melodia', 'melodía', 'verso', 'coro', 'estribillo',
-        'hacer', 'tener', 'poder', 'decir', 'ver', 'dar', 'saber', 'ir',
-        'ser', 'estar', 'haber', 'poder', 'querer', 'parecer', 'gente',
-        'tiempo', 'vez', 'parte', 'forma', 'caso', 'manera', 'momento','instrumento',
-        'sicario', 'llegadoro', 'mediocre', 'melancolía', 'persona', 'aburrido', 'qiue', 
-        'electrónico', 'aburrido', 'barrera', 'burla', 'cuandotodo', 'batería', 'concierto',
-        'conforme', 'vocalista', 'sobrellevar', 'quelar', 'pasar', 'género', 'terminar',
-        'primo', 'llegar', 'él', 'general', 'recuerdaar', 'turner', 'termino',
-        'escuche', 'cabra', 'sonar', 'pegadecer', 'tristeza', 'nostalgia',
-        'preocupación', 'lleno', 'dueto', 'espera', 'regresa'
-    }
+# Reseñas (las más recientes) que entran en la nube y las estadísticas de /analisis-resenas
+RESENAS_NUBE = ANALISIS_CONFIG.get('resenas_nube', 300)
+
+# Gráfica de /analisis-resenas -> (clave en la caché de imágenes, ruta sin extensión)
+IMAGENES_ANALISIS = {
+    'sentiment_dist': ('analisis/sentiment-dist', '/analisis-resenas/sentiment-dist'),
+    'top_songs': ('analisis/top-songs', '/analisis-resenas/top-songs'),
+    'wordcloud': ('analisis/wordcloud', '/analisis-resenas/wordcloud'),
+}
+
+
+def publicar_wordcloud(clave, frecuencias):
+    """Renderiza la nube de `clave` solo si cambiaron las frecuencias; devuelve su ETag"""
+    if not frecuencias:
+        return imagenes.publicar(clave, None)
+    firma = huella_datos(frecuencias)
+    etag = imagenes.vigente(clave, firma)
+    if etag is None:
+        etag = imagenes.publicar(clave, generar_wordcloud_beating(frecuencias), firma)
+    return etag
+
+
+def construir_analisis_resenas():
+    """Consultas, moderación, gráficas y nube de palabras de /analisis-resenas"""
+    # Conexión propia: también se llama desde el hilo que reconstruye la caché, sin petición
+    conn = db.get_connection()
+    if not conn:
+        raise RuntimeError("Error de conexión a la base de datos")
+        
+    cur = conn.cursor()
     
-    all_stopwords = spanish_stopwords.union(domain_stopwords)
-
     try:
-        # Configurar WordCloud con MENOS palabras para mejor legibilidad
-        wordcloud = WordCloud(
-            width=800,  # Tamaño más compacto
-            height=500,  # Tamaño más compacto
-            background_color='#1e1626',
-            color_func=color_func_beating,
-            max_words=80,  # MENOS PALABRAS - máximo 80
-            stopwords=all_stopwords,
-            relative_scaling=0.8,  # Más énfasis en las palabras más frecuentes
-            prefer_horizontal=0.8,  # Más palabras horizontales para mejor lectura
-            scale=1.5,
-            min_font_size=14,  # Tamaño mínimo más grande
-            max_font_size=120,  # Tamaño máximo más pequeño
-            collocations=False,
-            random_state=42,
-            margin=1,  # Menos margen
-            contour_width=0,
-            colormap='plasma'  # Colormap con mejor contraste
-        ).generate(texto_filtrado)
-
-        # Generar imagen con estilo Beating
-        plt.figure(figsize=(12, 8), facecolor='#1e1626')
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.tight_layout(pad=0)
-        
-        # Agregar título sutil
-        plt.figtext(0.5, 0.95, 'Tus Emociones Musicales', 
-                   ha='center', va='top', 
-                   fontsize=20, color='white', fontweight='bold',
-                   bbox=dict(boxstyle="round,pad=0.4", facecolor='#ec4899', alpha=0.8))
+        # 1. Obtener datos REALES de sentimientos
+        cur.execute("""
+            SELECT 
+                s.etiqueta, 
+                COUNT(*) as cantidad, 
+                AVG(s.puntuacion) as promedio
+            FROM sentimientos s
+            WHERE s.etiqueta <> %s
+            GROUP BY s.etiqueta
+        """, (ETIQUETA_PENDIENTE,))
+        sentimientos_data = []
+        for row in cur.fetchall():
+            etiqueta, cantidad, promedio = row
+            sentimientos_data.append({
+                'etiqueta': etiqueta,
+                'cantidad': cantidad,
+                'puntuacion_promedio': float(promedio) if promedio else 0.0
+            })
+
+        # 2. Obtener mejores canciones con puntuaciones REALES
+        cur.execute("""
+            SELECT 
+                c.titulo, 
+                c.artista, 
+                AVG(s.puntuacion) as promedio, 
+                COUNT(r.id_resena) as cantidad
+            FROM canciones c
+            JOIN resenas r ON c.id_cancion = r.id_cancion
+            JOIN sentimientos s ON r.id_resena = s.id_resena
+            WHERE s.etiqueta <> %s
+            GROUP BY c.id_cancion, c.titulo, c.artista
+            ORDER BY promedio DESC
+            LIMIT 10
+        """, (ETIQUETA_PENDIENTE,))
+        mejores_canciones = []
+        for row in cur.fetchall():
+            titulo, artista, promedio, cantidad = row
+            mejores_canciones.append({
+                'titulo': titulo,
+                'artista': artista,
+                'puntuacion': float(promedio) if promedio else 0.0,
+                'reseñas': cantidad
+            })
+
+        # 3. Obtener texto para nube de palabras (ORIGINAL para análisis de IA)
+        cur.execute("""
+            SELECT r.texto_resena, r.groserias_cantidad
+            FROM resenas r
+            JOIN sentimientos s ON r.id_resena = s.id_resena
+            ORDER BY r.fecha_creacion DESC
+            LIMIT %s
+        """, (RESENAS_NUBE,))
+        filas_textos = cur.fetchall()
+        textos_resenas_original = [row[0] for row in filas_textos]
         
-        # Convertir a base64
-        img = BytesIO()
-        plt.savefig(
-            img, 
-            format='PNG', 
-            bbox_inches='tight', 
-            dpi=120,  # DPI estándar
-            facecolor='#1e1626',
-            transparent=False,
-            pad_inches=0
-        )
-        plt.close()
+        # 4. Groserías guardadas al escribir (se modera al vuelo solo si falta el backfill)
+        cantidades_groserias = [
+            cantidad if cantidad is not None else moderador.moderar(texto)[1]
+            for texto, cantidad in filas_textos
+        ]
+        total_groserias = sum(cantidades_groserias)
         
-        img_base64 = base64.b64encode(img.getvalue()).decode('utf-8')
-        print(f"Nube de palabras generada exitosamente con {len(wordcloud.words_)} palabras")
-        return img_base64
-        
-    except Exception as e:
-        print(f"Error generando wordcloud: {str(e)}")
-        # Fallback a wordcloud simple con aún menos palabras
-        try:
-            wordcloud_fallback = WordCloud(
-                width=600,
-                height=400,
-                background_color='#1e1626',
-                color_func=color_func_beating,
-                max_words=60,  # Aún menos palabras en fallback
-                stopwords=all_stopwords,
-                random_state=42
-            ).generate(texto_filtrado)
-            
-            plt.figure(figsize=(10, 6), facecolor='#1e1626')
-            plt.imshow(wordcloud_fallback, interpolation='bilinear')
-            plt.axis('off')
-            plt.tight_layout(pad=0)
-            
-            img = BytesIO()
-            plt.savefig(
-                img, 
-                format='PNG', 
-                bbox_inches='tight', 
-                dpi=100,
-                facecolor='#1e1626'
-            )
-            plt.close()
-            
-            return base64.b64encode(img.getvalue()).decode('utf-8')
-        except Exception as fallback_error:
-            print(f"Error incluso en fallback: {str(fallback_error)}")
-            return base64.b64encode(b"").decode('utf-8')
-
-def generar_grafico_sentimientos_beating(datos):
-    """Genera un gráfico de sentimientos con estilo Beating"""
-    if not datos:
-        return None
-        
-    plt.figure(figsize=(10, 8))
-    
-    # Filtrar datos con cantidad > 0
-    datos_validos = [d for d in datos if d['cantidad'] > 0]
-    if not datos_validos:
-        return None
-        
-    labels = [d['etiqueta'].capitalize() for d in datos_validos]
-    sizes = [d['cantidad'] for d in datos_validos]
-    
-    # Colores del tema Beating
-    colors = []
-    color_map = {
-        'positivo': '#10b981',
-        'neutral': '#f59e0b',
-        'negativo': '#ef4444'
+        if total_groserias > 0:
+            print(f"🚫 Análisis: Se detectaron {total_groserias} groserías en {len(textos_resenas_original)} reseñas")
+
+        # Frecuencias de términos extraídos al escribir cada reseña: una sola consulta
+        # agregada sobre las mismas últimas reseñas que las estadísticas
+        frecuencias = frecuencias_terminos(cur, ultimas=RESENAS_NUBE) if textos_resenas_original else None
+
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            db.close_connection(conn)
+
+    # La conexión ya está devuelta al pool: el renderizado no la retiene
+    response_data = {
+        'mejores_canciones': mejores_canciones,
+        'distribucion_sentimientos': sentimientos_data,
+        'total_resenas_analizadas': len(textos_resenas_original),
+        'groserias_detectadas': total_groserias  # Información para monitoreo
     }
-    
-    for d in datos_validos:
-        colors.append(color_map.get(d['etiqueta'], '#6b7280'))
-    
-    # Crear pie chart con estilo Beating
-    wedges, texts, autotexts = plt.pie(
-        sizes, 
-        labels=labels, 
-        colors=colors, 
-        autopct='%1.1f%%',
-        startangle=90,
-        shadow=True,
-        explode=[0.05] * len(sizes),
-        textprops={'fontsize': 12}
-    )
-    
-    # Mejorar estilo de los textos
-    for autotext in autotexts:
-        autotext.set_color('white')
-        autotext.set_fontweight('bold')
-        autotext.set_fontsize(11)
-    
-    for text in texts:
-        text.set_fontsize(14)
-        text.set_fontweight('bold')
-        text.set_color('#e5e7eb')
-    
-    # Mejorar estilo de las cuñas
-    for wedge in wedges:
-        wedge.set_edgecolor('#1e1626')
-        wedge.set_linewidth(2)
-    
-    plt.title('Distribución de Sentimientos', 
-              fontsize=18, 
-              fontweight='bold', 
-              color='white',
-              pad=20)
-    
-    # Fondo que coincide con el tema Beating
-    plt.gcf().patch.set_facecolor('#1e1626')
-    plt.gca().set_facecolor('#1e1626')
-    
-    img = BytesIO()
-    plt.savefig(
-        img, 
-        format='PNG', 
-        bbox_inches='tight', 
-        dpi=100,
-        facecolor='#1e1626'
-    )
-    plt.close()
-    return base64.b64encode(img.getvalue()).decode('utf-8')
-
-def generar_grafico_top_canciones_beating(datos):
-    """Genera un gráfico de top canciones con estilo Beating"""
-    if not datos:
-        return None
-        
-    plt.figure(figsize=(14, 10))
-    
-    nombres = [f"{d['titulo']}\n{d['artista']}" for d in datos]
-    puntuaciones = [d['puntuacion'] for d in datos]
-    
-    # Usar colores del tema Beating según la puntuación
-    colors = []
-    for score in puntuaciones:
-        if score > 0.7:
-            colors.append('#10b981')
-        elif score > 0.4:
-            colors.append('#f59e0b')
-        elif score > 0:
-            colors.append('#f97316')
-        elif score == 0:
-            colors.append('#6b7280')
-        else:
-            colors.append('#ef4444')
-    
-    bars = plt.barh(nombres, puntuaciones, color=colors, height=0.7, alpha=0.9, edgecolor='white', linewidth=1)
-    plt.gca().invert_yaxis()
-    
-    # Estilizar el gráfico con tema Beating
-    plt.title('Top Canciones Mejor Calificadas', 
-              fontsize=20, 
-              fontweight='bold', 
-              color='white',
-              pad=30)
-    plt.xlabel('Puntuación Promedio', fontsize=14, color='white', fontweight='bold')
-    
-    # Configurar colores de ejes y fondo
-    plt.gca().set_facecolor('#1e1626')
-    plt.gcf().patch.set_facecolor('#1e1626')
-    plt.gca().tick_params(colors='white', labelsize=12)
-    plt.gca().spines['bottom'].set_color('#ec4899')
-    plt.gca().spines['left'].set_color('#ec4899')
-    plt.gca().spines['top'].set_color('none')
-    plt.gca().spines['right'].set_color('none')
-    
-    # Agregar valores en las barras con mejor estilo
-    for bar in bars:
-        width = bar.get_width()
-        plt.text(width + 0.01, bar.get_y() + bar.get_height()/2, 
-                f'{width:.2f}', 
-                ha='left', va='center', 
-                color='white', fontweight='bold', fontsize=11,
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='#1e1626', alpha=0.9, edgecolor='#ec4899'))
-    
-    # Agregar grid sutil
-    plt.grid(axis='x', alpha=0.2, color='#ec4899', linestyle='--')
-    
-    # Mejorar el eje X
-    plt.xlim(0, max(puntuaciones) * 1.15)
-    
-    plt.tight_layout()
-    
-    img = BytesIO()
-    plt.savefig(
-        img, 
-        format='PNG', 
-        bbox_inches='tight',
-        dpi=100,
-        facecolor='#1e1626'
-    )
-    plt.close()
-    return base64.b64encode(img.getvalue()).decode('utf-8')
-
-# ... (el resto del código permanece igual - token_required e init_reviews_routes)
+
+    # Los PNG van a la caché de imágenes; el JSON solo lleva sus URLs
+    graficas = renderizar_graficas(sentimientos_data, mejores_canciones, frecuencias)
+    for nombre, (clave, ruta) in IMAGENES_ANALISIS.items():
+        etag = imagenes.publicar(clave, graficas.get(nombre))
+        if etag:
+            response_data[f'{nombre}_url'] = imagenes.url(f'{ruta}.{imagenes.formato(clave)}', etag)
+
+    if textos_resenas_original:
+        response_data['wordcloud_info'] = f"Generado con {len(textos_resenas_original)} reseñas"
+
+        # Estadísticas adicionales
+        total_palabras = sum(len(texto.split()) for texto in textos_resenas_original)
+        response_data['estadisticas'] = {
+            'total_palabras_analizadas': total_palabras,
+            'reseñas_con_groserias': sum(1 for cantidad in cantidades_groserias if cantidad),
+            'porcentaje_groserias': round((total_groserias / total_palabras * 100), 2) if total_palabras > 0 else 0
+        }
+
+    return response_data
+
 
 def token_required(f):
     @wraps(f)
@@ -382,10 +203,19 @@ def init_reviews_routes(app):
             if len(contenido) < 10:
                 return jsonify({"error": "La reseña debe tener al menos 10 caracteres"}), 400
 
-            sentimiento, puntuacion = sentiment_analyzer.analyze_text(contenido)
+            if async_scoring_enabled():
+                # El worker en segundo plano puntuará la reseña y extraerá sus términos
+                sentimiento, puntuacion, probabilidades = ETIQUETA_PENDIENTE, None, None
+                terminos = None
+            else:
+                sentimiento, puntuacion, probabilidades = sentiment_analyzer.analyze_text_detallado(contenido)
+                # Términos para las nubes de palabras (fuera de la transacción)
+                terminos = extraer_terminos(contenido)
+            # Moderación una sola vez al escribir; las lecturas usan lo guardado
+            texto_censurado, cantidad_groserias, groserias_lista = moderador.moderar(contenido)
             user_id = request.user_id
 
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -429,10 +259,10 @@ def init_reviews_routes(app):
 
                     cur.execute("""
                         INSERT INTO resenas 
-                        (id_usuario, id_cancion, texto_resena) 
-                        VALUES (%s, %s, %s)
+                        (id_usuario, id_cancion, texto_resena, texto_censurado, groserias_cantidad, groserias_terminos) 
+                        VALUES (%s, %s, %s, %s, %s, %s)
                         RETURNING id_resena
-                    """, (user_id, id_cancion, contenido))
+                    """, (user_id, id_cancion, contenido, texto_censurado, cantidad_groserias, groserias_lista))
 
                 elif tipo == "album":
                     if not spotify_client.sp_search:
@@ -473,20 +303,26 @@ def init_reviews_routes(app):
 
                     cur.execute("""
                         INSERT INTO resenas 
-                        (id_usuario, id_album, texto_resena) 
-                        VALUES (%s, %s, %s)
+                        (id_usuario, id_album, texto_resena, texto_censurado, groserias_cantidad, groserias_terminos) 
+                        VALUES (%s, %s, %s, %s, %s, %s)
                         RETURNING id_resena
-                    """, (user_id, id_album, contenido))
+                    """, (user_id, id_album, contenido, texto_censurado, cantidad_groserias, groserias_lista))
 
                 id_resena = cur.fetchone()[0]
+                guardar_terminos(cur, id_resena, terminos)
 
                 cur.execute("""
                     INSERT INTO sentimientos 
-                    (id_resena, etiqueta, puntuacion) 
-                    VALUES (%s, %s, %s)
-                """, (id_resena, sentimiento, float(puntuacion)))
+                    (id_resena, etiqueta, puntuacion, probabilidades, modelo_version) 
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (id_resena, sentimiento, float(puntuacion) if puntuacion is not None else None,
+                      probabilidades, sentiment_analyzer.modelo_version if probabilidades else None))
 
                 conn.commit()
+                analisis_cache.invalidar()
+
+                if sentimiento == ETIQUETA_PENDIENTE:
+                    pending_worker.notify()
 
                 try:
                     app.logger.info(f"""
@@ -528,8 +364,6 @@ def init_reviews_routes(app):
             finally:
                 if cur:
                     cur.close()
-                if conn:
-                    db.close_connection(conn)
 
         except Exception as e:
             try:
@@ -541,160 +375,102 @@ def init_reviews_routes(app):
                 "details": str(e)
             }), 500
 
+    # La respuesta solo cambia cuando cambian las reseñas o sus sentimientos
+    pending_worker.on_scored(analisis_cache.invalidar)
+
     @app.route('/analisis-resenas', methods=['GET'])
     def analisis_resenas():
-        conn = db.get_connection()
-        if not conn:
-            return jsonify({"error": "Error de conexión a la base de datos"}), 500
-            
-        cur = conn.cursor()
-        
         try:
-            import matplotlib
-            matplotlib.use('Agg')
-            plt.switch_backend('Agg')
-            
-            # Configurar estilo global de matplotlib para que coincida con Beating
-            plt.rcParams['figure.facecolor'] = '#1e1626'
-            plt.rcParams['axes.facecolor'] = '#1e1626'
-            plt.rcParams['text.color'] = 'white'
-            plt.rcParams['axes.labelcolor'] = 'white'
-            plt.rcParams['xtick.color'] = 'white'
-            plt.rcParams['ytick.color'] = 'white'
-            plt.rcParams['font.size'] = 12
-            
-            # LISTA DE GROSERÍAS PARA CENSURA (la misma que en resenas_routes.py)
-            GROSERIAS = {
-                # Español
-                'puta', 'puto', 'mierda', 'coño', 'carajo', 'joder', 'cabrón', 'cabrona', 
-                'pendejo', 'pendeja', 'verga', 'chingar', 'chinga', 'pinche', 'culero',
-                'culera', 'pito', 'concha', 'boludo', 'pelotudo', 'gilipollas', 'hostia',
-                'cojones', 'maricón', 'maricona', 'zorra', 'idiota', 'estúpido', 'imbécil',
-                'malparido', 'hijueputa', 'hijodeputa', 'hdp', 'caradura', 'desgraciado',
-                'maldito', 'maldita', 'bastardo', 'bastarda', 'sinvergüenza', 'careverga',
-                
-                # Inglés
-                'fuck', 'shit', 'ass', 'bitch', 'dick', 'pussy', 'cock', 'cunt', 'whore',
-                'slut', 'bastard', 'motherfucker', 'fucker', 'damn', 'hell', 'piss',
-                'crap', 'douche', 'fag', 'faggot', 'retard', 'nigger', 'nigga', 'spic',
-                'kike', 'chink', 'gook', 'wop', 'bimbo', 'skank', 'hoe', 'twat', 'wanker',
-                'wank', 'jerk', 'asshole', 'dickhead', 'prick', 'shithead', 'douchebag',
-                'scumbag', 'shitbag', 'fuckface', 'dipshit', 'shitass', 'fuckwit', 'cocksucker'
-            }
-
-            def censurar_texto(texto):
-                """Censura groserías en el texto reemplazándolas con asteriscos"""
-                if not texto:
-                    return texto
-                
-                texto_censurado = texto
-                for groseria in GROSERIAS:
-                    patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
-                    texto_censurado = patron.sub('*' * len(groseria), texto_censurado)
-                
-                return texto_censurado
-
-            # 1. Obtener datos REALES de sentimientos
-            cur.execute("""
-                SELECT 
-                    s.etiqueta, 
-                    COUNT(*) as cantidad, 
-                    AVG(s.puntuacion) as promedio
-                FROM sentimientos s
-                GROUP BY s.etiqueta
-            """)
-            sentimientos_data = []
-            for row in cur.fetchall():
-                etiqueta, cantidad, promedio = row
-                sentimientos_data.append({
-                    'etiqueta': etiqueta,
-                    'cantidad': cantidad,
-                    'puntuacion_promedio': float(promedio) if promedio else 0.0
-                })
-
-            # 2. Obtener mejores canciones con puntuaciones REALES
-            cur.execute("""
-                SELECT 
-                    c.titulo, 
-                    c.artista, 
-                    AVG(s.puntuacion) as promedio, 
-                    COUNT(r.id_resena) as cantidad
-                FROM canciones c
-                JOIN resenas r ON c.id_cancion = r.id_cancion
-                JOIN sentimientos s ON r.id_resena = s.id_resena
-                GROUP BY c.id_cancion, c.titulo, c.artista
-                ORDER BY promedio DESC
-                LIMIT 10
-            """)
-            mejores_canciones = []
-            for row in cur.fetchall():
-                titulo, artista, promedio, cantidad = row
-                mejores_canciones.append({
-                    'titulo': titulo,
-                    'artista': artista,
-                    'puntuacion': float(promedio) if promedio else 0.0,
-                    'reseñas': cantidad
-                })
-
-            # 3. Obtener texto para nube de palabras (ORIGINAL para análisis de IA)
-            cur.execute("""
-                SELECT r.texto_resena 
-                FROM resenas r
-                JOIN sentimientos s ON r.id_resena = s.id_resena
-                LIMIT 300  
-            """)
-            textos_resenas_original = [row[0] for row in cur.fetchall()]
-            
-            # 4. Obtener texto censurado para estadísticas (opcional)
-            textos_resenas_censurado = [censurar_texto(texto) for texto in textos_resenas_original]
-            
-            # Contar groserías detectadas para logging
-            total_groserias = 0
-            for texto in textos_resenas_original:
-                for groseria in GROSERIAS:
-                    if re.search(r'\b' + re.escape(groseria) + r'\b', texto, re.IGNORECASE):
-                        total_groserias += 1
-            
-            if total_groserias > 0:
-                print(f"🚫 Análisis: Se detectaron {total_groserias} groserías en {len(textos_resenas_original)} reseñas")
-
-            # Generar gráficos mejorados
-            response_data = {
-                'mejores_canciones': mejores_canciones,
-                'distribucion_sentimientos': sentimientos_data,
-                'total_resenas_analizadas': len(textos_resenas_original),
-                'groserias_detectadas': total_groserias  # Información para monitoreo
-            }
-
-            if any(s['cantidad'] > 0 for s in sentimientos_data):
-                response_data['sentiment_dist'] = generar_grafico_sentimientos_beating(sentimientos_data)
-            
-            if mejores_canciones:
-                response_data['top_songs'] = generar_grafico_top_canciones_beating(mejores_canciones)
-
-            if textos_resenas_original:
-                # IMPORTANTE: Usar texto ORIGINAL para el análisis del wordcloud
-                # Esto asegura que la IA procese el contenido real para mejor precisión
-                # Las groserías aparecerán censuradas en el wordcloud visualmente
-                response_data['wordcloud'] = generar_wordcloud_beating(textos_resenas_original)
-                response_data['wordcloud_info'] = f"Generado con {len(textos_resenas_original)} reseñas"
-                
-                # Estadísticas adicionales
-                total_palabras = sum(len(texto.split()) for texto in textos_resenas_original)
-                response_data['estadisticas'] = {
-                    'total_palabras_analizadas': total_palabras,
-                    'reseñas_con_groserias': sum(1 for texto in textos_resenas_original 
-                                            if any(g in texto.lower() for g in GROSERIAS)),
-                    'porcentaje_groserias': round((total_groserias / total_palabras * 100), 2) if total_palabras > 0 else 0
-                }
-
+            if ANALISIS_CONFIG.get('cache', True):
+                response_data = analisis_cache.obtener(construir_analisis_resenas)
+            else:
+                response_data = construir_analisis_resenas()
             return jsonify(response_data), 200
 
         except Exception as e:
             print(f"Error en análisis: {str(e)}")
             return jsonify({'error': str(e)}), 500
+
+    @app.route('/analisis-resenas/<nombre>.<formato>', methods=['GET'])
+    def imagen_analisis_resenas(nombre, formato):
+        """Imagen de una gráfica de /analisis-resenas: SVG, o PNG/WebP para la nube (?tamano=miniatura|completo)"""
+        imagen = IMAGENES_ANALISIS.get(nombre.replace('-', '_'))
+        if imagen is None:
+            return jsonify({'error': 'Imagen no encontrada'}), 404
+        clave, _ = imagen
+        try:
+            # Las imágenes se publican al construir el análisis
+            if ANALISIS_CONFIG.get('cache', True):
+                analisis_cache.obtener(construir_analisis_resenas)
+            elif imagenes.etag(clave) is None:
+                construir_analisis_resenas()
+        except Exception as e:
+            print(f"Error en análisis: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+        return respuesta_imagen(clave, formato)
+
+    def _wordcloud_entidad():
+        """(clave, etag, número de términos) de la nube pedida en los parámetros"""
+        filtros = {
+            campo: request.args.get(campo, type=int)
+            for campo in ('id_cancion', 'id_album', 'id_usuario')
+        }
+        # Conexión propia devuelta antes de renderizar (la de la petición seguiría prestada hasta el teardown)
+        conn = db.get_connection()
+        if not conn:
+            raise RuntimeError("Error de conexión a la base de datos")
+
+        cur = None
+        try:
+            cur = conn.cursor()
+            frecuencias = frecuencias_terminos(cur, **filtros)
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+            db.close_connection(conn)
+
+        clave = 'wordcloud/' + '/'.join(str(filtros[campo] or '') for campo in sorted(filtros))
+        return clave, publicar_wordcloud(clave, frecuencias), len(frecuencias)
+
+    @app.route('/api/wordcloud', methods=['GET'])
+    def wordcloud_entidad():
+        """Nube de palabras global o de una canción, álbum o usuario"""
+        try:
+            _, etag, terminos = _wordcloud_entidad()
+            parametros = '&'.join(
+                f"{campo}={request.args[campo]}"
+                for campo in ('id_cancion', 'id_album', 'id_usuario') if request.args.get(campo, type=int) is not None
+            )
+            ruta = f"/api/wordcloud.png?{parametros}" if parametros else "/api/wordcloud.png"
+            return jsonify({
+                'wordcloud_url': imagenes.url(ruta, etag),
+                'terminos': terminos
+            }), 200
+
+        except Exception as e:
+            print(f"Error generando wordcloud: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/wordcloud.<formato>', methods=['GET'])
+    def wordcloud_entidad_imagen(formato):
+        """La misma nube como imagen (?tamano=miniatura|completo, ETag y 304)"""
+        try:
+            clave, _, _ = _wordcloud_entidad()
+        except Exception as e:
+            print(f"Error generando wordcloud: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+        return respuesta_imagen(clave, formato)
+
+    @app.route('/api/analisis-resenas/cache', methods=['GET'])
+    def estadisticas_cache_analisis():
+        """Aciertos, respuestas obsoletas servidas y reconstrucciones de la caché"""
+        return jsonify({
+            **analisis_cache.estadisticas(),
+            'imagenes': imagenes.estadisticas(),
+            'layouts_nube': estadisticas_layouts()
+        }), 200
+
+    @app.route('/api/sentimiento/estadisticas', methods=['GET'])
+    def estadisticas_sentimiento():
+        """Contadores del analizador de sentimientos (tamaños de lote, cola)"""
+        return jsonify(sentiment_analyzer.estadisticas()), 200
@@ -1,182 +1,358 @@
 import sys
-import re
+import threading
+import importlib.util
+from collections import Counter
+from functools import partial
+
+from reviews.batching import MicroBatcher
+from reviews.cache import SentimentCache
+from reviews.backends import cargar_backend
+from reviews.process_pool import ProcessPoolBackend
+from reviews.model_server import RemoteBackend
+from reviews.emojis import expandir_emojis
+from reviews.language import detectar_idioma
+from reviews.lexicon import CascadeFilter
+from reviews.labels import etiquetar_probabilidades, reetiquetar
 
 try:
-    from transformers import pipeline
-    import torch
-    TRANSFORMERS_AVAILABLE = True
-    ANALYZER_FAILURE = False
-except ImportError as e:
-    print(f"❌ Error crítico: {str(e)}")
+    from config import SENTIMENT_CONFIG
+except ImportError:
+    SENTIMENT_CONFIG = {}
+
+MODEL_NAME = SENTIMENT_CONFIG.get('model', "nlptown/bert-base-multilingual-uncased-sentiment")
+
+# Modelos más pequeños por idioma, p. ej.
+#   {'es': 'pysentimiento/robertuito-sentiment-analysis',
+#    'en': 'distilbert-base-uncased-finetuned-sst-2-english'}
+# Los textos mixtos o de idioma dudoso siguen yendo al modelo multilingüe.
+MODELOS_POR_IDIOMA = SENTIMENT_CONFIG.get('modelos_por_idioma', {})
+IDIOMA_CONFIANZA_MIN = SENTIMENT_CONFIG.get('idioma_confianza_min', 0.5)
+RUTA_MULTILINGUE = 'multilingue'
+
+# torch/transformers se importan de forma diferida al cargar el modelo;
+# aquí solo se comprueba que estén instalados. Con servidor de modelo
+# (SENTIMENT_CONFIG['servidor_modelo']) este proceso no los necesita.
+TRANSFORMERS_AVAILABLE = bool(SENTIMENT_CONFIG.get('servidor_modelo')) or all(
+    importlib.util.find_spec(modulo) is not None for modulo in ('transformers', 'torch')
+)
+ANALYZER_FAILURE = not TRANSFORMERS_AVAILABLE
+if not TRANSFORMERS_AVAILABLE:
+    print("❌ Error crítico: transformers/torch no están instalados")
     print("⚠️ Analizador de sentimientos deshabilitado.")
-    TRANSFORMERS_AVAILABLE = False
-    ANALYZER_FAILURE = True
+
+# Resultado por defecto cuando no hay modelo disponible
+NEUTRAL = ('neutral', 0.5, None)
+
+
+def cargar_backend_local(model_name, procesos=None):
+    """Carga un modelo en este proceso (opcionalmente detrás de un pool de procesos)"""
+    # El backend ('transformers' u 'onnx') es configurable
+    fabrica = partial(
+        cargar_backend,
+        SENTIMENT_CONFIG.get('backend', 'transformers'),
+        model_name,
+        onnx_dir=SENTIMENT_CONFIG.get('onnx_dir'),
+        num_threads=SENTIMENT_CONFIG.get('onnx_threads')
+    )
+    backend = fabrica()
+    if procesos:
+        # Modo multi-núcleo: fork de workers con el modelo ya cargado (spawn si ya hay hilos)
+        backend = ProcessPoolBackend(
+            backend,
+            fabrica,
+            procesos=procesos,
+            hilos_por_proceso=SENTIMENT_CONFIG.get('hilos_por_proceso', 1),
+            timeout=SENTIMENT_CONFIG.get('proceso_timeout', 30)
+        )
+    return backend
+
 
 class SentimentAnalyzer:
     def __init__(self):
         self.analyzer = None
-        if TRANSFORMERS_AVAILABLE:
-            self.init_analyzer()
+        self.batcher = None
+        self.cache = None
+        self.modelo_version = None
+        self.cascade = None
+        if SENTIMENT_CONFIG.get('cascade', False):
+            self.cascade = CascadeFilter(umbral=SENTIMENT_CONFIG.get('cascade_umbral', 0.67))
+        self.estado = 'no_iniciado' if TRANSFORMERS_AVAILABLE else 'deshabilitado'
+        self._lock_carga = threading.Lock()
+        # Modelos por idioma: se cargan la primera vez que llega un texto de ese idioma
+        self.modelos_idioma = {}
+        self._idiomas_fallidos = set()
+        self._rutas = Counter()
+        self._lock_rutas = threading.Lock()
+        self._hilo_warmup = None
+        if SENTIMENT_CONFIG.get('batching', True):
+            self.batcher = MicroBatcher(
+                self.analyze_batch,
+                max_batch_size=SENTIMENT_CONFIG.get('batch_max_size', 16),
+                max_wait_ms=SENTIMENT_CONFIG.get('batch_max_wait_ms', 10),
+                nombre="sentiment-batcher"
+            )
     
     def init_analyzer(self):
         global ANALYZER_FAILURE
-        if not TRANSFORMERS_AVAILABLE:
+        if not TRANSFORMERS_AVAILABLE or self.analyzer is not None:
             return
-        if self.analyzer is None:
+        with self._lock_carga:
+            # Otro hilo pudo terminar la carga mientras esperábamos el lock
+            if self.analyzer is not None or ANALYZER_FAILURE:
+                return
+            self.estado = 'cargando'
             try:
-                device_id = 0 if torch.cuda.is_available() else -1
-                print(f"Device set to use {'cuda' if device_id == 0 else 'cpu'}")
-                
                 # CAMBIO: Usar modelo multilingüe que soporta inglés y español
-                self.analyzer = pipeline(
-                    "text-classification",
-                    model="nlptown/bert-base-multilingual-uncased-sentiment",  # MODELO MULTILINGÜE
-                    device=device_id,
-                    truncation=True
-                )
-                print("✅ Analizador de sentimientos MULTILINGÜE inicializado correctamente")
+                backend = self._crear_backend(MODEL_NAME, procesos=SENTIMENT_CONFIG.get('procesos'))
+                # Los resultados dependen del modelo y del backend que los produjo
+                self.modelo_version = f"{MODEL_NAME}:{backend.nombre}:chunks{SENTIMENT_CONFIG.get('max_chunks', 4)}"
+                if MODELOS_POR_IDIOMA:
+                    rutas = ",".join(f"{idioma}={modelo}" for idioma, modelo in sorted(MODELOS_POR_IDIOMA.items()))
+                    self.modelo_version += f":idiomas({rutas};{IDIOMA_CONFIANZA_MIN})"
+                # La cascada no entra en la versión: solo se marcan (y se cachean) resultados
+                # del modelo, también en rescore (cascada=False); lo que decide el léxico va sin versión
+                if SENTIMENT_CONFIG.get('cache', True):
+                    self.cache = SentimentCache(
+                        self.modelo_version,
+                        max_items=SENTIMENT_CONFIG.get('cache_max_items', 5000),
+                        persistente=SENTIMENT_CONFIG.get('cache_persistente', True)
+                    )
+                self.analyzer = backend
+                self.estado = 'cargado'
+                print(f"✅ Analizador de sentimientos MULTILINGÜE inicializado correctamente (backend: {backend.nombre})")
             except Exception as e:
                 print(f"❌ Error inicializando analizador: {e}")
                 ANALYZER_FAILURE = True
                 self.analyzer = None
+                self.estado = 'error'
+
+    def _crear_backend(self, model_name, procesos=None):
+        """Backend local, o cliente del servidor de modelo si está configurado"""
+        socket_path = SENTIMENT_CONFIG.get('servidor_modelo')
+        if not socket_path:
+            return cargar_backend_local(model_name, procesos)
+        respaldo = None
+        if SENTIMENT_CONFIG.get('servidor_respaldo_local', False):
+            # Sin pool de procesos: el respaldo se carga cuando ya hubo inferencias
+            respaldo = lambda: cargar_backend_local(model_name)
+        return RemoteBackend(
+            model_name,
+            socket_path=socket_path,
+            timeout=SENTIMENT_CONFIG.get('servidor_timeout', 10),
+            respaldo=respaldo,
+            espera_reintento=SENTIMENT_CONFIG.get('servidor_espera_reintento', 30)
+        )
+
+    def _modelo_para(self, idioma):
+        """Backend del idioma (carga diferida); None si hay que usar el multilingüe"""
+        if idioma not in MODELOS_POR_IDIOMA or idioma in self._idiomas_fallidos:
+            return None
+        backend = self.modelos_idioma.get(idioma)
+        if backend is not None:
+            return backend
+        with self._lock_carga:
+            if idioma in self.modelos_idioma or idioma in self._idiomas_fallidos:
+                return self.modelos_idioma.get(idioma)
+            try:
+                # Sin pool de procesos: hacer fork después de la primera inferencia no es seguro
+                backend = self._crear_backend(MODELOS_POR_IDIOMA[idioma])
+                self.modelos_idioma[idioma] = backend
+                print(f"✅ Modelo de sentimientos para '{idioma}' cargado: {MODELOS_POR_IDIOMA[idioma]}")
+                return backend
+            except Exception as e:
+                print(f"⚠️ No se pudo cargar el modelo para '{idioma}' ({e}), se usará el multilingüe")
+                self._idiomas_fallidos.add(idioma)
+                return None
+
+    def _rutear(self, textos):
+        """Agrupa los índices de los textos por modelo: {ruta: (backend, [índices])}"""
+        grupos = {}
+        for i, texto in enumerate(textos):
+            ruta, backend = RUTA_MULTILINGUE, self.analyzer
+            if MODELOS_POR_IDIOMA:
+                idioma, confianza = detectar_idioma(texto)
+                if confianza >= IDIOMA_CONFIANZA_MIN:
+                    backend_idioma = self._modelo_para(idioma)
+                    if backend_idioma is not None:
+                        ruta, backend = idioma, backend_idioma
+            grupos.setdefault(ruta, (backend, []))[1].append(i)
+
+        with self._lock_rutas:
+            for ruta, (_, indices) in grupos.items():
+                self._rutas[ruta] += len(indices)
+        return grupos
+
+    def warm_up(self):
+        """
+        Carga el modelo en un hilo en segundo plano y ejecuta una inferencia de calentamiento.
+        Con pool de procesos (SENTIMENT_CONFIG['procesos']) el modelo se carga aquí
+        mismo, antes de crear ningún hilo, para que el pool se cree con fork.
+        """
+        if not TRANSFORMERS_AVAILABLE or self._hilo_warmup is not None:
+            return self._hilo_warmup
+
+        if SENTIMENT_CONFIG.get('procesos') and not SENTIMENT_CONFIG.get('servidor_modelo'):
+            self.init_analyzer()
+
+        def _calentar():
+            self.init_analyzer()
+            if self.analyzer is None:
+                return
+            try:
+                # Directo al modelo: no pasa por la caché para que el forward pass se ejecute
+                self._run_model([self.process_emojis("Calentando el modelo 🎵 warm-up")])
+                print("🔥 Modelo de sentimientos caliente y listo")
+            except Exception as e:
+                print(f"❌ Error en la inferencia de calentamiento: {e}")
+                self.estado = 'error'
+
+        self._hilo_warmup = threading.Thread(target=_calentar, name="sentiment-warmup", daemon=True)
+        self._hilo_warmup.start()
+        return self._hilo_warmup
+
+    def is_ready(self):
+        # Sin transformers instalado el analizador responde siempre 'neutral';
+        # no hay nada que esperar
+        return self.estado in ('listo', 'deshabilitado')
 
     def process_emojis(self, text):
         """Convierte emojis comunes a texto descriptivo para mejor análisis"""
-        emoji_map = {
-            '😊': 'feliz contento positivo sonriente',
-            '😂': 'divertido risa gracioso positivo',
-            '❤️': 'amor corazón positivo',
-            '😍': 'encantado amor positivo enamorado',
-            '🤩': 'impresionado asombroso positivo',
-            '😎': 'genial cool positivo',
-            '😔': 'triste desanimado negativo',
-            '😢': 'triste llorar negativo',
-            '😭': 'llorar tristeza negativo',
-            '😠': 'enojado furioso negativo',
-            '😡': 'furioso enojado negativo',
-            '👍': 'bueno aprobar positivo',
-            '👎': 'malo desaprobar negativo',
-            '🎵': 'música canción melodia',
-            '🎶': 'música melodía notas',
-            '🎧': 'escuchar música audio',
-            '🎤': 'cantar voz vocal',
-            '🔥': 'excelente fuego caliente positivo',
-            '💯': 'perfecto cien excelente positivo',
-            '⭐': 'estrella favorito positivo',
-            '🌟': 'brillante estrella positivo',
-            '🙌': 'celebrar aprobar positivo',
-            '👏': 'aplaudir felicitar positivo',
-            '💔': 'corazón roto triste negativo',
-            '😴': 'aburrido dormir negativo',
-            '🤢': 'asqueado desagradable negativo',
-            '🎉': 'celebrar fiesta positivo',
-            '🤔': 'pensar cuestionar',
-            '✨': 'magia brillante positivo',
-            '💖': 'amor corazón positivo',
-            '💕': 'amor cariño positivo',
-            '🎶': 'música notas positivo',
-            '🏆': 'ganador excelente positivo',
-            '💫': 'magia asombroso positivo',
-            '🤘': 'rock genial positivo',
-            '🙏': 'rezar esperar',
-            '🥰': 'amor feliz positivo',
-            '😘': 'beso amor positivo',
-            '🥺': 'suplicar tierno',
-            '🤗': 'abrazo amor positivo',
-            '🤭': 'tímido gracioso',
-            '🤫': 'secreto callar',
-            '🤥': 'mentira falso negativo',
-            '😇': 'angel bueno positivo',
-            '🥳': 'fiesta celebrar positivo',
-            '😏': 'sarcástico confiado',
-            '😌': 'aliviado tranquilo positivo',
-            '😪': 'soñoliento cansado',
-            '🤤': 'deseo antojo',
-            '😷': 'enfermo médico',
-            '🤒': 'enfermo fiebre negativo',
-            '🤕': 'herido dolor negativo',
-            '🤮': 'vomitar asqueado negativo',
-            '🤯': 'sorprendido asombroso',
-            '🥶': 'frío congelado',
-            '🥵': 'calor sudor',
-            '😳': 'avergonzado tímido',
-            '🥴': 'mareado confundido',
-            '😵': 'mareado aturdido',
-            '😱': 'asustado terror negativo',
-            '🤬': 'maldecir enojado negativo',
-            '👻': 'fantasma divertido',
-            '💀': 'muerte oscuro negativo',
-            '👽': 'alien extraño',
-            '🤖': 'robot tecnología'
-        }
-        
-        for emoji, description in emoji_map.items():
-            text = text.replace(emoji, f' {description} ')
-        
-        return text
+        return expandir_emojis(text)
 
     def detect_language(self, text):
-        """Detección simple de idioma basada en caracteres"""
-        # Contar caracteres en inglés vs español
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        spanish_chars = len(re.findall(r'[áéíóúñÁÉÍÓÚÑ]', text))
-        
-        # Palabras comunes en inglés
-        english_words = len(re.findall(r'\b(the|and|you|that|was|for|are|with|his|they|this|have|from|one|would|there|their|what|about|which|when|make|like|time|just|know|take|people|into|year|your|good|some|could|them|see|other|than|then|now|look|only|come|its|over|think|also|back|after|use|two|how|our|work|first|well|way|even|new|want|because|any|these|give|day|most|us)\b', text.lower()))
-        
-        # Palabras comunes en español
-        spanish_words = len(re.findall(r'\b(el|la|de|que|y|en|un|ser|se|no|haber|por|con|su|para|como|estar|tener|le|lo|lo|todo|pero|más|hacer|o|poder|decir|este|ir|otro|ese|la|si|me|ya|ver|porque|dar|cuando|él|muy|sin|vez|mucho|saber|qué|sobre|mi|alguno|mismo|yo|también|hasta|año|dos|querer|entre|así|primero|desde|grande|eso|ni|nos|venir|pasado|llamar|quien|estar|nunca|siempre|trabajar|encontrar|casa|parte|tiempo|ella|ser|después|ir|cosa|hombre|parecer|nuestro|tan|donde|ahora|algo|entonces|mano|otros|aunque|esa|mujer|dar|vida|mil|parecer|forma|cosa|hacer|saber|agua|correr|parecer|tipo|ciudad|hecho|ojo|tierra|aquel|pensar|cabeza|querer|historia|pedir|esperar|año|claro|color|cara|dejar|hecho|lado|mundo|mientras|dejar|cada|trabajo|menos|noche|siempre|punto|empezar|aún|tal|cual|menos|tal|menos|seguir|hijo|mes|dinero|problema|acabar|luz|cambiar|sentir|dejar|llegar|importante|acabar|nacional|servir|gustar|jugar|estudio|trabajar|necesitar|vivir|sentir|tratar|recordar|terminar|permitir|considerar|esperar|aparecer|pertenecer|intentar|lograr|mantener|recibir|presentar|continuar|ocurrir|significar|mostrar|explicar|entender|conseguir|comenzar|seguir|dejar|encontrar|llamar|pensar|llevar|dejar|encontrar|poner|quedar|parecer|hablar|saber|dar|ver|hacer|ir|ser|tener|estar)\b', text.lower()))
-        
-        if english_chars > 0 and (spanish_chars == 0 or english_words > spanish_words):
-            return 'en'
-        return 'es'
+        """Detección de idioma ('es' o 'en') con el módulo compartido"""
+        idioma, _ = detectar_idioma(text)
+        return idioma
+
+    def analyze_batch(self, textos, usar_cache=True, estricto=False, cascada=True):
+        """
+        Analiza varios textos con un único forward pass (padding dinámico).
+        Devuelve (sentimiento, puntuacion, probabilidades) por texto; probabilidades
+        es la distribución de 1-5 estrellas o None si no hubo inferencia.
+        Con estricto=True los errores se propagan en lugar de devolver 'neutral'.
+        Con cascada=False todos los textos pasan por el modelo, aunque el léxico pudiera resolverlos.
+        """
+        if ANALYZER_FAILURE or not TRANSFORMERS_AVAILABLE or not textos:
+            if estricto:
+                raise RuntimeError("Analizador de sentimientos no disponible")
+            return [NEUTRAL for _ in textos]
+
+        try:
+            self.init_analyzer()
+
+            if self.analyzer is None:
+                if estricto:
+                    raise RuntimeError("Analizador de sentimientos no disponible")
+                return [NEUTRAL for _ in textos]
+
+            # CASCADA: el léxico resuelve los casos obvios y solo el resto llega al modelo
+            if self.cascade is not None and cascada:
+                resultados = self.cascade.filtrar(textos)
+            else:
+                resultados = [None] * len(textos)
+
+            escalar = [i for i, resultado in enumerate(resultados) if resultado is None]
+            # ENRUTADO POR IDIOMA: un forward pass por modelo dentro del mismo lote
+            for ruta, (backend, indices) in self._rutear([textos[i] for i in escalar]).items():
+                indices = [escalar[j] for j in indices]
+                # PROCESAR EMOJIS ANTES DEL ANÁLISIS
+                procesados = [self.process_emojis(textos[i]) for i in indices]
+                for i, resultado in zip(indices, self._score_with_model(procesados, usar_cache, backend, ruta)):
+                    resultados[i] = resultado
+
+            return resultados
+
+        except Exception as e:
+            if estricto:
+                raise
+            print(f"❌ Error en análisis con transformers: {str(e)}")
+            return [NEUTRAL for _ in textos]
+
+    def _score_with_model(self, procesados, usar_cache=True, backend=None, ruta=RUTA_MULTILINGUE):
+        """Consulta la caché y pasa por el modelo solo los textos que faltan"""
+        if self.cache is None or not usar_cache:
+            return self._run_model(procesados, backend)
+
+        # Cada modelo tiene sus propias entradas: el mismo texto puede puntuar distinto
+        ruta_cache = None if ruta == RUTA_MULTILINGUE else ruta
+        claves = [self.cache.clave(texto, ruta_cache) for texto in procesados]
+        # La caché aporta la inferencia; la etiqueta sale de los umbrales actuales
+        encontrados = {clave: reetiquetar(valor) for clave, valor in self.cache.get_many(claves).items()}
+
+        # Solo los textos no cacheados (sin repetir) pasan por el modelo
+        pendientes = {}
+        for clave, texto in zip(claves, procesados):
+            if clave not in encontrados and clave not in pendientes:
+                pendientes[clave] = texto
+
+        if pendientes:
+            nuevos = dict(zip(pendientes, self._run_model(list(pendientes.values()), backend)))
+            self.cache.set_many(nuevos)
+            encontrados.update(nuevos)
+
+        return [encontrados[clave] for clave in claves]
+
+    def _run_model(self, procesados, backend=None):
+        """Un único forward pass sobre textos ya procesados"""
+        backend = backend or self.analyzer
+        # Reseñas largas: ventanas de tokens en el mismo forward pass (acotado por max_chunks)
+        probs = backend.predict_proba(procesados, max_chunks=SENTIMENT_CONFIG.get('max_chunks', 4))
+        print(f"🎭 Lote analizado: {len(procesados)} textos")
+        if self.estado == 'cargado':
+            # La primera inferencia completa deja el proceso "caliente"
+            self.estado = 'listo'
+
+        resultados = []
+        for fila in probs:
+            # Se conserva la distribución completa para poder re-etiquetar sin re-inferir
+            probabilidades = [round(float(p), 4) for p in fila]
+            sentimiento, puntuacion = etiquetar_probabilidades(probabilidades)
+            resultados.append((sentimiento, puntuacion, probabilidades))
+        return resultados
 
     def analyze_text(self, texto):
+        """Devuelve (sentimiento, puntuacion) para un texto"""
+        sentimiento, puntuacion, _ = self.analyze_text_detallado(texto)
+        return sentimiento, puntuacion
+
+    def analyze_text_detallado(self, texto):
+        """Devuelve (sentimiento, puntuacion, probabilidades 1-5 estrellas o None)"""
         if ANALYZER_FAILURE or not TRANSFORMERS_AVAILABLE:
-            return 'neutral', 0.5
+            return NEUTRAL
 
         try:
-            self.init_analyzer() 
-            
-            if self.analyzer is None:
-                 return 'neutral', 0.5
-            
-            # PROCESAR EMOJIS ANTES DEL ANÁLISIS
-            texto_procesado = self.process_emojis(texto)
-            
             # DETECTAR IDIOMA (para logging)
             idioma = self.detect_language(texto)
-            emojis_procesados = texto != texto_procesado
-            
-            print(f"🌐 Texto analizado - Idioma: {idioma}, Longitud: {len(texto)} chars, Emojis procesados: {emojis_procesados}")
-            
-            if emojis_procesados:
-                print(f"📝 Texto original: {texto[:100]}...")
-                print(f"🔤 Texto procesado: {texto_procesado[:100]}...")
-            
-            resultado = self.analyzer(texto_procesado)[0]
-            etiqueta_raw = resultado['label'].lower()
-            score = float(resultado['score'])
-            
-            print(f"🎭 Resultado crudo del modelo: {etiqueta_raw}, Score: {score}")
-            
-            # El modelo multilingüe usa ratings 1-5 estrellas
-            if '5' in etiqueta_raw or '4' in etiqueta_raw:
-                normalized_score = 0.5 + (score * 0.5)
-                sentimiento = 'positivo'
-            elif '1' in etiqueta_raw or '2' in etiqueta_raw:
-                normalized_score = score * 0.5
-                sentimiento = 'negativo'
-            else:  # 3 estrellas
-                normalized_score = 0.5
-                sentimiento = 'neutral'
-            
-            print(f"✅ Sentimiento final: {sentimiento}, Puntuación normalizada: {normalized_score}")
-            return sentimiento, round(normalized_score, 2)
-                
+            print(f"🌐 Texto analizado - Idioma: {idioma}, Longitud: {len(texto)} chars")
+
+            if self.batcher is not None:
+                resultado = self.batcher.procesar(
+                    texto, timeout=SENTIMENT_CONFIG.get('batch_timeout', 30)
+                )
+            else:
+                resultado = self.analyze_batch([texto])[0]
+
+            print(f"✅ Sentimiento final: {resultado[0]}, Puntuación normalizada: {resultado[1]}")
+            return resultado
+
         except Exception as e:
             print(f"❌ Error en análisis con transformers: {str(e)}")
-            return 'neutral', 0.5
+            return NEUTRAL
+
+    def estadisticas(self):
+        """Estadísticas del planificador de lotes y de la caché"""
+        return {
+            'batching': self.batcher.estadisticas() if self.batcher is not None else None,
+            'cache': self.cache.estadisticas() if self.cache is not None else None,
+            'cascada': self.cascade.estadisticas() if self.cascade is not None else None,
+            'procesos': self.analyzer.estadisticas() if isinstance(self.analyzer, ProcessPoolBackend) else None,
+            'servidor': self.analyzer.estadisticas() if isinstance(self.analyzer, RemoteBackend) else None,
+            'idiomas': {
+                'textos_por_modelo': dict(self._rutas),
+                'modelos_cargados': {idioma: b.model_name for idioma, b in self.modelos_idioma.items()},
+                'fallidos': sorted(self._idiomas_fallidos),
+            } if MODELOS_POR_IDIOMA else None,
+        }
 
 if TRANSFORMERS_AVAILABLE:
     sentiment_analyzer = SentimentAnalyzer()
@@ -0,0 +1,223 @@
+"""
+Frecuencias de términos por reseña para las nubes de palabras.
+
+Los lemas significativos (sustantivos y adjetivos según spaCy, con el mismo
+filtro que tenía la nube original para todas las reseñas) se extraen una sola
+vez al escribir la reseña (con puntuación asíncrona, en el worker de pendientes,
+fuera de la petición) y se guardan en `resena_terminos`. Las nubes se generan
+con una única consulta agregada (global, por canción, por álbum o por usuario)
+y WordCloud.generate_from_frequencies: spaCy ya no está en el camino de las
+peticiones de lectura.
+
+Del pipeline de spaCy solo se cargan los componentes que dan POS y lema
+(parser y NER se excluyen) y los lotes pasan por `nlp.pipe` reseña a reseña,
+opcionalmente en varios procesos. La tabla hace de memo por id_resena: cada
+reseña se procesa una sola vez.
+
+Reseñas anteriores, o tras cambiar las stopwords:
+
+    python -m reviews.terms [--todas] [--batch 500] [--spacy-batch 64] [--procesos 1]
+"""
+import argparse
+from collections import Counter
+
+from wordcloud import STOPWORDS
+
+from database.connection import db
+
+try:
+    from config import ANALISIS_CONFIG
+except ImportError:
+    ANALISIS_CONFIG = {}
+
+# Componentes que no aportan a POS/lema; el parser y el NER son la mayor parte del coste
+COMPONENTES_EXCLUIDOS = ['parser', 'ner']
+SPACY_BATCH = ANALISIS_CONFIG.get('spacy_batch_size', 64)
+SPACY_PROCESOS = ANALISIS_CONFIG.get('spacy_procesos', 1)
+
+try:
+    import spacy
+    nlp = spacy.load("es_core_news_sm", exclude=COMPONENTES_EXCLUIDOS)
+except (ImportError, OSError):
+    print("El modelo de SpaCy 'es_core_news_sm' no se encontró. Asegúrate de haber ejecutado 'python -m spacy download es_core_news_sm'")
+    nlp = None
+
+POS_PERMITIDAS = {'NOUN', 'ADJ'}  # Solo adjetivos y sustantivos para palabras más relevantes
+LARGO_MINIMO = 4
+
+STOPWORDS_DOMINIO = {
+    'cancion', 'álbum', 'artista', 'track', 'song', 'pegadecer',
+    'contenido', 'algo', 'crecer', 'letra', 'musical', 'lirica',
+    'lirico', 'cotidiano', 'obra', 'divertir', 'complementar',
+    'canción', 'situaciones', 'banda', 'canciones', 'album', 'jazz',
+    'pop', 'año', 'barreras', 'vogue', 'combinación', 'modelo', 'cotorra',
+    'labioso', 'auditivo', 'musica', 'música', 'escuchar', 'sonido',
+    'ritmo', 'melodia', 'melodía', 'verso', 'coro', 'estribillo',
+    'hacer', 'tener', 'poder', 'decir', 'ver', 'dar', 'saber', 'ir',
+    'ser', 'estar', 'haber', 'poder', 'querer', 'parecer', 'gente',
+    'tiempo', 'vez', 'parte', 'forma', 'caso', 'manera', 'momento', 'instrumento',
+    'sicario', 'llegadoro', 'mediocre', 'melancolía', 'persona', 'aburrido', 'qiue',
+    'electrónico', 'aburrido', 'barrera', 'burla', 'cuandotodo', 'batería', 'concierto',
+    'conforme', 'vocalista', 'sobrellevar', 'quelar', 'pasar', 'género', 'terminar',
+    'primo', 'llegar', 'él', 'general', 'recuerdaar', 'turner', 'termino',
+    'escuche', 'cabra', 'sonar', 'pegadecer', 'tristeza', 'nostalgia',
+    'preocupación', 'lleno', 'dueto', 'espera', 'regresa'
+}
+
+TODAS_STOPWORDS = frozenset(STOPWORDS) | frozenset(STOPWORDS_DOMINIO)
+
+
+def _terminos_doc(doc):
+    return Counter(
+        lema for lema in (
+            token.lemma_.lower()
+            for token in doc
+            if (token.pos_ in POS_PERMITIDAS and
+                not token.is_stop and
+                token.is_alpha and
+                len(token.lemma_) >= LARGO_MINIMO)
+        )
+        if lema not in TODAS_STOPWORDS
+    )
+
+
+def extraer_terminos_lote(textos, batch_size=SPACY_BATCH, n_process=SPACY_PROCESOS):
+    """
+    Counter {lema: frecuencia} por texto, en el mismo orden. None para todos
+    los textos si spaCy no está disponible (se reintenta en el backfill).
+    """
+    resultados = [Counter() for _ in textos]
+    con_texto = [i for i, texto in enumerate(textos) if texto]
+
+    if con_texto:
+        if nlp is None:
+            for i in con_texto:
+                resultados[i] = None
+        else:
+            # Un Doc por reseña en streaming, sin unir todo en un único texto gigante
+            docs = nlp.pipe(
+                (textos[i] for i in con_texto),
+                batch_size=batch_size,
+                n_process=n_process if len(con_texto) >= batch_size else 1
+            )
+            for i, doc in zip(con_texto, docs):
+                resultados[i] = _terminos_doc(doc)
+    return resultados
+
+
+def extraer_terminos(texto):
+    """Términos de una sola reseña (camino de escritura)"""
+    return extraer_terminos_lote([texto], n_process=1)[0]
+
+
+def guardar_terminos(cur, id_resena, terminos):
+    """Guarda los términos ya extraídos de una reseña dentro de la transacción del llamador"""
+    if terminos is None:
+        return
+    cur.execute("DELETE FROM resena_terminos WHERE id_resena = %s", (id_resena,))
+    if terminos:
+        cur.executemany("""
+            INSERT INTO resena_terminos (id_resena, termino, frecuencia)
+            VALUES (%s, %s, %s)
+        """, [(id_resena, termino, frecuencia) for termino, frecuencia in terminos.items()])
+    cur.execute("UPDATE resenas SET terminos_extraidos = TRUE WHERE id_resena = %s", (id_resena,))
+
+
+def frecuencias_terminos(cur, id_cancion=None, id_album=None, id_usuario=None, ultimas=None, limite=200):
+    """
+    {término: frecuencia} agregado en SQL, opcionalmente filtrado por entidad
+    y/o limitado a las `ultimas` reseñas más recientes
+    """
+    filtros = []
+    parametros = []
+    for columna, valor in (('id_cancion', id_cancion), ('id_album', id_album), ('id_usuario', id_usuario)):
+        if valor is not None:
+            filtros.append(f"r.{columna} = %s")
+            parametros.append(valor)
+    if ultimas:
+        filtros.append("r.id_resena IN (SELECT id_resena FROM resenas ORDER BY fecha_creacion DESC LIMIT %s)")
+        parametros.append(ultimas)
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+
+    cur.execute(f"""
+        SELECT t.termino, SUM(t.frecuencia) AS total
+        FROM resena_terminos t
+        JOIN resenas r ON r.id_resena = t.id_resena
+        {where}
+        GROUP BY t.termino
+        ORDER BY total DESC, t.termino
+        LIMIT %s
+    """, parametros + [limite])
+    return {termino: int(total) for termino, total in cur.fetchall()}
+
+
+def backfill(todas=False, batch=500, spacy_batch=SPACY_BATCH, procesos=SPACY_PROCESOS):
+    """
+    Extrae los términos de las reseñas pendientes (o de todas). Confirma cada
+    lote, así que se puede interrumpir y relanzar. Devuelve cuántas procesó.
+    """
+    from database.schema import asegurar_esquema
+    from reviews.analysis_cache import registrar_cambio
+
+    asegurar_esquema()
+    conn = db.get_connection()
+    if not conn:
+        print("❌ Error de conexión a la base de datos")
+        return None
+
+    cur = None
+    procesadas = 0
+    ultimo_id = 0
+    try:
+        cur = conn.cursor()
+        while True:
+            cur.execute("""
+                SELECT id_resena, texto_resena
+                FROM resenas
+                WHERE id_resena > %s AND (%s OR NOT terminos_extraidos)
+                ORDER BY id_resena
+                LIMIT %s
+            """, (ultimo_id, todas, batch))
+            filas = cur.fetchall()
+            if not filas:
+                break
+
+            terminos = extraer_terminos_lote([texto for _, texto in filas], spacy_batch, procesos)
+            for (id_resena, _), terminos_resena in zip(filas, terminos):
+                guardar_terminos(cur, id_resena, terminos_resena)
+            registrar_cambio(cur)
+            conn.commit()
+
+            procesadas += len(filas)
+            ultimo_id = filas[-1][0]
+            print(f"✅ {procesadas} reseñas con términos extraídos (último id {ultimo_id})")
+        return procesadas
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error extrayendo términos (se puede relanzar): {e}")
+        return None
+    finally:
+        if cur:
+            cur.close()
+        db.close_connection(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--todas', action='store_true',
+                        help="Volver a extraer también las reseñas ya procesadas")
+    parser.add_argument('--batch', type=int, default=500, help="Reseñas por lote")
+    parser.add_argument('--spacy-batch', type=int, default=SPACY_BATCH, help="batch_size de nlp.pipe")
+    parser.add_argument('--procesos', type=int, default=SPACY_PROCESOS,
+                        help="n_process de nlp.pipe (útil en corpus grandes)")
+    args = parser.parse_args()
+
+    procesadas = backfill(todas=args.todas, batch=args.batch,
+                          spacy_batch=args.spacy_batch, procesos=args.procesos)
+    if procesadas is None:
+        raise SystemExit(1)
+    print(f"🏁 Extracción de términos terminada: {procesadas} reseñas")
+
+
+if __name__ == '__main__':
+    main()
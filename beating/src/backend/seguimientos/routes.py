@@ -1,5 +1,5 @@
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
 from functools import wraps
 import jwt
 from config import APP_CONFIG
@@ -51,7 +51,7 @@ def init_seguimientos_routes(app):
             if int(id_seguidor) == int(id_seguido):
                 return jsonify({'error': 'No puedes seguirte a ti mismo'}), 400
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -89,8 +89,6 @@ def init_seguimientos_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/seguimientos/<int:id_seguido>', methods=['DELETE'])
     @token_required
@@ -99,7 +97,7 @@ def init_seguimientos_routes(app):
         cur = None
         try:
             id_seguidor = request.user_id 
-            conn = db.get_connection()
+            conn = conexion_peticion()
 
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
@@ -126,18 +124,15 @@ def init_seguimientos_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/seguimientos/estado/<int:id_seguido>', methods=['GET'])
     @token_required # 🛑 PROTEGIDO
     def verificar_seguimiento(id_seguido):
-        conn = None
         cur = None
         try:
             id_seguidor = request.user_id
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
             
@@ -158,14 +153,12 @@ def init_seguimientos_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios/<int:id_usuario>/seguidores', methods=['GET'])
     def get_seguidores(id_usuario):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -195,14 +188,12 @@ def init_seguimientos_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios/<int:id_usuario>/seguidos', methods=['GET'])
     def get_seguidos(id_usuario):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -232,14 +223,12 @@ def init_seguimientos_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios/<int:id_usuario>/estadisticas', methods=['GET'])
     def get_estadisticas_usuario(id_usuario):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -276,6 +265,4 @@ def init_seguimientos_routes(app):
             return jsonify({'error': 'Error al obtener estadísticas'}), 500
         finally:
             if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+                cur.close()
\ No newline at end of file
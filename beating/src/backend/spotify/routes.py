@@ -245,7 +245,8 @@ def init_spotify_routes(app):
             user_id = user_info['id']
             print(f"✅ Usuario de Spotify autenticado: {user_id}")
             
-            # Obtener conexión a la base de datos
+            # Conexión propia, devuelta antes de crear la playlist en Spotify
+            # (la de la petición seguiría prestada hasta el teardown)
             conn = db.get_connection()
             if not conn:
                 print("❌ Error de conexión a BD")
@@ -0,0 +1,12 @@
+"""
+Pruebas del backend. Ejecutar desde src/backend:
+
+    python -m pytest -q tests
+
+No necesitan PostgreSQL ni el modelo de sentimientos: las que tocan el pool
+o la caché usan conexiones falsas.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
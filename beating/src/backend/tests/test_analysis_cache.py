@@ -0,0 +1,35 @@
+import threading
+
+from reviews.analysis_cache import VersionedCache
+
+
+def test_sirve_de_cache_mientras_la_version_no_cambia():
+    construcciones = []
+    cache = VersionedCache('prueba', lambda: (1, 10), version_ttl=0)
+
+    assert cache.obtener(lambda: construcciones.append(1) or 'a') == 'a'
+    assert cache.obtener(lambda: construcciones.append(1) or 'b') == 'a'
+    assert len(construcciones) == 1
+
+
+def test_invalidar_registra_el_cambio_y_revalida_en_segundo_plano():
+    cambios = []
+    listo = threading.Event()
+    cache = VersionedCache('prueba', lambda: (1, 10), version_ttl=60, cambio_fn=lambda: cambios.append(1))
+    cache.obtener(lambda: 'viejo')
+
+    cache.invalidar([7, 8])
+    assert cambios == [1]
+
+    def construir():
+        listo.set()
+        return 'nuevo'
+
+    # Stale-while-revalidate: la respuesta anterior enseguida, la nueva después
+    assert cache.obtener(construir) == 'viejo'
+    assert listo.wait(2)
+    for _ in range(100):
+        if cache.estadisticas()['reconstrucciones'] == 2:
+            break
+        threading.Event().wait(0.01)
+    assert cache.obtener(construir) == 'nuevo'
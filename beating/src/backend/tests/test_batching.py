@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from reviews.batching import MicroBatcher
+
+
+def test_agrupa_peticiones_concurrentes_en_un_lote():
+    lotes = []
+    liberar = threading.Event()
+
+    def procesar_lote(items):
+        lotes.append(list(items))
+        liberar.wait(1)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(procesar_lote, max_batch_size=8, max_wait_ms=10)
+    # El primer elemento ocupa al hilo; los siguientes se juntan mientras tanto
+    primero = batcher.submit(0)
+    time.sleep(0.1)
+    futuros = [batcher.submit(i) for i in range(1, 6)]
+    liberar.set()
+
+    assert primero.result(timeout=2) == 0
+    assert [f.result(timeout=2) for f in futuros] == [2, 4, 6, 8, 10]
+    assert lotes[1] == [1, 2, 3, 4, 5]
+    assert batcher.estadisticas()['lote_maximo'] == 5
+
+
+def test_respeta_max_batch_size():
+    lotes = []
+    liberar = threading.Event()
+
+    def procesar_lote(items):
+        liberar.wait(1)
+        lotes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(procesar_lote, max_batch_size=3, max_wait_ms=50)
+    futuros = [batcher.submit(i) for i in range(7)]
+    liberar.set()
+
+    assert [f.result(timeout=2) for f in futuros] == list(range(7))
+    assert max(lotes) <= 3
+    assert sum(lotes) == 7
+
+
+def test_un_error_se_propaga_a_todo_el_lote():
+    def procesar_lote(items):
+        raise ValueError("modelo caído")
+
+    batcher = MicroBatcher(procesar_lote, max_wait_ms=0)
+    with pytest.raises(ValueError):
+        batcher.procesar("hola", timeout=2)
+    assert batcher.estadisticas()['errores'] == 1
+
+
+def test_tamano_de_resultados_incorrecto_es_un_error():
+    batcher = MicroBatcher(lambda items: [], max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.procesar("hola", timeout=2)
@@ -0,0 +1,73 @@
+from reviews import cache as modulo_cache
+from reviews.cache import SentimentCache, normalizar_texto
+
+
+class CursorFalso:
+    def __init__(self):
+        self.sentencias = []
+        self.rowcount = 0
+
+    def execute(self, sql, parametros=None):
+        self.sentencias.append(" ".join(sql.split()))
+
+    def close(self):
+        pass
+
+
+def test_normalizar_texto():
+    assert normalizar_texto("  Me   ENCANTA\n esta canción ") == "me encanta esta canción"
+
+
+def test_clave_depende_del_texto_normalizado_y_del_modelo():
+    cache = SentimentCache("modelo-a", persistente=False)
+    assert cache.clave("Gran  canción") == cache.clave("gran canción")
+    assert cache.clave("gran canción") != cache.clave("mala canción")
+    assert cache.clave("gran canción") != SentimentCache("modelo-b").clave("gran canción")
+    # Los modelos por idioma no comparten entradas con el multilingüe
+    assert cache.clave("gran canción", "es") != cache.clave("gran canción")
+
+
+def test_lru_acotado():
+    cache = SentimentCache("modelo", max_items=2, persistente=False)
+    cache.set_many({'a': ('positivo', 0.9, None), 'b': ('negativo', 0.1, None)})
+    cache.get_many(['a'])                      # 'a' pasa a ser la más reciente
+    cache.set_many({'c': ('neutral', 0.5, None)})
+
+    assert set(cache.get_many(['a', 'b', 'c'])) == {'a', 'c'}
+    stats = cache.estadisticas()
+    assert stats['entradas_memoria'] == 2
+    assert stats['misses'] == 1
+
+
+def test_preparar_tabla_no_borra_entradas_de_otros_modelos():
+    cur = CursorFalso()
+    SentimentCache("modelo-nuevo")._preparar_tabla(cur)
+    assert not any(sql.startswith("DELETE") for sql in cur.sentencias)
+
+
+def test_expirar_borra_por_fecha_y_no_por_modelo(monkeypatch):
+    cur = CursorFalso()
+    cur.rowcount = 3
+
+    class ConexionFalsa:
+        def cursor(self):
+            return cur
+
+        def commit(self):
+            pass
+
+        def close(self):
+            pass
+
+    class PoolFalso:
+        def get_connection(self):
+            return ConexionFalsa()
+
+        def close_connection(self, conn):
+            pass
+
+    monkeypatch.setattr(modulo_cache, 'db', PoolFalso())
+    assert SentimentCache("modelo").expirar(7) == 3
+    borrado = [sql for sql in cur.sentencias if sql.startswith("DELETE")]
+    assert len(borrado) == 1
+    assert "fecha_creacion" in borrado[0] and "modelo" not in borrado[0]
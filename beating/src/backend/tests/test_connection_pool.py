@@ -0,0 +1,216 @@
+"""Pool de conexiones (database/connection.py) con conexiones falsas: sin PostgreSQL"""
+import threading
+import time
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from database.connection import Database
+
+
+class InfoFalsa:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @property
+    def transaction_status(self):
+        return self.conn.estado
+
+
+class CursorFalso:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, consulta):
+        if self.conn.rota:
+            raise psycopg2.OperationalError('conexión rota')
+        self.conn.estado = extensions.TRANSACTION_STATUS_INTRANS
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.closed = 0
+        self.rota = False
+        self.autocommit = False
+        self.readonly = None
+        self.estado = extensions.TRANSACTION_STATUS_IDLE
+        self.info = InfoFalsa(self)
+
+    def cursor(self):
+        return CursorFalso(self)
+
+    def rollback(self):
+        self.estado = extensions.TRANSACTION_STATUS_IDLE
+
+    def set_session(self, readonly=None, autocommit=None):
+        self.readonly = None if readonly == 'default' else readonly
+        self.autocommit = autocommit
+
+    def close(self):
+        self.closed = 1
+
+
+def abiertas_a_la_vez(conexiones):
+    return sum(1 for conn in conexiones if not conn.closed)
+
+
+@pytest.fixture
+def abiertas(monkeypatch):
+    conexiones = []
+
+    def conectar(dsn):
+        conn = ConexionFalsa()
+        conexiones.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, 'connect', conectar)
+    return conexiones
+
+
+def test_abre_pool_min_al_arrancar(abiertas):
+    db = Database(dsn='falso', minconn=2, maxconn=4, timeout=0.1)
+    assert len(abiertas) == 2
+    assert db.estadisticas()['libres'] == 2
+
+
+def test_agotado_devuelve_none_tras_el_timeout(abiertas):
+    db = Database(dsn='falso', minconn=0, maxconn=2, timeout=0.1)
+    prestadas = [db.get_connection(), db.get_connection()]
+    assert all(prestadas)
+
+    inicio = time.monotonic()
+    assert db.get_connection() is None
+    assert time.monotonic() - inicio >= 0.1
+    # No abre conexiones por fuera del pool
+    assert len(abiertas) == 2
+    stats = db.estadisticas()
+    assert stats['timeouts'] == 1
+    assert stats['en_uso'] == 2
+
+
+def test_el_que_espera_recibe_la_conexion_devuelta(abiertas):
+    db = Database(dsn='falso', minconn=0, maxconn=1, timeout=2)
+    conn = db.get_connection()
+    threading.Timer(0.05, db.close_connection, args=(conn,)).start()
+
+    assert db.get_connection() is conn
+    stats = db.estadisticas()
+    assert stats['esperas'] == 1
+    assert stats['espera_max'] > 0
+
+
+def test_devolver_dos_veces_no_duplica_la_conexion(abiertas):
+    db = Database(dsn='falso', minconn=0, maxconn=2, timeout=0.1)
+    conn = db.get_connection()
+    db.close_connection(conn)
+    db.close_connection(conn)
+
+    assert db.estadisticas()['libres'] == 1
+    assert not conn.closed
+    assert db.get_connection() is conn
+    assert db.get_connection() is not conn
+
+
+def test_devuelve_la_sesion_limpia(abiertas):
+    db = Database(dsn='falso', minconn=0, maxconn=1, timeout=0.1)
+    conn = db.get_connection()
+    conn.set_session(readonly=True, autocommit=True)
+    db.close_connection(conn)
+    assert (conn.readonly, conn.autocommit) == (None, False)
+
+    conn = db.get_connection()
+    conn.estado = extensions.TRANSACTION_STATUS_INERROR
+    db.close_connection(conn)
+    assert conn.estado == extensions.TRANSACTION_STATUS_IDLE
+    assert db.get_connection() is conn
+
+
+def test_descarta_conexiones_rotas_y_viejas(abiertas):
+    db = Database(dsn='falso', minconn=0, maxconn=2, timeout=0.1, max_vida=60, ping_inactiva=0)
+    conn = db.get_connection()
+    db.close_connection(conn)
+    conn.rota = True
+    # El ping al prestarla falla: se cierra y se abre otra
+    nueva = db.get_connection()
+    assert nueva is not conn and conn.closed
+
+    db.max_vida = 0
+    db.close_connection(nueva)
+    assert nueva.closed
+    stats = db.estadisticas()
+    assert (stats['descartadas'], stats['recicladas'], stats['libres']) == (1, 1, 0)
+
+
+def test_la_conexion_que_se_valida_cuenta_para_pool_max(abiertas):
+    db = Database(dsn='falso', minconn=0, maxconn=2, timeout=0.2, ping_inactiva=0)
+    libre, prestada = db.get_connection(), db.get_connection()
+    db.close_connection(libre)
+
+    dentro, seguir = threading.Event(), threading.Event()
+    viva = db._viva
+
+    def viva_lenta(conn, devuelta_en):
+        dentro.set()
+        seguir.wait(2)
+        return viva(conn, devuelta_en)
+
+    db._viva = viva_lenta
+    obtenidas = []
+    hilo = threading.Thread(target=lambda: obtenidas.append(db.get_connection()))
+    hilo.start()
+    assert dentro.wait(2)
+
+    # `libre` no está en _libres ni en _prestadas mientras se valida, pero cuenta
+    assert db.get_connection() is None
+    assert abiertas_a_la_vez(abiertas) == 2
+    assert db.estadisticas()['validando'] == 1
+
+    seguir.set()
+    hilo.join(2)
+    assert obtenidas == [libre]
+    assert db.estadisticas()['validando'] == 0
+    db.close_connection(prestada)
+
+
+def test_con_muchos_hilos_nunca_hay_mas_de_pool_max(abiertas, monkeypatch):
+    conectar = psycopg2.connect
+    maximo = []
+
+    def conectar_lento(dsn):
+        time.sleep(0.002)
+        conn = conectar(dsn)
+        maximo.append(abiertas_a_la_vez(abiertas))
+        return conn
+
+    monkeypatch.setattr(psycopg2, 'connect', conectar_lento)
+    # max_vida=0: cada devolución cierra y obliga a abrir otra; ping_inactiva=0: siempre se valida
+    db = Database(dsn='falso', minconn=0, maxconn=3, timeout=5, max_vida=0.01, ping_inactiva=0)
+    errores = []
+
+    def trabajo():
+        for _ in range(30):
+            conn = db.get_connection()
+            if conn is None:
+                errores.append('timeout')
+                continue
+            maximo.append(abiertas_a_la_vez(abiertas))
+            time.sleep(0.001)
+            db.close_connection(conn)
+
+    hilos = [threading.Thread(target=trabajo) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert not errores
+    assert max(maximo) <= 3
+    stats = db.estadisticas()
+    assert (stats['en_uso'], stats['abriendo'], stats['validando']) == (0, 0, 0)
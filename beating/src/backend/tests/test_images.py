@@ -0,0 +1,117 @@
+from io import BytesIO
+
+import pytest
+from flask import Flask
+from PIL import Image
+
+from reviews.images import ImagenesCache, WEBP_DISPONIBLE, etag_de, formato_de
+import reviews.images as modulo_imagenes
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>'
+
+
+def png(ancho=1000, alto=600, color='purple'):
+    salida = BytesIO()
+    Image.new('RGB', (ancho, alto), color).save(salida, format='PNG')
+    return salida.getvalue()
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    cache = ImagenesCache(max_imagenes=2)
+    monkeypatch.setattr(modulo_imagenes, 'imagenes', cache)
+
+    app = Flask(__name__)
+
+    @app.route('/img/<clave>.<formato>')
+    def imagen(clave, formato):
+        return modulo_imagenes.respuesta_imagen(clave, formato)
+
+    return app.test_client(), cache
+
+
+def test_etag_y_formato():
+    datos = png()
+    assert etag_de(datos) == etag_de(png())
+    assert etag_de(datos) != etag_de(png(color='pink'))
+    assert formato_de(datos) == 'png'
+    assert formato_de(SVG) == 'svg'
+
+
+def test_responde_con_etag_y_304(cliente):
+    cliente, cache = cliente
+    etag = cache.publicar('nube', png())
+
+    respuesta = cliente.get('/img/nube.png')
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'image/png'
+    assert respuesta.headers['ETag'] == f'"{etag}"'
+    assert 'must-revalidate' in respuesta.headers['Cache-Control']
+
+    respuesta = cliente.get('/img/nube.png', headers={'If-None-Match': f'"{etag}"'})
+    assert respuesta.status_code == 304
+    assert respuesta.data == b''
+    assert cache.estadisticas()['no_modificadas'] == 1
+
+
+def test_etag_distinto_tras_publicar_otra_imagen(cliente):
+    cliente, cache = cliente
+    viejo = cache.publicar('nube', png())
+    nuevo = cache.publicar('nube', png(color='pink'))
+    assert viejo != nuevo
+
+    respuesta = cliente.get('/img/nube.png', headers={'If-None-Match': f'"{viejo}"'})
+    assert respuesta.status_code == 200
+    assert respuesta.headers['ETag'] == f'"{nuevo}"'
+
+
+def test_url_versionada_es_inmutable(cliente):
+    cliente, cache = cliente
+    etag = cache.publicar('nube', png())
+    url = cache.url('/img/nube.png', etag)
+    assert url == f'/img/nube.png?v={etag}'
+
+    respuesta = cliente.get(url)
+    assert 'immutable' in respuesta.headers['Cache-Control']
+    # Una versión que ya no es la actual no se puede cachear para siempre
+    respuesta = cliente.get('/img/nube.png?v=antigua')
+    assert 'immutable' not in respuesta.headers['Cache-Control']
+
+
+def test_miniatura_y_webp(cliente):
+    cliente, cache = cliente
+    cache.publicar('nube', png())
+
+    respuesta = cliente.get('/img/nube.png?tamano=miniatura')
+    assert Image.open(BytesIO(respuesta.data)).width == modulo_imagenes.TAMANOS['miniatura']
+    etag_miniatura = respuesta.headers['ETag']
+
+    respuesta = cliente.get('/img/nube.png?tamano=miniatura', headers={'If-None-Match': etag_miniatura})
+    assert respuesta.status_code == 304
+
+    respuesta = cliente.get('/img/nube.webp')
+    assert respuesta.mimetype == ('image/webp' if WEBP_DISPONIBLE else 'image/png')
+
+
+def test_svg_se_sirve_tal_cual(cliente):
+    cliente, cache = cliente
+    cache.publicar('grafica', SVG)
+    respuesta = cliente.get('/img/grafica.png?tamano=miniatura')
+    assert respuesta.mimetype == 'image/svg+xml'
+    assert respuesta.data == SVG
+
+
+def test_errores(cliente):
+    cliente, cache = cliente
+    assert cliente.get('/img/nada.png').status_code == 404
+    cache.publicar('nube', png())
+    assert cliente.get('/img/nube.png?tamano=gigante').status_code == 400
+    assert cliente.get('/img/nube.gif').status_code == 400
+
+
+def test_limite_de_imagenes():
+    cache = ImagenesCache(max_imagenes=2)
+    for clave in ('a', 'b', 'c'):
+        cache.publicar(clave, png(10, 10))
+    assert cache.obtener('a') is None
+    assert cache.obtener('c') is not None
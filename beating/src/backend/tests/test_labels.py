@@ -0,0 +1,61 @@
+import pytest
+
+from reviews.cache import SentimentCache
+from reviews.labels import etiquetar, etiquetar_probabilidades, reetiquetar
+
+
+@pytest.mark.parametrize('estrellas, esperado', [
+    (5, 'positivo'),
+    (4, 'positivo'),
+    (3, 'neutral'),
+    (2, 'negativo'),
+    (1, 'negativo'),
+])
+def test_umbrales_por_defecto(estrellas, esperado):
+    assert etiquetar(estrellas, 0.8)[0] == esperado
+
+
+def test_puntuacion_segun_la_probabilidad():
+    assert etiquetar(5, 0.8) == ('positivo', 0.9)
+    assert etiquetar(1, 0.8) == ('negativo', 0.4)
+    assert etiquetar(3, 0.8) == ('neutral', 0.5)
+
+
+def test_etiquetar_probabilidades_usa_la_estrella_mas_probable():
+    assert etiquetar_probabilidades([0.05, 0.05, 0.1, 0.6, 0.2]) == ('positivo', 0.8)
+    assert etiquetar_probabilidades([0.1, 0.5, 0.2, 0.1, 0.1]) == ('negativo', 0.25)
+
+
+def test_etiquetar_probabilidades_con_otros_umbrales():
+    probabilidades = [0.05, 0.05, 0.1, 0.6, 0.2]
+    assert etiquetar_probabilidades(probabilidades, positivo_desde=5)[0] == 'neutral'
+    assert etiquetar_probabilidades([0.1, 0.1, 0.6, 0.1, 0.1], negativo_hasta=3)[0] == 'negativo'
+
+
+def test_reetiquetar():
+    probabilidades = [0.05, 0.05, 0.1, 0.2, 0.6]
+    # Etiqueta guardada con otros umbrales: se vuelve a derivar
+    assert reetiquetar(('neutral', 0.5, probabilidades)) == ('positivo', 0.8, probabilidades)
+    # Sin distribución (léxico) se deja como está
+    assert reetiquetar(('negativo', 0.2, None)) == ('negativo', 0.2, None)
+
+
+def test_la_cache_no_sirve_etiquetas_de_otros_umbrales():
+    from reviews.sentiment import SentimentAnalyzer
+
+    analizador = SentimentAnalyzer()
+    analizador.cache = SentimentCache("modelo", persistente=False)
+    probabilidades = [0.05, 0.05, 0.1, 0.2, 0.6]
+    analizador.cache.set_many({analizador.cache.clave("me encanta"): ('neutral', 0.5, probabilidades)})
+
+    def sin_modelo(*args, **kwargs):
+        raise AssertionError("un acierto de caché no debe pasar por el modelo")
+
+    analizador._run_model = sin_modelo
+    assert analizador._score_with_model(["me encanta"]) == [('positivo', 0.8, probabilidades)]
+
+
+def test_empate_gana_el_menor_numero_de_estrellas():
+    # Mismo criterio que SQL_RECALCULAR (ORDER BY u.p DESC, u.estrellas ASC)
+    assert etiquetar_probabilidades([0.0, 0.0, 0.4, 0.4, 0.2]) == ('neutral', 0.5)
+    assert etiquetar_probabilidades([0.45, 0.0, 0.0, 0.1, 0.45]) == ('negativo', 0.23)
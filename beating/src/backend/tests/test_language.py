@@ -0,0 +1,19 @@
+from reviews.language import detectar_idioma
+
+
+def test_palabras_de_cada_idioma():
+    assert detectar_idioma('this is the best song of the year')[0] == 'en'
+    assert detectar_idioma('la letra de esta canción es muy buena')[0] == 'es'
+
+
+def test_acentos_cuentan_como_espanol():
+    idioma, confianza = detectar_idioma('increíble')
+    assert idioma == 'es' and confianza == 1.0
+
+
+def test_sin_palabras_conocidas_se_mantiene_el_criterio_original():
+    # Letras sin acentos: inglés, como el detector por caracteres de antes
+    assert detectar_idioma('awesome vibes') == ('en', 0.0)
+    # Sin letras no hay nada que decidir
+    assert detectar_idioma('🔥🔥 10/10') == ('es', 0.0)
+    assert detectar_idioma('') == ('es', 0.0)
@@ -0,0 +1,76 @@
+"""Caché de layouts de la nube (reviews/charts.py) y sus estadísticas entre procesos"""
+import reviews.charts as charts
+from reviews.charts import CacheLayouts, estadisticas_layouts, renderizar_graficas
+
+
+FRECUENCIAS = {'guitarra': 10, 'voz': 7, 'ritmo': 5, 'letra': 3}
+
+
+def test_mismos_pesos_redondeados_es_acierto():
+    cache = CacheLayouts(precision=1)
+    cache.guardar(FRECUENCIAS, 'layout')
+    # 7.2/10 y 7/10 redondean igual con un decimal
+    assert cache.buscar({**FRECUENCIAS, 'voz': 7.2}) == 'layout'
+    assert cache.estadisticas() == {'aciertos': 1, 'fallos': 0, 'layouts': 1}
+
+
+def test_pesos_distintos_es_fallo_aunque_sean_las_mismas_palabras():
+    cache = CacheLayouts(precision=2)
+    cache.guardar(FRECUENCIAS, 'layout')
+    assert cache.buscar({**FRECUENCIAS, 'letra': 6}) is None
+    assert cache.estadisticas()['fallos'] == 1
+
+
+def test_descarta_el_layout_menos_usado():
+    cache = CacheLayouts(maximo=2)
+    cache.guardar({'a': 1}, 'A')
+    cache.guardar({'b': 1}, 'B')
+    cache.buscar({'a': 1})
+    cache.guardar({'c': 1}, 'C')
+    assert cache.buscar({'b': 1}) is None
+    assert cache.buscar({'a': 1}) == 'A'
+
+
+def test_estadisticas_incluyen_los_procesos_de_renderizado(monkeypatch):
+    monkeypatch.setitem(charts.ANALISIS_CONFIG, 'render_procesos', 1)
+    monkeypatch.setattr(charts, 'layouts', CacheLayouts())
+    try:
+        for _ in range(2):
+            graficas = renderizar_graficas([], [], FRECUENCIAS)
+            assert graficas['wordcloud'].startswith(b'\x89PNG')
+        stats = estadisticas_layouts()
+    finally:
+        charts._reiniciar_pool()
+    # La nube se dibujó en el worker: este proceso no vio nada
+    assert charts.layouts.estadisticas()['fallos'] == 0
+    assert stats['procesos'] == 2
+    assert stats['fallos'] == 1
+    assert stats['aciertos'] == 1
+
+
+def _nube_colgada(frecuencias):
+    import time
+    time.sleep(60)
+
+
+def test_worker_colgado_renderiza_en_este_proceso(monkeypatch):
+    monkeypatch.setitem(charts.ANALISIS_CONFIG, 'render_procesos', 1)
+    monkeypatch.setitem(charts.ANALISIS_CONFIG, 'render_timeout', 0.5)
+    monkeypatch.setattr(charts, '_nube_en_worker', _nube_colgada)
+    try:
+        graficas = renderizar_graficas([], [], FRECUENCIAS)
+    finally:
+        charts._reiniciar_pool(terminar=True)
+    assert graficas['wordcloud'].startswith(b'\x89PNG')
+    assert charts._pool is None
+
+
+def test_misma_nube_mismos_bytes_con_y_sin_cache_de_layouts(monkeypatch):
+    monkeypatch.setattr(charts, 'layouts', CacheLayouts())
+    primera = charts.generar_wordcloud_beating(FRECUENCIAS)
+    # Acierto de la caché: solo recolorea
+    segunda = charts.generar_wordcloud_beating(FRECUENCIAS)
+    monkeypatch.setattr(charts, 'layouts', CacheLayouts())
+    tercera = charts.generar_wordcloud_beating(FRECUENCIAS)
+    assert primera == segunda == tercera
+    assert charts.color_func_beating('guitarra', 20, (0, 0), None) == charts.color_func_beating('guitarra', 90, (5, 5), 1)
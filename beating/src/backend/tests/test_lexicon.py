@@ -0,0 +1,22 @@
+from reviews.lexicon import LexiconClassifier
+
+
+def pistas(texto):
+    """(sentimiento, confianza) sin textblob: textos en español"""
+    sentimiento, _, confianza = LexiconClassifier().classify(texto)
+    return sentimiento, confianza
+
+
+def test_obra_maestra_cuenta_como_una_pista_positiva():
+    assert pistas('una obra maestra')[0] == 'positivo'
+    # Una sola pista, no dos: confianza 1/3
+    assert pistas('una obra maestra')[1] == 0.33
+
+
+def test_obra_o_maestra_sueltas_no_tienen_polaridad():
+    assert pistas('la maestra dijo que la escuchara') == ('neutral', 0.0)
+    assert pistas('otra obra del grupo') == ('neutral', 0.0)
+
+
+def test_la_negacion_invierte_la_frase_entera():
+    assert pistas('nunca obra maestra')[0] == 'negativo'
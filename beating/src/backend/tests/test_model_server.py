@@ -0,0 +1,94 @@
+"""Servidor de modelo (reviews/model_server.py) con un backend falso sobre un socket real"""
+import os
+import socket
+import stat
+import threading
+
+import numpy as np
+import pytest
+
+import reviews.model_server as modulo_servidor
+from reviews.model_server import ModelServer, RemoteBackend
+
+
+class BackendFalso:
+    nombre = 'falso'
+
+    def __init__(self, bloqueo=None):
+        self.bloqueo = bloqueo
+
+    def predict_proba(self, textos, max_chunks=1):
+        if self.bloqueo is not None:
+            self.bloqueo.wait()
+        return np.tile([0.0, 0.0, 0.0, 0.0, 1.0], (len(textos), 1))
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    servidores = []
+
+    def arrancar(backend, timeout=5):
+        ruta = str(tmp_path / 'privado' / 'modelo.sock')
+        srv = ModelServer(ruta, lambda modelo: backend, ['m'], max_wait_ms=1, timeout=timeout)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servidores.append(srv)
+        return ruta
+
+    yield arrancar
+    for srv in servidores:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_socket_y_directorio_solo_para_el_usuario(servidor):
+    ruta = servidor(BackendFalso())
+    assert stat.S_IMODE(os.stat(ruta).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(ruta)).st_mode) == 0o700
+
+
+def test_prediccion_por_el_socket(servidor):
+    cliente = RemoteBackend('m', socket_path=servidor(BackendFalso()), timeout=5)
+    assert cliente.nombre == 'falso'
+    assert cliente.predict_proba(['hola', 'adiós']).shape == (2, 5)
+
+
+def test_lote_atascado_responde_error_y_usa_el_respaldo(servidor):
+    bloqueo = threading.Event()
+    try:
+        ruta = servidor(BackendFalso(bloqueo), timeout=0.2)
+        cliente = RemoteBackend('m', socket_path=ruta, timeout=5, respaldo=BackendFalso)
+        probs = cliente.predict_proba(['hola'])
+        assert probs.shape == (1, 5)
+        assert cliente.estadisticas()['respaldo'] == 1
+    finally:
+        bloqueo.set()
+
+
+def test_version_de_protocolo_distinta_usa_el_respaldo(tmp_path):
+    ruta = str(tmp_path / 'viejo.sock')
+    escucha = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    escucha.bind(ruta)
+    escucha.listen()
+
+    def servidor_viejo():
+        while True:
+            try:
+                conexion, _ = escucha.accept()
+            except OSError:
+                return
+            with conexion:
+                try:
+                    modulo_servidor._recibir_mensaje(conexion)
+                    modulo_servidor._enviar_mensaje(
+                        conexion, modulo_servidor._CABECERA_RESPUESTA.pack(modulo_servidor.VERSION + 1, 0, 0)
+                    )
+                except (ConnectionError, OSError):
+                    pass
+
+    threading.Thread(target=servidor_viejo, daemon=True).start()
+    try:
+        cliente = RemoteBackend('m', socket_path=ruta, timeout=1, respaldo=BackendFalso, espera_inicial=0)
+        assert cliente.nombre == 'falso'
+        assert cliente.predict_proba(['hola']).shape == (1, 5)
+    finally:
+        escucha.close()
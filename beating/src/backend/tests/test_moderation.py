@@ -0,0 +1,56 @@
+import re
+
+import pytest
+
+from reviews.moderation import GROSERIAS, Moderador, moderador
+
+TEXTOS = [
+    "Qué mierda de canción, el coro es una puta maravilla",
+    "This shit is FUCKING good, damn",
+    "El pendejo del productor arruinó el álbum, joder",
+    "Hello darkness, my old friend",
+    "Shithead y shit no son lo mismo; SHIT tampoco",
+    "hijo-de-puta, cabrón! ¿Cabrona?",
+    "Una reseña sin nada raro",
+    "ass assistant classic passion",
+    "",
+]
+
+
+def moderar_por_palabra(texto):
+    """Implementación anterior (resenas/routes.py): una regex por grosería"""
+    texto_censurado = texto
+    for groseria in GROSERIAS:
+        patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
+        texto_censurado = patron.sub('*' * len(groseria), texto_censurado)
+    encontradas = []
+    for groseria in GROSERIAS:
+        patron = re.compile(r'\b' + re.escape(groseria) + r'\b', re.IGNORECASE)
+        if patron.search(texto):
+            encontradas.append(groseria)
+    return texto_censurado, len(encontradas), sorted(encontradas)
+
+
+@pytest.mark.parametrize('texto', TEXTOS)
+def test_misma_salida_que_la_lista_original(texto):
+    assert moderador.moderar(texto) == moderar_por_palabra(texto)
+
+
+def test_solo_palabras_completas():
+    assert moderador.moderar("hello shell") == ("hello shell", 0, [])
+    assert moderador.moderar("what the hell") == ("what the ****", 1, ['hell'])
+
+
+def test_cuenta_groserias_distintas():
+    _, cantidad, terminos = moderador.moderar("Mierda, MIERDA y más mierda, joder")
+    assert cantidad == 2
+    assert terminos == ['joder', 'mierda']
+
+
+def test_archivo_amplia_la_lista(tmp_path):
+    archivo = tmp_path / "groserias.txt"
+    archivo.write_text("# comentario\nrecontra\nmalapalabra  # con comentario\n", encoding='utf-8')
+
+    propio = Moderador(palabras={'mierda'}, archivo=str(archivo), intervalo_recarga=0)
+    assert propio.palabras == {'mierda', 'recontra', 'malapalabra'}
+    assert propio.moderar("recontra mierda") == ("******** ******", 2, ['mierda', 'recontra'])
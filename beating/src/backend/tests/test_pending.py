@@ -0,0 +1,99 @@
+"""Worker de sentimientos pendientes (reviews/pending.py) con base de datos falsa"""
+import pytest
+
+import reviews.pending as modulo_pendientes
+from reviews.pending import PendingSentimentWorker
+
+
+class CursorFalso:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, consulta, parametros=None):
+        pass
+
+    def fetchall(self):
+        return [(1, 'me encantó', False), (2, 'horrible', True)]
+
+    def executemany(self, consulta, filas):
+        self.conn.escritas.extend(filas)
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.escritas = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return CursorFalso(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class AnalizadorFalso:
+    modelo_version = 'falso:v1'
+
+    def __init__(self, error=None):
+        self.error = error
+        self.llamadas = []
+
+    def analyze_batch(self, textos, **opciones):
+        self.llamadas.append(opciones)
+        if self.error and opciones.get('estricto'):
+            raise self.error
+        return [('positivo', 0.9, [0, 0, 0, 0.1, 0.9]) for _ in textos]
+
+
+@pytest.fixture
+def conexion(monkeypatch):
+    conn = ConexionFalsa()
+    conn.terminos = {}
+    monkeypatch.setattr(modulo_pendientes.db, 'get_connection', lambda: conn)
+    monkeypatch.setattr(modulo_pendientes.db, 'close_connection', lambda c: None)
+    monkeypatch.setattr(modulo_pendientes, 'extraer_terminos_lote', lambda textos: [{t: 1} for t in textos])
+    monkeypatch.setattr(modulo_pendientes, 'guardar_terminos',
+                        lambda cur, id_resena, terminos: conn.terminos.update({id_resena: terminos}))
+    return conn
+
+
+def test_puntua_el_lote_en_modo_estricto(conexion, monkeypatch):
+    analizador = AnalizadorFalso()
+    monkeypatch.setattr(modulo_pendientes, 'sentiment_analyzer', analizador)
+    puntuadas = []
+    worker = PendingSentimentWorker(batch_size=2)
+    worker.on_scored(puntuadas.append)
+
+    assert worker.process_pending() == 2
+    assert analizador.llamadas == [{'estricto': True}]
+    assert [fila[-1] for fila in conexion.escritas] == [1, 2]
+    assert puntuadas == [[1, 2]]
+    # Solo la reseña guardada sin términos pasa por spaCy
+    assert conexion.terminos == {1: {'me encantó': 1}}
+
+
+def test_si_falla_el_modelo_siguen_pendientes_y_espera_mas(conexion, monkeypatch):
+    monkeypatch.setattr(modulo_pendientes, 'sentiment_analyzer', AnalizadorFalso(MemoryError('sin memoria')))
+    worker = PendingSentimentWorker(batch_size=2, poll_interval=5.0, max_espera=30.0)
+
+    esperas = []
+    for _ in range(4):
+        assert worker.process_pending() == 0
+        esperas.append(worker.espera_reintento())
+
+    assert conexion.escritas == [] and conexion.commits == 0
+    assert conexion.terminos == {}
+    assert conexion.rollbacks == 4
+    assert esperas == [10.0, 20.0, 30.0, 30.0]
+
+    # Un lote correcto vuelve al intervalo normal
+    monkeypatch.setattr(modulo_pendientes, 'sentiment_analyzer', AnalizadorFalso())
+    assert worker.process_pending() == 2
+    assert worker._fallos == 0
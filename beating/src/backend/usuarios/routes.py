@@ -1,14 +1,14 @@
 from flask import request, jsonify
-from database.connection import db
+from database.request_scope import conexion_peticion
 from werkzeug.security import generate_password_hash, check_password_hash
 
 def init_usuarios_routes(app):
     
     @app.route('/api/usuarios', methods=['GET'])
     def get_usuarios():
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -33,14 +33,12 @@ def init_usuarios_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios/<int:id_usuario>', methods=['GET'])
     def get_usuario(id_usuario):
-        conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -68,12 +66,11 @@ def init_usuarios_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios', methods=['POST'])
     def create_usuario():
         conn = None
+        cur = None
         try:
             data = request.get_json()
             nombre_usuario = data.get('nombre_usuario')
@@ -83,7 +80,7 @@ def init_usuarios_routes(app):
             if not nombre_usuario or not correo or not contrasena:
                 return jsonify({'error': 'Faltan campos obligatorios'}), 400
             
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -124,15 +121,14 @@ def init_usuarios_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios/<int:id_usuario>', methods=['PUT'])
     def update_usuario(id_usuario):
         conn = None
+        cur = None
         try:
             data = request.get_json()
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -177,14 +173,13 @@ def init_usuarios_routes(app):
         finally:
             if cur:
                 cur.close()
-            if conn:
-                db.close_connection(conn)
 
     @app.route('/api/usuarios/<int:id_usuario>', methods=['DELETE'])
     def delete_usuario(id_usuario):
         conn = None
+        cur = None
         try:
-            conn = db.get_connection()
+            conn = conexion_peticion()
             if not conn:
                 return jsonify({"error": "Error de conexión a la base de datos"}), 500
                 
@@ -207,6 +202,4 @@ def init_usuarios_routes(app):
             return jsonify({'error': 'Error al eliminar usuario'}), 500
         finally:
             if cur:
-                cur.close()
-            if conn:
-                db.close_connection(conn)
\ No newline at end of file
+                cur.close()
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Punto de entrada para servidores WSGI, con los servicios de fondo arrancados:
+
+    gunicorn -w 4 --threads 8 wsgi:app
+    FLASK_APP=wsgi flask run
+
+Cada worker arranca sus servicios al importar este módulo (migraciones
+idempotentes, modelo o cliente del servidor de modelo, worker de pendientes;
+los workers se reparten las pendientes con SKIP LOCKED). Sin --preload: los
+hilos arrancados en el proceso maestro no sobreviven al fork de los workers.
+"""
+from app import app, iniciar_servicios
+
+iniciar_servicios()
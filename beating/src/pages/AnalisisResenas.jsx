@@ -94,7 +94,7 @@ const AnalisisResenas = () => {
             <div className={cardStyle}>
               <h2 className="text-2xl font-bold text-white mb-4">Top 10 Canciones Mejor Calificadas</h2>
               <div className="bg-black/20 rounded-xl p-4 mb-4 border border-purple-500/30">
-                <img src={`data:image/png;base64,${data.top_songs}`} alt="Top canciones" className="w-full h-auto rounded" />
+                <img src={`http://localhost:5000${data.top_songs_url}`} alt="Top canciones" className="w-full h-auto rounded" />
               </div>
               <div className="overflow-x-auto">
                 <table className="w-full text-left">
@@ -131,7 +131,7 @@ const AnalisisResenas = () => {
             <div className={cardStyle}>
               <h2 className="text-2xl font-bold text-white mb-4">Distribución de Sentimientos</h2>
               <div className="bg-black/20 rounded-xl p-4 mb-6 border border-purple-500/30">
-                <img src={`data:image/png;base64,${data.sentiment_dist}`} alt="Distribución sentimientos" className="w-full h-auto rounded" />
+                <img src={`http://localhost:5000${data.sentiment_dist_url}`} alt="Distribución sentimientos" className="w-full h-auto rounded" />
               </div>
               <div className="space-y-3">
                 {data.distribucion_sentimientos.map((item, index) => (
@@ -157,7 +157,7 @@ const AnalisisResenas = () => {
             <div className={`${cardStyle} lg:col-span-2`}>
               <h2 className="text-2xl font-bold text-white mb-4">Palabras más usadas en reseñas positivas</h2>
               <div className="bg-black/20 rounded-xl p-4 border border-purple-500/30">
-                <img src={`data:image/png;base64,${data.wordcloud}`} alt="Nube de palabras" className="w-full h-auto rounded" />
+                <img src={`http://localhost:5000${data.wordcloud_url}`} alt="Nube de palabras" className="w-full h-auto rounded" />
               </div>
             </div>
           )}
@@ -17,8 +17,8 @@ const HomeWordCloudContainer = () => {
   const fetchWordCloud = async () => {
     try {
       const response = await axios.get("http://localhost:5000/analisis-resenas");
-      if (response.data?.wordcloud) {
-        setWordcloudImage(`data:image/png;base64,${response.data.wordcloud}`);
+      if (response.data?.wordcloud_url) {
+        setWordcloudImage(`http://localhost:5000${response.data.wordcloud_url}&tamano=miniatura`);
       } else {
         setError("Nube de palabras no disponible.");
       }